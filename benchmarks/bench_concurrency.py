@@ -0,0 +1,125 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║             Модуль benchmarks/bench_concurrency.py         ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Задержка "других чатов", пока выполняются поисковые запросы.
+        Легкие чаты имитируются задачами, которые каждые несколько
+        миллисекунд отвечают через цикл событий; их задержка - насколько
+        ответ опоздал относительно расписания. Сценарии:
+        • idle     - поиск не выполняется (базовая линия)
+        • blocking - search_catalog и get_rows вызываются прямо в цикле событий
+        • async    - asearch_catalog и aget_rows (очередь кодирования и пул поиска)
+
+        Для каждого сценария выводит p50/p99 задержки легких чатов и
+        пропускную способность поисков.
+
+    Запуск:
+        python -m benchmarks.bench_concurrency --chats 50 --searchers 4 --duration 10
+"""
+
+import asyncio
+import argparse
+
+from time import perf_counter
+
+from src.utils         import logger
+from src.managers      import DataManager, EmbeddingManager
+from config            import config
+
+from benchmarks.common import load_spec_queries, latency_stats, print_table
+
+
+COLUMN = "Наименование"
+
+
+async def light_chat(stop: asyncio.Event, interval: float, lags: list):
+    """
+        Легкий чат: отвечает каждые interval секунд и записывает опоздание в мс
+    """
+    while not stop.is_set():
+        expected = perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, perf_counter() - expected) * 1000)
+
+
+async def blocking_searcher(em, dm, queries, offset, stop: asyncio.Event, done: list):
+    i = offset
+    while not stop.is_set():
+        found = em.search_catalog(COLUMN, queries[i % len(queries)])
+        for table, idx, _ in found:
+            dm.get_rows(table, [idx])
+        done.append(1)
+        i += 1
+        await asyncio.sleep(0)
+
+
+async def async_searcher(em, dm, queries, offset, stop: asyncio.Event, done: list):
+    i = offset
+    while not stop.is_set():
+        found = await em.asearch_catalog(COLUMN, queries[i % len(queries)])
+        await asyncio.gather(*(dm.aget_rows(table, [idx]) for table, idx, _ in found))
+        done.append(1)
+        i += 1
+
+
+async def run_scenario(name, em, dm, queries, args):
+    stop = asyncio.Event()
+    lags, done = [], []
+
+    chats = [asyncio.create_task(light_chat(stop, args.interval / 1000, lags)) for _ in range(args.chats)]
+    searcher = {"blocking": blocking_searcher, "async": async_searcher}.get(name)
+    searchers = [
+        asyncio.create_task(searcher(em, dm, queries, n * 7, stop, done))
+        for n in range(args.searchers)
+    ] if searcher else []
+
+    start = perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*chats, *searchers)
+    elapsed = perf_counter() - start
+
+    stats = latency_stats(lags)
+    return {
+        "scenario":    name,
+        "chat_p50_ms": stats["p50"],
+        "chat_p99_ms": stats["p99"],
+        "searches_s":  len(done) / elapsed,
+    }
+
+
+async def run(args):
+    dm = DataManager(config.data.data_file)
+    em = EmbeddingManager(dm)
+
+    # Без кэша запросов каждый поиск проходит через модель
+    em.query_cache.maxsize = 0
+    queries = load_spec_queries(limit=args.limit)
+    logger.info(f"Concurrency benchmark on {len(queries)} queries")
+
+    rows = []
+    for name in ("idle", "blocking", "async"):
+        rows.append(await run_scenario(name, em, dm, queries, args))
+
+    print(
+        f"\nЗадержка {args.chats} легких чатов (интервал {args.interval} мс) "
+        f"при {args.searchers} параллельных поисках, {args.duration} с на сценарий"
+    )
+    print_table(rows, ["scenario", "chat_p50_ms", "chat_p99_ms", "searches_s"])
+    print(f"\nОчередь кодирования: {em.batcher.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Задержка других чатов во время поиска")
+    parser.add_argument("--chats",     type=int,   default=50,  help="Число легких чатов")
+    parser.add_argument("--searchers", type=int,   default=4,   help="Число параллельных поисков")
+    parser.add_argument("--interval",  type=float, default=10,  help="Интервал ответа легкого чата, мс")
+    parser.add_argument("--duration",  type=float, default=10,  help="Длительность сценария, с")
+    parser.add_argument("--limit",     type=int,   default=200, help="Максимум запросов (0 - все)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
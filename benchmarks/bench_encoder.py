@@ -0,0 +1,91 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║               Модуль benchmarks/bench_encoder.py           ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Сравнение бэкендов кодировщика (torch, torch-int8, onnx, onnx-int8)
+        на запросах из клиентских спецификаций. Для каждого бэкенда выводит:
+        • паритет с PyTorch: минимальную, 1-й перцентиль и среднюю
+          косинусную близость векторов
+        • пропускную способность (запросов/с) при размере батча 1 и 32
+
+        Завершается с кодом 1, если паритет какого-либо бэкенда ниже
+        ENCODER_PARITY_MIN, поэтому может использоваться как проверка
+        перед сменой ENCODER_BACKEND.
+
+    Запуск:
+        python -m benchmarks.bench_encoder --backends torch onnx onnx-int8
+"""
+
+import sys
+import argparse
+
+from time import perf_counter
+
+from src.utils                    import logger
+from src.managers                 import EmbeddingManager
+from src.managers.manager_encoder import ENCODER_BACKENDS, load_encoder, encoder_parity
+from config                       import config
+
+from benchmarks.common            import load_spec_queries, print_table
+
+
+BATCH_SIZES = (1, 32)
+
+
+def throughput(model, queries, batch_size: int) -> float:
+    """
+        Запросов в секунду при кодировании батчами заданного размера
+    """
+    model.encode(queries[:batch_size], batch_size=batch_size, show_progress_bar=False)  # прогрев
+    start = perf_counter()
+    for i in range(0, len(queries), batch_size):
+        model.encode(queries[i:i + batch_size], batch_size=batch_size, show_progress_bar=False)
+    return len(queries) / (perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Паритет и пропускная способность бэкендов кодировщика")
+    parser.add_argument("--backends", nargs="+", default=list(ENCODER_BACKENDS), choices=ENCODER_BACKENDS)
+    parser.add_argument("--limit",    type=int, default=256, help="Максимум запросов (0 - все)")
+    args = parser.parse_args()
+
+    queries = [EmbeddingManager.normalize_query(q) for q in load_spec_queries(limit=args.limit)]
+    logger.info(f"Benchmarking encoder backends on {len(queries)} queries")
+
+    reference = load_encoder(EmbeddingManager.MODEL_NAME, "torch")
+
+    rows = []
+    failed = []
+    for backend in args.backends:
+        start = perf_counter()
+        model = reference if backend == "torch" else load_encoder(
+            EmbeddingManager.MODEL_NAME, backend,
+            onnx_quantization=config.embedding.encoder_onnx_quantization
+        )
+        load_time = perf_counter() - start
+
+        parity = encoder_parity(reference, model, queries)
+        if parity["min"] < config.embedding.encoder_parity_min:
+            failed.append(backend)
+
+        rows.append({
+            "backend":  backend,
+            "load_s":   load_time,
+            "cos_min":  parity["min"],
+            "cos_p01":  parity["p01"],
+            "cos_mean": parity["mean"],
+            **{f"qps_b{size}": throughput(model, queries, size) for size in BATCH_SIZES},
+        })
+
+    print(f"\nПаритет с torch и запросов/с, {len(queries)} запросов, порог {config.embedding.encoder_parity_min}")
+    print_table(rows, ["backend", "load_s", "cos_min", "cos_p01", "cos_mean", *(f"qps_b{size}" for size in BATCH_SIZES)])
+
+    if failed:
+        print(f"\n❌ Паритет ниже порога: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
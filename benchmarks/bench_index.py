@@ -0,0 +1,87 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                 Модуль benchmarks/bench_index.py           ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Сравнение приближенных индексов (HNSW, IVF-Flat) с точным поиском
+        на векторах каталога. Для каждой пары (таблица, колонка) выводит:
+        • время построения индекса
+        • recall@k относительно точного поиска (flat)
+        • задержку одного запроса p50/p99 в миллисекундах
+
+        Запросы - наименования из tests/data/excel/test_*.xlsx, закодированные
+        той же моделью, что и в боте.
+
+    Запуск:
+        python -m benchmarks.bench_index --k 5 --limit 500
+"""
+
+import argparse
+
+from time import perf_counter
+
+from src.utils                  import logger
+from src.managers               import DataManager, EmbeddingManager
+from src.managers.manager_index import SharedFlatIndex, INDEX_TYPES, build_faiss_index, tune_index
+from config                     import config
+
+from benchmarks.common          import load_spec_queries, timed_search, recall_at_k, latency_stats, print_table
+
+
+COLUMNS = ["Наименование", "Описание"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall и задержка приближенных индексов")
+    parser.add_argument("--k",     type=int, default=5,   help="Число ближайших соседей")
+    parser.add_argument("--limit", type=int, default=500, help="Максимум запросов (0 - все)")
+    args = parser.parse_args()
+
+    dm = DataManager(config.data.data_file)
+    em = EmbeddingManager(dm)
+
+    queries = load_spec_queries(limit=args.limit)
+    logger.info(f"Encoding {len(queries)} benchmark queries")
+    query_vectors = em.encode_queries(queries)
+    query_vectors /= (query_vectors ** 2).sum(axis=1, keepdims=True) ** 0.5
+
+    rows = []
+    for table in dm.get_all_table_names():
+        for column in COLUMNS:
+            vectors = em.load_embeddings(table, column)
+            exact = SharedFlatIndex(vectors)
+            _, exact_indices, exact_latencies = timed_search(exact, query_vectors, args.k)
+            rows.append({
+                "table": table.strip(), "column": column, "rows": len(vectors), "type": "flat",
+                "build_s": 0.0, "recall": 1.0, **latency_stats(exact_latencies),
+            })
+
+            for index_type in INDEX_TYPES:
+                if index_type == "flat":
+                    continue
+                start = perf_counter()
+                index = build_faiss_index(
+                    vectors, index_type,
+                    hnsw_m=config.embedding.hnsw_m,
+                    ivf_nlist=config.embedding.ivf_nlist
+                )
+                build_time = perf_counter() - start
+                index = tune_index(
+                    index,
+                    hnsw_ef_search=config.embedding.hnsw_ef_search,
+                    ivf_nprobe=config.embedding.ivf_nprobe
+                )
+                _, indices, latencies = timed_search(index, query_vectors, args.k)
+                rows.append({
+                    "table": table.strip(), "column": column, "rows": len(vectors), "type": index_type,
+                    "build_s": build_time, "recall": recall_at_k(indices, exact_indices),
+                    **latency_stats(latencies),
+                })
+
+    print(f"\nrecall@{args.k}, задержка одного запроса в мс, {len(queries)} запросов")
+    print_table(rows, ["table", "column", "rows", "type", "build_s", "recall", "p50", "p99"])
+
+
+if __name__ == "__main__":
+    main()
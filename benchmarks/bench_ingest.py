@@ -0,0 +1,106 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║               Модуль benchmarks/bench_ingest.py            ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Чтение прайс-листа Excel двумя способами:
+        • pandas    - pd.ExcelFile + parse всех листов (вся книга в памяти)
+        • streaming - openpyxl read_only порциями (iter_sheet_chunks)
+
+        Каждый способ измеряется в отдельном процессе: время чтения всех
+        листов и пиковый RSS процесса (RssMonitor). Строки только читаются
+        и разбираются на разделы, база данных не изменяется.
+
+    Запуск:
+        python -m benchmarks.bench_ingest --chunk-rows 1000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from time import perf_counter
+
+import pandas as pd
+
+from src.utils         import logger
+from config            import config
+
+from src.managers.manager_filters import assign_categories
+from src.managers.manager_ingest  import RssMonitor, iter_sheet_chunks, read_sheet_names
+
+from benchmarks.common import print_table
+
+
+METHODS = ("pandas", "streaming")
+KEY_COLUMN = "Артикул"
+
+
+def read_pandas(path, chunk_rows):
+    rows = 0
+    excel_file = pd.ExcelFile(path)
+    for sheet_name in excel_file.sheet_names:
+        df = excel_file.parse(sheet_name)
+        if KEY_COLUMN in df.columns:
+            df = assign_categories(df, key_column=KEY_COLUMN)
+        rows += len(df)
+    return rows
+
+
+def read_streaming(path, chunk_rows):
+    return sum(
+        len(chunk)
+        for sheet_name in read_sheet_names(path)
+        for chunk in iter_sheet_chunks(path, sheet_name, chunk_rows, KEY_COLUMN)
+    )
+
+
+def worker(method, path, chunk_rows):
+    """
+        Замер в текущем процессе; результат печатается одной строкой JSON
+    """
+    read = read_pandas if method == "pandas" else read_streaming
+    with RssMonitor() as rss:
+        start = perf_counter()
+        rows = read(path, chunk_rows)
+        elapsed = perf_counter() - start
+
+    print(json.dumps({
+        "method":       method,
+        "rows":         rows,
+        "time_s":       elapsed,
+        "peak_rss_mb":  rss.peak / 2**20,
+        "rss_delta_mb": (rss.peak - rss.start) / 2**20,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Чтение прайс-листа: pandas против потокового openpyxl")
+    parser.add_argument("--source",     default=config.data.data_file,                   help="Файл прайс-листа Excel")
+    parser.add_argument("--chunk-rows", type=int, default=config.data.ingest_chunk_rows, help="Строк в порции")
+    parser.add_argument("--worker",     choices=METHODS,                                  help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.source, args.chunk_rows)
+        return
+
+    logger.info(f"Ingest benchmark on {args.source}, chunk_rows={args.chunk_rows}")
+
+    rows = []
+    for method in METHODS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_ingest", "--worker", method,
+             "--source", args.source, "--chunk-rows", str(args.chunk_rows)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+
+    print("\nЧтение всех листов прайс-листа")
+    print_table(rows, ["method", "rows", "time_s", "peak_rss_mb", "rss_delta_mb"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║             Модуль benchmarks/bench_quantization.py        ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Сравнение квантованных индексов (float16, int8, PQ) с полноточным
+        точным поиском на векторах каталога. Для каждой пары (таблица, колонка)
+        и каждого способа квантования выводит:
+        • размер сериализованного индекса и степень сжатия
+        • время загрузки индекса из сериализованного вида
+        • recall@k без повторного ранжирования и с ним
+        • задержку одного запроса p50/p99 (с повторным ранжированием)
+
+    Запуск:
+        python -m benchmarks.bench_quantization --k 5 --type flat
+"""
+
+import argparse
+import faiss
+
+from time import perf_counter
+
+from src.utils                  import logger
+from src.managers               import DataManager, EmbeddingManager
+from src.managers.manager_index import (
+    SharedFlatIndex, RerankIndex, INDEX_TYPES, QUANTIZATIONS, build_faiss_index, tune_index
+)
+from config                     import config
+
+from benchmarks.common          import load_spec_queries, timed_search, recall_at_k, latency_stats, print_table
+
+
+COLUMNS = ["Наименование", "Описание"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Качество и размер квантованных индексов")
+    parser.add_argument("--k",     type=int, default=5,      help="Число ближайших соседей")
+    parser.add_argument("--limit", type=int, default=500,    help="Максимум запросов (0 - все)")
+    parser.add_argument("--type",  default="flat", choices=INDEX_TYPES, help="Структура индекса")
+    args = parser.parse_args()
+
+    dm = DataManager(config.data.data_file)
+    em = EmbeddingManager(dm)
+
+    queries = load_spec_queries(limit=args.limit)
+    logger.info(f"Encoding {len(queries)} benchmark queries")
+    query_vectors = em.encode_queries(queries)
+    query_vectors /= (query_vectors ** 2).sum(axis=1, keepdims=True) ** 0.5
+
+    rows = []
+    for table in dm.get_all_table_names():
+        for column in COLUMNS:
+            vectors = em.load_embeddings(table, column)
+            _, exact_indices, _ = timed_search(SharedFlatIndex(vectors), query_vectors, args.k)
+            full_size = vectors.nbytes
+
+            for quantization in QUANTIZATIONS:
+                index = build_faiss_index(
+                    vectors, args.type, quantization,
+                    hnsw_m=config.embedding.hnsw_m,
+                    ivf_nlist=config.embedding.ivf_nlist,
+                    pq_m=config.embedding.pq_m
+                )
+                serialized = faiss.serialize_index(index)
+
+                start = perf_counter()
+                index = faiss.deserialize_index(serialized)
+                load_time = perf_counter() - start
+
+                index = tune_index(
+                    index,
+                    hnsw_ef_search=config.embedding.hnsw_ef_search,
+                    ivf_nprobe=config.embedding.ivf_nprobe
+                )
+                _, raw_indices, _ = timed_search(index, query_vectors, args.k)
+                reranked = RerankIndex(index, vectors, config.embedding.rerank_factor)
+                _, indices, latencies = timed_search(reranked, query_vectors, args.k)
+
+                rows.append({
+                    "table":        table.strip(),
+                    "column":       column,
+                    "quant":        quantization,
+                    "size_kb":      serialized.nbytes / 1024,
+                    "ratio":        full_size / serialized.nbytes,
+                    "load_ms":      load_time * 1000,
+                    "recall_raw":   recall_at_k(raw_indices, exact_indices),
+                    "recall":       recall_at_k(indices, exact_indices),
+                    **latency_stats(latencies),
+                })
+
+    print(
+        f"\nrecall@{args.k} относительно точного поиска, индекс {args.type}, "
+        f"повторное ранжирование x{config.embedding.rerank_factor}, {len(queries)} запросов"
+    )
+    print_table(rows, ["table", "column", "quant", "size_kb", "ratio", "load_ms", "recall_raw", "recall", "p50", "p99"])
+
+
+if __name__ == "__main__":
+    main()
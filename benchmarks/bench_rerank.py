@@ -0,0 +1,184 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║               Модуль benchmarks/bench_rerank.py            ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Точность и задержка второго этапа ранжирования кандидатов.
+        Спецификации tests/data/excel/test_*.xlsx не размечены, поэтому
+        точность считается на размеченных запросах, полученных искажением
+        наименований каталога (регистр, пропуск и перестановка слов), где
+        верный товар известен. Запросы делятся пополам: на первой половине
+        обучается линейная модель (--fit), на второй считаются метрики:
+        • acc@1 и MRR@10 - место верного товара после переоценки
+        • in_candidates  - доля запросов, где верный товар среди кандидатов
+                           (верхняя граница для любого второго этапа)
+        • p50/p99 переоценки на запрос и число выходов за бюджет
+
+        На запросах из спецификаций выводятся задержка и доля совпадения
+        лучшего товара с дешевой оценкой.
+
+    Запуск:
+        python -m benchmarks.bench_rerank --fit --cross --budget 150
+"""
+
+import asyncio
+import argparse
+import os
+import random
+import numpy as np
+
+from time import perf_counter
+
+from src.utils         import logger, ExcelProcessor
+from config            import config
+
+from src.managers.manager_rerank import LinearReranker, CrossEncoderReranker, RerankStage
+
+from benchmarks.common import load_spec_queries, latency_stats, print_table
+
+
+COLUMN = "Наименование"
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    """
+        Наименование в виде, похожем на строку клиентской спецификации
+    """
+    words = name.lower().replace("(", " ").replace(")", " ").split()
+    if len(words) > 3:
+        words.pop(rng.randrange(1, len(words)))
+    if len(words) > 2:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    return " ".join(words)
+
+
+async def collect(processor: ExcelProcessor, queries, tables_data, processed_names, top_k: int):
+    """
+        Кандидаты и их признаки для списка запросов
+    """
+    candidates = await processor.embedding_manager.asearch_catalog_many(COLUMN, queries, top_k)
+    collected = []
+    for query, query_candidates in zip(queries, candidates):
+        collected.append(await processor._candidate_features(query, query_candidates, tables_data, processed_names))
+    return collected
+
+
+def evaluate(stage: RerankStage, queries, collected, targets=None):
+    """
+        Переоценка всех запросов: задержки, лучшие кандидаты и места верного товара
+    """
+    latencies, top, ranks = [], [], []
+    for n, (query, (found, names, features, cheap_scores)) in enumerate(zip(queries, collected)):
+        start = perf_counter()
+        ranking = stage.run(query, names, features, cheap_scores)
+        latencies.append((perf_counter() - start) * 1000)
+
+        keys = [found[position][:2] for position, _ in ranking]
+        top.append(keys[0] if keys else None)
+        if targets is not None:
+            ranks.append(keys.index(targets[n]) + 1 if targets[n] in keys else None)
+    return latencies, top, ranks
+
+
+def accuracy_row(name: str, stage: RerankStage, latencies, ranks):
+    stats = latency_stats(latencies)
+    return {
+        "reranker":      name,
+        "acc@1":         float(np.mean([rank == 1 for rank in ranks])),
+        "mrr@10":        float(np.mean([1 / rank if rank and rank <= 10 else 0.0 for rank in ranks])),
+        "in_candidates": float(np.mean([rank is not None for rank in ranks])),
+        "p50_ms":        stats["p50"],
+        "p99_ms":        stats["p99"],
+        "fallbacks":     stage.fallbacks,
+    }
+
+
+def training_set(collected, targets):
+    features, labels = [], []
+    for (found, _, query_features, _), target in zip(collected, targets):
+        for position, (table, idx, _) in enumerate(found):
+            features.append(query_features[position])
+            labels.append(int((table, idx) == target))
+    return np.array(features, dtype=np.float32), np.array(labels)
+
+
+async def run(args):
+    processor = ExcelProcessor()
+    dm, em = processor.data_manager, processor.embedding_manager
+    em.query_cache.maxsize = 0
+
+    tables = dm.get_all_table_names()
+    tables_data, processed_names, _ = await processor._load_tables_async(tables)
+
+    # Размеченные запросы: искаженное наименование -> (таблица, строка)
+    rng = random.Random(args.seed)
+    catalog = [(table, idx, str(name)) for table, df in tables_data.items() for idx, name in enumerate(df[COLUMN])]
+    sample = rng.sample(catalog, min(args.labeled, len(catalog)))
+    labeled = [(perturb(name, rng), (table, idx)) for table, idx, name in sample]
+    half = len(labeled) // 2
+    train, test = labeled[:half], labeled[half:]
+    logger.info(f"Rerank benchmark: {len(train)} train / {len(test)} test labeled queries, top_k={args.top_k}")
+
+    test_queries = [query for query, _ in test]
+    test_targets = [target for _, target in test]
+    test_collected = await collect(processor, test_queries, tables_data, processed_names, args.top_k)
+
+    rerankers = {"none": None}
+    if args.fit:
+        train_collected = await collect(processor, [query for query, _ in train], tables_data, processed_names, args.top_k)
+        linear = LinearReranker.fit(*training_set(train_collected, [target for _, target in train]))
+        os.makedirs(os.path.dirname(config.embedding.reranker_weights), exist_ok=True)
+        linear.save(config.embedding.reranker_weights)
+        logger.info(f"Linear reranker weights saved to {config.embedding.reranker_weights}")
+        rerankers["linear"] = linear
+    elif os.path.exists(config.embedding.reranker_weights):
+        rerankers["linear"] = LinearReranker.load(config.embedding.reranker_weights)
+    if args.cross:
+        rerankers["cross"] = CrossEncoderReranker(config.embedding.reranker_model)
+
+    rows = []
+    for name, reranker in rerankers.items():
+        stage = RerankStage(reranker, args.budget)
+        latencies, _, ranks = evaluate(stage, test_queries, test_collected, test_targets)
+        rows.append(accuracy_row(name, stage, latencies, ranks))
+
+    print(f"\nТочность на {len(test)} размеченных запросах, бюджет {args.budget} мс")
+    print_table(rows, ["reranker", "acc@1", "mrr@10", "in_candidates", "p50_ms", "p99_ms", "fallbacks"])
+
+    spec_queries = load_spec_queries(limit=args.limit)
+    spec_collected = await collect(processor, spec_queries, tables_data, processed_names, args.top_k)
+    _, cheap_top, _ = evaluate(RerankStage(None), spec_queries, spec_collected)
+
+    rows = []
+    for name, reranker in rerankers.items():
+        stage = RerankStage(reranker, args.budget)
+        latencies, top, _ = evaluate(stage, spec_queries, spec_collected)
+        stats = latency_stats(latencies)
+        rows.append({
+            "reranker":   name,
+            "same_top1":  float(np.mean([a == b for a, b in zip(top, cheap_top)])),
+            "p50_ms":     stats["p50"],
+            "p99_ms":     stats["p99"],
+            "fallbacks":  stage.fallbacks,
+        })
+
+    print(f"\nЗапросы спецификаций ({len(spec_queries)}): задержка и совпадение лучшего товара с дешевой оценкой")
+    print_table(rows, ["reranker", "same_top1", "p50_ms", "p99_ms", "fallbacks"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Точность и задержка второго этапа ранжирования")
+    parser.add_argument("--labeled", type=int,   default=400, help="Число размеченных запросов (обучение + проверка)")
+    parser.add_argument("--top-k",   type=int,   default=config.embedding.rerank_candidates, help="Кандидатов на запрос")
+    parser.add_argument("--budget",  type=float, default=config.embedding.rerank_budget_ms, help="Бюджет переоценки, мс")
+    parser.add_argument("--fit",     action="store_true", help="Обучить линейную модель и сохранить веса (RERANKER_WEIGHTS)")
+    parser.add_argument("--cross",   action="store_true", help="Проверить кросс-энкодер (RERANKER_MODEL)")
+    parser.add_argument("--limit",   type=int,   default=0,   help="Максимум запросов спецификаций (0 - все)")
+    parser.add_argument("--seed",    type=int,   default=13,  help="Seed искажения наименований")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
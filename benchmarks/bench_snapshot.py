@@ -0,0 +1,105 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║              Модуль benchmarks/bench_snapshot.py           ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Загрузка всех листов каталога двумя способами:
+        • sqlite - pd.read_sql_table через SQLAlchemy (DataManager.read_table)
+        • arrow  - колоночный снимок Arrow IPC через mmap (DataManager.read_snapshot)
+
+        Каждый способ измеряется в отдельном процессе: холодная загрузка -
+        первая в новом процессе (страничный кэш ОС при этом может быть
+        заполнен), теплая - повторная в том же процессе. Для каждого способа
+        выводится время и прирост RSS процесса после загрузки.
+
+        Перед замером снимки перезаписываются по текущей базе.
+
+    Запуск:
+        python -m benchmarks.bench_snapshot --repeat 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from time import perf_counter
+
+import psutil
+
+from src.utils         import logger
+from src.managers      import DataManager
+from config            import config
+
+from benchmarks.common import print_table
+
+
+METHODS = ("sqlite", "arrow")
+
+
+def load_all(dm, method):
+    read = dm.read_table if method == "sqlite" else dm.read_snapshot
+    frames = [read(table) for table in dm.get_all_table_names()]
+    if any(df is None for df in frames):
+        raise RuntimeError("Arrow snapshot is missing or stale")
+    return frames
+
+
+def worker(method, repeat):
+    """
+        Замер в текущем процессе; результат печатается одной строкой JSON
+    """
+    process = psutil.Process()
+    dm = DataManager(config.data.data_file)
+    rss_before = process.memory_info().rss
+
+    start = perf_counter()
+    frames = load_all(dm, method)
+    cold = (perf_counter() - start) * 1000
+    rss_after = process.memory_info().rss
+
+    warm = []
+    for _ in range(repeat):
+        start = perf_counter()
+        load_all(dm, method)
+        warm.append((perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        "method":       method,
+        "rows":         sum(len(df) for df in frames),
+        "cold_ms":      cold,
+        "warm_ms":      min(warm) if warm else cold,
+        "rss_delta_mb": (rss_after - rss_before) / 2**20,
+        "frame_mb":     sum(df.memory_usage(deep=True).sum() for df in frames) / 2**20,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка каталога: SQLite против снимка Arrow")
+    parser.add_argument("--repeat", type=int, default=5, help="Число теплых загрузок")
+    parser.add_argument("--worker", choices=METHODS,   help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.repeat)
+        return
+
+    dm = DataManager(config.data.data_file)
+    dm.update_snapshots(dm.get_all_table_names())
+    logger.info(f"Snapshot benchmark on {len(dm.get_all_table_names())} sheets")
+
+    rows = []
+    for method in METHODS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_snapshot", "--worker", method, "--repeat", str(args.repeat)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+
+    print("\nЗагрузка всех листов каталога")
+    print_table(rows, ["method", "rows", "cold_ms", "warm_ms", "rss_delta_mb", "frame_mb"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║          Модуль benchmarks/bench_sqlite_concurrency.py     ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Нагрузочная проверка products.db: несколько читателей и один писатель.
+        Читатели в потоках выбирают строки по Артикулу (индекс B-tree) и ищут
+        по FTS5, писатель в это время держит транзакцию, перезаписывающую все
+        строки всех листов (как обновление прайса), и фиксирует ее через
+        --hold секунд.
+
+        Проверка идет на копиях базы в двух режимах:
+        • wal    - движки manager_sqlite (WAL, пул читателей, PRAGMA)
+        • legacy - один движок SQLAlchemy по умолчанию, журнал отката (DELETE)
+
+        Для каждого режима выводятся число запросов, QPS, p50/p99/max задержки
+        и ошибки чтения без записи (idle) и во время записи (write).
+
+    Запуск:
+        python -m benchmarks.bench_sqlite_concurrency --readers 8 --duration 10 --hold 2
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+from time import perf_counter, sleep
+
+import numpy as np
+
+from sqlalchemy        import create_engine, text
+
+from src.utils         import logger
+from src.managers      import DataManager
+from config            import config
+
+from src.managers.manager_sqlite import create_engines
+
+from benchmarks.common import database_copy, print_table
+
+
+MODES = ("wal", "legacy")
+
+
+def catalog_tables(db_path):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE '\\_\\_%' ESCAPE '\\'"
+        ).fetchall()
+    return [name for (name,) in rows]
+
+
+def sample_keys(db_path, tables, n):
+    """
+        Пары (таблица, Артикул) для запросов читателей
+    """
+    keys = []
+    with sqlite3.connect(db_path) as conn:
+        for table in tables:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+            if "Артикул" in columns:
+                keys.extend((table, key) for (key,) in conn.execute(
+                    f'SELECT "Артикул" FROM "{table}" WHERE "Артикул" IS NOT NULL ORDER BY random() LIMIT {n}'
+                ))
+    return keys
+
+
+def make_engines(mode, db_path, readers):
+    if mode == "wal":
+        return create_engines(db_path, read_pool_size=readers)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode = DELETE")
+    engine = create_engine(f"sqlite:///{db_path}")
+    return engine, engine
+
+
+def reader_loop(engine, keys, fts_tables, stop, phase, results):
+    rng = random.Random()
+    while not stop.is_set():
+        table, key = rng.choice(keys)
+        start = perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(f'SELECT * FROM "{table}" WHERE "Артикул" = :key'), {"key": key}).fetchall()
+                fts_table = fts_tables.get(table)
+                if fts_table:
+                    conn.execute(
+                        text(f'SELECT rowid FROM "{fts_table}" WHERE "{fts_table}" MATCH :match ORDER BY rank LIMIT 10'),
+                        {"match": '"датчик"*'}
+                    ).fetchall()
+            results[phase[0]]["latencies"].append((perf_counter() - start) * 1000)
+        except Exception:
+            results[phase[0]]["errors"] += 1
+
+
+def writer_loop(engine, tables, stop, hold, commits):
+    while not stop.is_set():
+        with engine.begin() as conn:
+            for table in tables:
+                conn.execute(text(f'UPDATE "{table}" SET rowid = rowid'))
+            stop.wait(hold)
+        commits.append(perf_counter())
+
+
+def run_mode(mode, source, readers, duration, hold, keys, tables):
+    tmp_dir = tempfile.mkdtemp(prefix=f"bench_sqlite_{mode}_")
+    db_path = os.path.join(tmp_dir, "products.db")
+    shutil.copy(source, db_path)
+    fts_tables = {table: DataManager.get_fts_table(table) for table in tables}
+    try:
+        writer, reader = make_engines(mode, db_path, readers)
+        results = {"idle": {"latencies": [], "errors": 0}, "write": {"latencies": [], "errors": 0}}
+        phase = ["idle"]
+        stop, stop_writer = threading.Event(), threading.Event()
+
+        threads = [
+            threading.Thread(target=reader_loop, args=(reader, keys, fts_tables, stop, phase, results))
+            for _ in range(readers)
+        ]
+        for thread in threads:
+            thread.start()
+        sleep(duration / 2)
+
+        phase[0] = "write"
+        commits = []
+        writer_thread = threading.Thread(target=writer_loop, args=(writer, tables, stop_writer, hold, commits))
+        writer_thread.start()
+        sleep(duration / 2)
+
+        stop_writer.set()
+        writer_thread.join()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        writer.dispose()
+        reader.dispose()
+
+        rows = []
+        for name, result in results.items():
+            latencies = result["latencies"] or [0.0]
+            rows.append({
+                "mode":    mode,
+                "phase":   name,
+                "queries": len(result["latencies"]),
+                "qps":     len(result["latencies"]) / (duration / 2),
+                "p50_ms":  float(np.percentile(latencies, 50)),
+                "p99_ms":  float(np.percentile(latencies, 99)),
+                "max_ms":  float(max(latencies)),
+                "errors":  result["errors"],
+                "commits": len(commits) if name == "write" else 0,
+            })
+        return rows
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Читатели и писатель products.db: WAL против журнала отката")
+    parser.add_argument("--readers",  type=int,   default=config.data.sqlite_read_pool, help="Потоков-читателей")
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность режима, сек (половина - с записью)")
+    parser.add_argument("--hold",     type=float, default=2.0,  help="Сколько секунд писатель держит транзакцию")
+    parser.add_argument("--modes",    nargs="+",  default=list(MODES), choices=MODES)
+    args = parser.parse_args()
+
+    with database_copy() as db_path:
+        dm = DataManager.create(config.data.data_file, db_path=db_path)
+        dm.ensure_indexes()
+        dm.checkpoint()
+        dm.dispose()
+        tables = catalog_tables(db_path)
+        keys = sample_keys(db_path, tables, 200)
+        logger.info(f"SQLite concurrency benchmark: {args.readers} readers, {len(keys)} keys, {len(tables)} sheets")
+
+        rows = []
+        for mode in args.modes:
+            rows.extend(run_mode(mode, db_path, args.readers, args.duration, args.hold, keys, tables))
+
+    print(f"\nЧтение products.db: {args.readers} читателей, запись держит транзакцию {args.hold} сек")
+    print_table(rows, ["mode", "phase", "queries", "qps", "p50_ms", "p99_ms", "max_ms", "errors", "commits"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║             Модуль benchmarks/bench_text_search.py         ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Текстовый поиск по Наименованию и Описанию всех листов двумя способами:
+        • pandas - таблицы в памяти (get_table_data) и str.contains по словам запроса
+        • fts5   - DataManager.text_search (FTS5, BM25), таблицы не загружаются
+
+        Запросы - наименования из спецификаций tests/data/excel/test_*.xlsx.
+        Выводятся задержка первого запроса (для pandas - с загрузкой таблиц),
+        p50/p99 остальных, среднее число найденных строк и доля запросов,
+        где лучший результат FTS5 есть среди строк, найденных pandas.
+
+    Запуск:
+        python -m benchmarks.bench_text_search --limit 200
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+from time import perf_counter
+
+from src.utils         import logger
+from src.managers      import DataManager
+from config            import config
+
+from src.managers.manager_price import FTS_COLUMNS
+
+from benchmarks.common import database_copy, load_spec_queries, latency_stats, print_table
+
+
+def pandas_search(dm, tables, query, limit):
+    """
+        Поиск перебором строк: все слова запроса входят в Наименование или Описание
+    """
+    tokens = dm._fts_tokens(query)
+    results = []
+    for table in tables:
+        df = dm.get_table_data(table)
+        columns = [column for column in FTS_COLUMNS if column in df.columns]
+        if not columns or not tokens:
+            continue
+        text = df[columns].astype(str).agg(" ".join, axis=1).str.lower().str.replace("ё", "е")
+        mask = pd.Series(True, index=df.index)
+        for token in tokens:
+            mask &= text.str.contains(token, regex=False)
+        results.extend((table, int(row), 1.0) for row in np.flatnonzero(mask.to_numpy()))
+    return results
+
+
+def fts_search(dm, tables, query, limit):
+    return dm.text_search(tables, query, limit)
+
+
+def measure(dm, tables, queries, search, limit):
+    start = perf_counter()
+    first = search(dm, tables, queries[0], limit)
+    cold = (perf_counter() - start) * 1000
+
+    latencies, found = [], [first]
+    for query in queries[1:]:
+        start = perf_counter()
+        found.append(search(dm, tables, query, limit))
+        latencies.append((perf_counter() - start) * 1000)
+    return cold, latencies, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Текстовый поиск: pandas против FTS5")
+    parser.add_argument("--limit",   type=int, default=0,  help="Максимум запросов спецификаций (0 - все)")
+    parser.add_argument("--top-k",   type=int, default=10, help="Результатов FTS5 на запрос")
+    args = parser.parse_args()
+
+    with database_copy() as db_path:
+        dm = DataManager.create(config.data.data_file, db_path=db_path)
+        dm.ensure_indexes()
+        try:
+            run(dm, args)
+        finally:
+            dm.dispose()
+
+
+def run(dm, args):
+    tables = dm.get_all_table_names()
+    queries = load_spec_queries(limit=args.limit)
+    logger.info(f"Text search benchmark: {len(queries)} queries on {len(tables)} sheets")
+
+    dm.clear_table_cache()
+    pandas_cold, pandas_latencies, pandas_found = measure(dm, tables, queries, pandas_search, args.top_k)
+    fts_cold, fts_latencies, fts_found = measure(dm, tables, queries, fts_search, args.top_k)
+
+    agree = [
+        not fts or (fts[0][0], fts[0][1]) in {(table, row) for table, row, _ in scan}
+        for fts, scan in zip(fts_found, pandas_found)
+        if scan
+    ]
+
+    rows = []
+    for method, cold, latencies, found in (
+        ("pandas", pandas_cold, pandas_latencies, pandas_found),
+        ("fts5",   fts_cold,    fts_latencies,    fts_found),
+    ):
+        stats = latency_stats(latencies or [cold])
+        rows.append({
+            "method":  method,
+            "cold_ms": cold,
+            "p50_ms":  stats["p50"],
+            "p99_ms":  stats["p99"],
+            "hits":    float(np.mean([len(results) for results in found])),
+        })
+
+    print(f"\nТекстовый поиск по {len(tables)} листам, {len(queries)} запросов")
+    print_table(rows, ["method", "cold_ms", "p50_ms", "p99_ms", "hits"])
+    print(f"\nЛучший результат FTS5 найден и перебором pandas: {float(np.mean(agree)) if agree else 0.0:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль benchmarks/common.py             ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Общие функции для бенчмарков поиска:
+        • Загрузка запросов из спецификаций tests/data/excel/test_*.xlsx
+        • Измерение задержки поиска по одному запросу
+        • Расчет recall@k и перцентилей задержки
+        • Вывод результатов в виде таблицы
+        • Временная копия базы каталога, в которой строятся индексы
+
+    Бенчмарки запускаются из корня проекта в окружении бота, например:
+        python -m benchmarks.bench_index
+"""
+
+import glob
+import os
+import shutil
+import sqlite3
+import tempfile
+import numpy as np
+import pandas as pd
+
+from contextlib import contextmanager
+from time       import perf_counter
+from typing     import Dict, List, Sequence, Tuple
+
+
+SPEC_FILES = "tests/data/excel/test_*.xlsx"
+
+PRODUCTS_DB = "data/db/products.db"
+
+# Варианты названия колонки с наименованием (как в ExcelProcessor.required_columns)
+NAME_COLUMN_ALIASES = ['наименование', 'название', 'имя', 'name', 'title']
+
+
+def load_spec_queries(pattern: str = SPEC_FILES, limit: int = 0) -> List[str]:
+    """
+        Наименования товаров из клиентских спецификаций (без повторов)
+    """
+    queries = []
+    for path in sorted(glob.glob(pattern)):
+        for sheet_name, df in pd.read_excel(path, sheet_name=None).items():
+            name_col = next(
+                (col for col in df.columns if any(alias in str(col).lower() for alias in NAME_COLUMN_ALIASES)),
+                None
+            )
+            if name_col is None:
+                continue
+            for value in df[name_col].dropna():
+                text = " ".join(str(value).split())
+                if len(text) > 3:
+                    queries.append(text)
+
+    queries = list(dict.fromkeys(queries))
+    return queries[:limit] if limit else queries
+
+
+@contextmanager
+def database_copy(db_path: str = PRODUCTS_DB):
+    """
+        Копия базы каталога (вместе с WAL) во временном каталоге: бенчмарки
+        строят в ней недостающие индексы, не изменяя базу из репозитория
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="bench_db_")
+    try:
+        path = os.path.join(tmp_dir, os.path.basename(db_path))
+        with sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True) as source, sqlite3.connect(path) as target:
+            source.backup(target)
+        yield path
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def timed_search(index, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Поиск по одному запросу за раз: возвращает D, I и задержки в миллисекундах
+    """
+    distances, indices, latencies = [], [], []
+    for query in queries:
+        start = perf_counter()
+        d, i = index.search(query[None, :], k)
+        latencies.append((perf_counter() - start) * 1000)
+        distances.append(d[0])
+        indices.append(i[0])
+    return np.array(distances), np.array(indices), np.array(latencies)
+
+
+def recall_at_k(approx: np.ndarray, exact: np.ndarray) -> float:
+    """
+        Доля точных k ближайших соседей, найденных приближенным поиском
+    """
+    hits = [
+        len(set(a[a >= 0]) & set(e[e >= 0])) / max(1, len(e[e >= 0]))
+        for a, e in zip(approx, exact)
+    ]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def latency_stats(latencies: Sequence[float]) -> Dict[str, float]:
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+    }
+
+
+def print_table(rows: List[Dict], columns: List[str]):
+    """
+        Печать результатов бенчмарка в виде выровненной таблицы
+    """
+    def fmt(value):
+        return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    widths = {col: max(len(col), *(len(fmt(row[col])) for row in rows)) for col in columns} if rows else {}
+    print("  ".join(col.ljust(widths.get(col, len(col))) for col in columns))
+    for row in rows:
+        print("  ".join(fmt(row[col]).ljust(widths[col]) for col in columns))
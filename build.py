@@ -0,0 +1,56 @@
+"""
+    ╔════════════════════════════════════════════╗
+    ║                build.py                    ║
+    ╚════════════════════════════════════════════╝
+    
+    Описание:
+        Офлайн-сборка каталога, отделенная от процесса бота:
+        • Загрузка прайс-листа Excel в SQLite
+        • Предобработка и лематизация всех строк на всех ядрах
+        • Кодирование эмбеддингов и построение индексов FAISS
+        • Запись версионированной сборки (база, векторы, индексы, манифест)
+          и ее публикация для бота
+
+        Бот при старте загружает опубликованную сборку и не выполняет
+        тяжелую обработку каталога сам.
+
+    Запуск:
+        python build.py
+        python build.py --source data/excel/price-list.xlsx --workers 8 --no-publish
+
+        Бот запускает сборку сам при загрузке нового прайс-листа
+        (CatalogManager.rebuild) и переключается на нее без остановки.
+"""
+
+
+
+import os
+import argparse
+
+from src.utils    import logger
+from src.managers import build_artifact
+
+from config       import config
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-сборка каталога для бота")
+    parser.add_argument("--source",     default=str(config.data.data_file),     help="Прайс-лист Excel")
+    parser.add_argument("--output",     default=str(config.data.artifacts_dir), help="Каталог сборок")
+    parser.add_argument("--workers",    type=int, default=None,                 help="Число ядер (по умолчанию все)")
+    parser.add_argument("--no-publish", action="store_true",                    help="Не делать сборку текущей")
+    parser.add_argument("--version",    default=None,                           help="Имя версии (по умолчанию время и sha256)")
+    parser.add_argument("--nice",       type=int, default=0,                    help="Понизить приоритет процесса (фоновая сборка из бота)")
+    args = parser.parse_args()
+
+    if args.nice and hasattr(os, "nice"):
+        os.nice(args.nice)
+
+    artifact = build_artifact(args.source, args.output, args.workers, publish=not args.no_publish, version=args.version)
+    logger.info(f"Catalog artifact is ready: {artifact.path}")
+    print(f"[✓] Сборка каталога {artifact.version}: {artifact.path}")
+
+
+if __name__ == '__main__':
+    main()
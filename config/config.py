@@ -27,7 +27,53 @@
       - API_AI       - endpoint для AI-сервиса
     
     • Данные:
-      - DATA_FILE    - путь к файлу с данными
+      - DATA_FILE     - путь к файлу с данными
+      - ARTIFACTS_DIR - каталог готовых сборок каталога (python build.py);
+                        бот загружает текущую сборку, если она есть
+      - ARTIFACTS_KEEP - сколько последних сборок хранить на диске (включая текущую);
+                         сборки, которые еще обслуживают запросы, не удаляются
+      - VACUUM_FREE_RATIO - доля свободных страниц базы, при которой после
+                            обновления прайса выполняется VACUUM
+      - INGEST_CHUNK_ROWS - строк Excel в одной порции потоковой загрузки
+      - SQLITE_MMAP_MB, SQLITE_CACHE_MB - mmap и кэш страниц на соединение SQLite, МБ
+      - SQLITE_SYNCHRONOUS     - PRAGMA synchronous (NORMAL достаточно для WAL)
+      - SQLITE_BUSY_TIMEOUT_MS - ожидание блокировки базы, мс
+      - SQLITE_READ_POOL       - соединений только для чтения на базу
+      - SQLITE_POOL_TIMEOUT    - ожидание свободного соединения пула, сек
+
+    • Эмбеддинги:
+      - QUERY_CACHE_SIZE - размер LRU-кэша векторов запросов
+      - QUERY_CACHE_TTL  - время жизни записи кэша, сек (0 - без ограничения)
+      - INDEX_TYPE       - тип индекса по умолчанию: flat, hnsw, ivf
+      - INDEX_QUANTIZATION - квантование векторов по умолчанию: none, fp16, int8, pq
+      - INDEX_OVERRIDES  - тип[:квантование] индекса для отдельных пар, например
+                           "УОК, ЭОР.Описание=hnsw:int8;Цифровые лаборатории.Наименование=flat"
+      - HNSW_M, HNSW_EF_SEARCH, IVF_NLIST, IVF_NPROBE, PQ_M - параметры индексов
+      - RERANK_FACTOR    - во сколько раз больше кандидатов отбирает квантованный
+                           индекс для точного повторного ранжирования
+      - EMBEDDING_LAZY_START - прогревать модель и индексы в фоне после старта бота
+      - WARMUP_WAIT_TIMEOUT  - сколько секунд запрос ждет окончания прогрева
+      - ENCODER_BACKEND  - бэкенд кодировщика: torch, torch-int8, onnx, onnx-int8
+      - ENCODER_ONNX_QUANTIZATION - набор инструкций для onnx-int8: arm64, avx2, avx512, avx512_vnni
+      - ENCODER_PARITY_MIN - минимальная косинусная близость бэкенда к torch
+                             (проверка: python -m benchmarks.bench_encoder)
+      - ENCODE_BATCH_SIZE    - максимальный размер батча общей очереди кодирования
+      - ENCODE_BATCH_WAIT_MS - окно сбора батча после первого запроса, мс
+      - SEARCH_WORKERS       - число потоков пула поиска для обработчиков
+      - SEARCH_MAX_PENDING   - максимум одновременных задач в пуле поиска
+      - HYBRID_CANDIDATES       - кандидатов BM25 и FAISS на запрос перед слиянием RRF
+      - HYBRID_FASTPATH_OVERLAP - доля общих токенов лучшего BM25-результата с запросом,
+                                  при которой модель не вызывается (0 - быстрый путь выключен)
+      - HYBRID_FASTPATH_MARGIN  - во сколько раз оценка BM25 лучшего результата должна
+                                  превышать второй для быстрого пути
+      - RRF_K                   - константа сглаживания Reciprocal Rank Fusion
+      - RERANKER          - второй этап ранжирования кандидатов: none, linear, cross
+      - RERANK_CANDIDATES - кандидатов на наименование для второго этапа
+      - RERANK_BUDGET_MS  - бюджет времени переоценки на наименование, мс; остальные
+                            кандидаты сохраняют дешевую оценку
+      - RERANKER_MODEL    - модель кросс-энкодера (RERANKER=cross)
+      - RERANKER_WEIGHTS  - веса линейной модели (RERANKER=linear,
+                            обучение: python -m benchmarks.bench_rerank --fit)
 """
 
 
@@ -35,7 +81,7 @@
 import os
 from pathlib     import Path
 from dotenv      import load_dotenv
-from typing      import List
+from typing      import List, Dict, Tuple
 from dataclasses import dataclass
 
 
@@ -102,24 +148,138 @@ class DataConfig:
     """
         Конфигурация данных
     """
-    data_file: Path
+    data_file:              Path
+    artifacts_dir:          Path
+    artifacts_keep:         int
+    vacuum_free_ratio:      float
+    ingest_chunk_rows:      int
+    sqlite_mmap_mb:         int
+    sqlite_cache_mb:        int
+    sqlite_synchronous:     str
+    sqlite_busy_timeout_ms: int
+    sqlite_read_pool:       int
+    sqlite_pool_timeout:    float
 
     @classmethod
     def from_env(cls) -> 'DataConfig':
         return cls(
-            data_file = Path("data/excel/" + os.getenv("DATA_FILE"))
+            data_file              = Path("data/excel/" + os.getenv("DATA_FILE")),
+            artifacts_dir          = Path(os.getenv("ARTIFACTS_DIR", "data/artifacts")),
+            artifacts_keep         = int(os.getenv("ARTIFACTS_KEEP", "3")),
+            vacuum_free_ratio      = float(os.getenv("VACUUM_FREE_RATIO", "0.25")),
+            ingest_chunk_rows      = int(os.getenv("INGEST_CHUNK_ROWS", "1000")),
+            sqlite_mmap_mb         = int(os.getenv("SQLITE_MMAP_MB", "256")),
+            sqlite_cache_mb        = int(os.getenv("SQLITE_CACHE_MB", "64")),
+            sqlite_synchronous     = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper(),
+            sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+            sqlite_read_pool       = int(os.getenv("SQLITE_READ_POOL", "8")),
+            sqlite_pool_timeout    = float(os.getenv("SQLITE_POOL_TIMEOUT", "30")),
+        )
+
+
+@dataclass
+class EmbeddingConfig:
+    """
+        Конфигурация эмбеддингов и поиска
+    """
+    query_cache_size:          int
+    query_cache_ttl:           float
+    index_type:                str
+    index_quantization:        str
+    index_overrides:           Dict[str, str]
+    hnsw_m:                    int
+    hnsw_ef_search:            int
+    ivf_nlist:                 int
+    ivf_nprobe:                int
+    pq_m:                      int
+    rerank_factor:             int
+    lazy_start:                bool
+    warmup_wait_timeout:       float
+    encoder_backend:           str
+    encoder_onnx_quantization: str
+    encoder_parity_min:        float
+    encode_batch_size:         int
+    encode_batch_wait_ms:      float
+    search_workers:            int
+    search_max_pending:        int
+    hybrid_candidates:         int
+    hybrid_fastpath_overlap:   float
+    hybrid_fastpath_margin:    float
+    rrf_k:                     int
+    reranker:                  str
+    rerank_candidates:         int
+    rerank_budget_ms:          float
+    reranker_model:            str
+    reranker_weights:          str
+
+    @classmethod
+    def from_env(cls) -> 'EmbeddingConfig':
+        return cls(
+            query_cache_size          = int(os.getenv("QUERY_CACHE_SIZE", "4096")),
+            query_cache_ttl           = float(os.getenv("QUERY_CACHE_TTL", "0")),
+            index_type                = os.getenv("INDEX_TYPE", "flat").strip().lower(),
+            index_quantization        = os.getenv("INDEX_QUANTIZATION", "none").strip().lower(),
+            index_overrides           = cls.parse_overrides(os.getenv("INDEX_OVERRIDES", "")),
+            hnsw_m                    = int(os.getenv("HNSW_M", "32")),
+            hnsw_ef_search            = int(os.getenv("HNSW_EF_SEARCH", "64")),
+            ivf_nlist                 = int(os.getenv("IVF_NLIST", "256")),
+            ivf_nprobe                = int(os.getenv("IVF_NPROBE", "8")),
+            pq_m                      = int(os.getenv("PQ_M", "64")),
+            rerank_factor             = int(os.getenv("RERANK_FACTOR", "4")),
+            lazy_start                = os.getenv("EMBEDDING_LAZY_START", "1").strip().lower() in ("1", "true", "yes"),
+            warmup_wait_timeout       = float(os.getenv("WARMUP_WAIT_TIMEOUT", "120")),
+            encoder_backend           = os.getenv("ENCODER_BACKEND", "torch").strip().lower(),
+            encoder_onnx_quantization = os.getenv("ENCODER_ONNX_QUANTIZATION", "avx2").strip().lower(),
+            encoder_parity_min        = float(os.getenv("ENCODER_PARITY_MIN", "0.99")),
+            encode_batch_size         = int(os.getenv("ENCODE_BATCH_SIZE", "32")),
+            encode_batch_wait_ms      = float(os.getenv("ENCODE_BATCH_WAIT_MS", "5")),
+            search_workers            = int(os.getenv("SEARCH_WORKERS", "4")),
+            search_max_pending        = int(os.getenv("SEARCH_MAX_PENDING", "64")),
+            hybrid_candidates         = int(os.getenv("HYBRID_CANDIDATES", "50")),
+            hybrid_fastpath_overlap   = float(os.getenv("HYBRID_FASTPATH_OVERLAP", "0.8")),
+            hybrid_fastpath_margin    = float(os.getenv("HYBRID_FASTPATH_MARGIN", "1.5")),
+            rrf_k                     = int(os.getenv("RRF_K", "60")),
+            reranker                  = os.getenv("RERANKER", "none").strip().lower(),
+            rerank_candidates         = int(os.getenv("RERANK_CANDIDATES", "50")),
+            rerank_budget_ms          = float(os.getenv("RERANK_BUDGET_MS", "150")),
+            reranker_model            = os.getenv("RERANKER_MODEL", "DiTy/cross-encoder-russian-msmarco"),
+            reranker_weights          = os.getenv("RERANKER_WEIGHTS", "data/models/reranker_linear.json"),
         )
 
+    @staticmethod
+    def parse_overrides(value: str) -> Dict[str, str]:
+        """
+            Разбор строки вида "Таблица.Колонка=тип[:квантование];Таблица.Колонка=тип"
+        """
+        overrides = {}
+        for item in value.split(";"):
+            if "=" not in item:
+                continue
+            key, index_type = item.rsplit("=", 1)
+            overrides[key.strip()] = index_type.strip().lower()
+        return overrides
+
+    def get_index_settings(self, table: str, column: str) -> Tuple[str, str]:
+        """
+            Тип индекса и квантование для пары (таблица, колонка)
+        """
+        override = self.index_overrides.get(f"{table.strip()}.{column}")
+        if not override:
+            return self.index_type, self.index_quantization
+        index_type, _, quantization = override.partition(":")
+        return index_type, quantization or self.index_quantization
+
 
 class Config:
     """
         Основной класс конфигурации
     """
     def __init__(self):
-        self.bot      = BotConfig.from_env()
-        self.users    = UserConfig.from_env()
-        self.services = ServiceConfig.from_env()
-        self.data     = DataConfig.from_env()
+        self.bot       = BotConfig.from_env()
+        self.users     = UserConfig.from_env()
+        self.services  = ServiceConfig.from_env()
+        self.data      = DataConfig.from_env()
+        self.embedding = EmbeddingConfig.from_env()
         
     def validate(self) -> bool:
         """
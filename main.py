@@ -13,6 +13,8 @@
         • DataManager      - управление данными и их хранением
         • UserManager      - управление пользователями и их данными
         • EmbeddingManager - работа с векторными представлениями
+        • CatalogArtifact  - готовая сборка каталога (python build.py)
+        • CatalogManager   - текущая версия каталога и ее подмена без остановки
         • RasaClient       - взаимодействие с rasa-моделью
         
     Зависимости:
@@ -24,13 +26,15 @@
 
 import asyncio
 
+from time                       import perf_counter
+
 from aiogram                    import Bot, Dispatcher
 from aiogram.enums              import ParseMode
 from aiogram.client.default     import DefaultBotProperties
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from src.handlers               import register_handlers
-from src.managers               import DataManager, UserManager, EmbeddingManager
+from src.managers               import DataManager, UserManager, EmbeddingManager, CatalogArtifact, Catalog, CatalogManager
 from src.services               import RasaClient
 from src.utils                  import logger
 
@@ -43,9 +47,34 @@ async def main():
         Основная функция инициализации и запуска бота
     """
     
-    dm = DataManager.initialize(config.data.data_file)
-    em = EmbeddingManager(dm)
+    # Готовая сборка каталога (python build.py) загружается без обработки Excel и кодирования
+    artifact = CatalogArtifact.current(config.data.artifacts_dir)
+
+    # Прайс-лист сверяется с отпечатком сборки или базы (размер, время изменения, sha256):
+    # пустая база загружается сразу, устаревший каталог пересобирается в фоне
+    start = perf_counter()
+    if artifact:
+        logger.info(f"Loading catalog artifact {artifact.version}")
+        dm = DataManager(config.data.data_file, db_path=artifact.db_path)
+        changed, reason = artifact.source_changed(config.data.data_file)
+        decision = {"action": "stale" if changed else "fresh", "reason": reason, "seconds": perf_counter() - start}
+    else:
+        dm = DataManager.initialize(config.data.data_file)
+        decision = dm.startup_decision
+    logger.info(f"Startup decision for {config.data.data_file}: {decision['action']} ({decision['reason']}) in {decision['seconds']:.2f}s")
+    logger.info(f"Startup phase 'data' took {perf_counter() - start:.2f}s")
+
+    # В ленивом режиме модель и индексы прогреваются в фоне после старта polling
+    start = perf_counter()
+    if artifact:
+        em = EmbeddingManager(dm, base_path=artifact.embeddings_path, lazy=config.embedding.lazy_start, prebuilt=True)
+    else:
+        em = EmbeddingManager(dm, lazy=config.embedding.lazy_start)
+    logger.info(f"Startup phase 'embeddings' took {perf_counter() - start:.2f}s")
+
+    start = perf_counter()
     um = UserManager()
+    logger.info(f"Startup phase 'users' took {perf_counter() - start:.2f}s")
     
     
     if not await RasaClient.check_availability():
@@ -64,12 +93,25 @@ async def main():
     bot.um = um
     bot.em = em
 
+    # Версии каталога: запросы берут версию в аренду, новая сборка подменяет текущую
+    bot.catalogs = CatalogManager(Catalog(dm, em, artifact))
+
+    def on_catalog_swap(catalog):
+        bot.dm, bot.em = catalog.dm, catalog.em
+    bot.catalogs.on_swap(on_catalog_swap)
+    bot.catalogs.collect_garbage()
+
+    if decision["action"] == "stale":
+        logger.info("Catalog is stale, rebuilding it in the background")
+        bot.catalogs.rebuild_in_background(config.data.data_file)
+
     # Создание диспетчера и регистрация обработчиков
     dp = Dispatcher(storage=MemoryStorage())
     register_handlers(dp)
 
     # Запуск бота и обработка исключений
     try:
+        em.start_warmup()
         logger.info("Starting polling")
         await dp.start_polling(bot)
     except KeyboardInterrupt:
@@ -17,12 +17,15 @@
         - Навигация по административному интерфейсу
 """
 
+from time                      import perf_counter
+
 from aiogram                   import types
 from src.utils                 import logger
 from aiogram.types             import InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
 from aiogram.utils.markdown    import hbold, hcode
-from src.managers.manager_user import User
+from src.managers.manager_sqlite import pool_stats
 from src.filters               import filter_only_admin
+from config                    import config
 
 
 
@@ -157,8 +160,7 @@ async def admin_get_users_callback_handler(callback: types.CallbackQuery):
     if callback.data == "admin_get_users":
         logger.info(f"Get admin list users command from by {callback.from_user.id}")
         try:
-            session = callback.bot.um.Session()
-            users = session.query(User).all()
+            users = callback.bot.um.get_all_users()
 
             user_lines = []
             for u in users:
@@ -190,9 +192,26 @@ async def admin_update_db_callback_handler(callback: types.CallbackQuery):
     if callback.data == "admin_update_db":
         logger.info(f"Update database command from by {callback.from_user.id}")
         try:
-            callback.bot.dm.update_database()
+            catalogs = callback.bot.catalogs
+            if catalogs.current.artifact:
+                # Сборку каталога не изменяют на месте: собирается и подменяет ее новая версия
+                start = perf_counter()
+                catalog = await catalogs.rebuild(config.data.data_file)
+                text = f"✅ Каталог версии {catalog.version} готов за {perf_counter() - start:.1f} с"
+            else:
+                catalog = catalogs.current
+
+                def update():
+                    changes = catalog.dm.update_database()
+                    # Перекодируются только новые и измененные строки прайса
+                    catalog.em.apply_changes(changes)
+                    return changes
+
+                # Запросы не видят базу, уже обновленную, со старыми векторами
+                changes = await catalogs.update_in_place(update)
+                text = f"✅ База данных успешно обновлена за {changes.duration:.1f} с\n{changes.summary()}"
             await callback.message.edit_text(
-                text="✅ База данных успешно обновлена",
+                text=text,
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=[
                     [InlineKeyboardButton(text="⬅️ Назад", callback_data="admin_back")]
                 ])
@@ -210,12 +229,43 @@ async def admin_useful_button_callback_handler(callback: types.CallbackQuery):
     if callback.data == "useful_button":
         logger.info(f"Back admin menu by {callback.from_user.id}")
         try:
+            stats = callback.bot.em.inference_stats()
+            batcher, cache, rerank = stats["batcher"], stats["query_cache"], stats["rerank"]
+            tables = callback.bot.dm.table_cache_stats()
+            catalog = callback.bot.catalogs.stats()
+            products_pool, users_pool = pool_stats(callback.bot.dm.read_engine), pool_stats(callback.bot.um.read_engine)
             await callback.message.edit_text(
                 text = (
                     "🪲 <b>Полезная инфа для дебага:</b>\n\n"
                     
                     "ССЫЛКИ:\n"
                     "• FastApiDocs - http://127.0.0.1:8000/docs\n\n"
+
+                    "ОЧЕРЕДЬ КОДИРОВАНИЯ:\n"
+                    f"• Глубина очереди - {batcher['queue_depth']}\n"
+                    f"• Батчей / текстов - {batcher['batches']} / {batcher['items']}\n"
+                    f"• Средний размер батча - {batcher['avg_batch_size']:.1f}\n"
+                    f"• Ожидание p50 / p99 - {batcher['wait_ms_p50']:.1f} / {batcher['wait_ms_p99']:.1f} мс\n"
+                    f"• Проход модели p50 / p99 - {batcher['encode_ms_p50']:.1f} / {batcher['encode_ms_p99']:.1f} мс\n"
+                    f"• Попадания в кэш запросов - {cache['hit_rate']:.0%}\n\n"
+
+                    "ПЕРЕОЦЕНКА КАНДИДАТОВ:\n"
+                    f"• Модель - {rerank['reranker']}\n"
+                    f"• Наименований / выход за бюджет - {rerank['queries']} / {rerank['fallbacks']}\n"
+                    f"• Среднее время - {rerank['avg_time_ms']:.1f} мс\n\n"
+
+                    "ТАБЛИЦЫ В ПАМЯТИ:\n"
+                    f"• Таблиц - {len(tables['tables'])}, {tables['bytes'] / 2**20:.1f} МБ\n"
+                    f"• Попадания в кэш таблиц - {tables['hit_rate']:.0%}\n\n"
+
+                    "ВЕРСИЯ КАТАЛОГА:\n"
+                    f"• Текущая - {catalog['version']} (запросов {catalog['leases']}), подмен - {catalog['swaps']}\n"
+                    f"• Собирается - {catalog['building'] or 'нет'}\n"
+                    f"• Ожидают завершения запросов - {len(catalog['retired'])}\n\n"
+
+                    "СОЕДИНЕНИЯ SQLITE (ЧТЕНИЕ):\n"
+                    f"• products.db - {products_pool['checked_out']} / {products_pool['size']}\n"
+                    f"• users.db - {users_pool['checked_out']} / {users_pool['size']}\n"
                 ),
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=[
                     [InlineKeyboardButton(text="⬅️ Назад", callback_data="admin_back")]
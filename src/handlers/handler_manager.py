@@ -18,23 +18,29 @@
 
         Управление товарами:
             - Просмотр информации о товарах
-            - Обновление прайс-листа через Excel
+            - Обновление прайс-листа через Excel: новая версия каталога
+              собирается в фоне и подменяет текущую без остановки бота
             - Скачивание текущего прайс-листа
             - Редактирование данных товаров
 """
 
+import os
+
 from aiogram                    import types
 from src.utils                  import logger
 from aiogram.types              import InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
 from aiogram.exceptions         import TelegramBadRequest
 from aiogram.fsm.context        import FSMContext
 from aiogram.utils.markdown     import hbold, hcode
-from src.managers.manager_user  import User
 from src.filters                import filter_only_manager, filter_only_auth
 
 from src.states import ManagerPanelStates
 
 
+# Текущий прайс-лист; загруженный файл заменяет его после сборки новой версии каталога
+PRICE_LIST_PATH = os.path.join("data", "excel", "price-list.xlsx")
+
+
 async def cmd_manager_handler(message: types.Message):
     logger.info(f"Received MANAGER command FROM {message.from_user.id}")
     if not (await filter_only_manager(message) and await filter_only_auth(message)):
@@ -93,8 +99,7 @@ async def manager_get_users_callback_handler(callback: types.CallbackQuery):
     if callback.data == "manager_get_users":
         logger.info(f"Get from manager list users command from by {callback.from_user.id}")
         try:
-            session = callback.bot.um.Session()
-            users = session.query(User).all()
+            users = callback.bot.um.get_all_users()
 
             user_lines = []
             for u in users:
@@ -359,10 +364,25 @@ async def handle_excel_file(message: types.Message, state: FSMContext):
         file = await message.bot.get_file(document.file_id)
         file_path = file.file_path
         file_bytes = await message.bot.download_file(file_path)
-        with open("data/excel/price-list.xlsx", "wb") as f:
+
+        # Загрузка не подменяет текущий прайс-лист: сначала в фоне собирается
+        # новая версия каталога, бот до ее готовности работает на текущей
+        upload_path = os.path.join("data", "excel", f".upload-{message.message_id}.xlsx")
+        with open(upload_path, "wb") as f:
             f.write(file_bytes.read())
-        await message.reply("✅ Файл успешно сохранён как price-list.xlsx.")
+        await message.reply("✅ Файл получен. Собирается новая версия каталога, поиск работает на текущей.")
         await state.clear()
+
+        async def on_catalog_ready(catalog, error):
+            if error is not None:
+                if os.path.exists(upload_path):
+                    os.remove(upload_path)
+                await message.answer(f"⚠️ Не удалось собрать каталог, используется прежняя версия.\nОшибка: {error}")
+                return
+            os.replace(upload_path, PRICE_LIST_PATH)
+            await message.answer(f"✅ Каталог обновлен до версии {catalog.version}, price-list.xlsx заменен.")
+
+        message.bot.catalogs.rebuild_in_background(upload_path, on_done=on_catalog_ready)
     except Exception as e:
         logger.exception(f"ERROR in handle_excel_file FOR user_id={message.from_user.id}")
         await message.answer(f"Ошибка: {str(e)}", show_alert=True)
@@ -382,7 +402,7 @@ async def manager_download_excel_callback_handler(callback: types.CallbackQuery)
         logger.info(f"Download excel-price by {callback.from_user.id}")
         try:
             await callback.message.answer_document(
-                document=FSInputFile("data/excel/price-list.xlsx"),
+                document=FSInputFile(PRICE_LIST_PATH),
                 caption="📊 Вот текущий прайс лист системы:"
             )
             await callback.answer()
@@ -26,6 +26,33 @@ from src.services              import TextGenerator
 from src.services              import RasaClient   
 from src.utils                 import ExcelProcessor
 from src.filters               import filter_only_auth
+from src.managers.manager_filters import parse_query_filters
+from config                    import config
+
+
+# Значение выбора таблицы для поиска сразу по всем листам каталога
+ALL_CATEGORIES = "*"
+
+
+async def wait_search_ready(message: types.Message) -> bool:
+    """
+        Ожидание прогрева поиска после запуска бота с уведомлением пользователя.
+        Если прогрев завершился ошибкой, запускается повторная попытка
+    """
+    em = message.bot.em
+    if em.is_ready:
+        return True
+    if em.warmup_error is None:
+        await message.answer("⏳ Поиск прогревается после запуска бота, запрос будет выполнен через несколько секунд...")
+        if await em.wait_ready(config.embedding.warmup_wait_timeout):
+            return True
+    if em.warmup_error is not None:
+        logger.error(f"Search requested after failed warm-up: {em.warmup_error}")
+        em.start_warmup()
+        await message.answer("❌ Не удалось запустить поиск, запущена повторная попытка. Повторите запрос через минуту.")
+        return False
+    await message.answer("⚠️ Поиск пока недоступен, попробуйте повторить запрос позже.")
+    return False
 
 
 async def request_handler(message: types.Message, state: FSMContext):
@@ -57,10 +84,12 @@ async def request_text_menu(callback: types.CallbackQuery, state: FSMContext):
     if callback.data == "request_text_menu":
         logger.info(f"Get request menu command from {callback.from_user.id}")
         try:
-            lists = callback.bot.dm.get_sheet_names()
+            lists = await callback.bot.dm.aget_sheet_names()
             request_table_text = InlineKeyboardMarkup(
                 inline_keyboard=
                 [
+                    [InlineKeyboardButton(text="🌐 Все категории", callback_data=f"sheet_{ALL_CATEGORIES}")]
+                ] + [
                     [InlineKeyboardButton(text=sheet_name, callback_data=f"sheet_{sheet_name}")]
                     for sheet_name in lists
                 ] + [
@@ -94,8 +123,9 @@ async def tables_callback_handler(callback_query: types.CallbackQuery, state: FS
         ])
 
         # Обновляем сообщение
+        chosen_title = "Все категории" if chosen_list == ALL_CATEGORIES else chosen_list
         await callback_query.message.edit_text(
-            f"✅ Выбрана категория: {chosen_list}\n\n"
+            f"✅ Выбрана категория: {chosen_title}\n\n"
             "📝 Теперь введите ваш поисковый запрос:",
             reply_markup=priority_keyboard
         )
@@ -132,6 +162,41 @@ async def cancel_callback_handler(callback_query: types.CallbackQuery, state: FS
         await callback_query.answer()
     
     
+async def find_products(message: types.Message, search_entity, search_intent, target_column, choosing_list):
+    """
+        Поиск товаров и чтение их строк на одной версии каталога: подмена
+        версии во время запроса не смешивает результаты двух версий
+    """
+    async with message.bot.catalogs.lease() as catalog:
+        # Поиск по единому индексу каталога, при выборе листа - с фильтром по нему.
+        # Артикулы ищутся по индексу артикулов без модели и FAISS
+        tables = None if choosing_list == ALL_CATEGORIES else [choosing_list]
+        if search_intent == 'search_by_artikul':
+            found = await catalog.dm.asearch_by_artikul(search_entity, tables=tables)
+        else:
+            # Класс и цена из запроса ("для 5 класса дешевле 1000") - фильтры внутри индекса.
+            # Текст сущности не урезается: номер класса различает товары и в BM25, и в векторе
+            _, filters = parse_query_filters(message.text)
+            found = await catalog.em.asearch_catalog(target_column, search_entity, tables=tables, filters=filters)
+
+        if not found:
+            return []
+
+        # Строки читаются по одному разу на лист, в порядке результатов поиска
+        rows_by_table = {}
+        for table, idx, _ in found:
+            rows_by_table.setdefault(table, []).append(idx)
+        frames = await asyncio.gather(*(
+            catalog.dm.aget_rows(table, indices) for table, indices in rows_by_table.items()
+        ))
+        rows = {
+            (table, idx): row.to_dict()
+            for (table, indices), frame in zip(rows_by_table.items(), frames)
+            for idx, (_, row) in zip(indices, frame.iterrows())
+        }
+        return [rows[(table, idx)] for table, idx, _ in found]
+
+
 async def receive_request(message: types.Message, state: FSMContext):
     """
     Обработчик ввода поискового запроса пользователем.
@@ -160,6 +225,9 @@ async def receive_request(message: types.Message, state: FSMContext):
 
     # Очищаем состояние
     await state.clear()
+
+    if not await wait_search_ready(message):
+        return
     
     # Используем контекстный менеджер для RasaClient
     async with RasaClient() as rc:
@@ -173,15 +241,10 @@ async def receive_request(message: types.Message, state: FSMContext):
         elif search_intent == 'search_by_description':
             search_entity = search_entity['description']
             
-        distances, indices = message.bot.em.search(choosing_list, target_column, search_entity)
+        found_products = await find_products(message, search_entity, search_intent, target_column, choosing_list)
 
-        if distances is not None and indices is not None:
-            found_products = []
-            
-            for i, (distance, idx) in enumerate(zip(distances, indices), 1):
-                product_data = message.bot.dm.get_table_data(choosing_list).iloc[idx]
-                product_dict = product_data.to_dict()
-                found_products.append(product_dict)
+        if found_products:
+            for product_dict in found_products:
                 print(product_dict)
             
             with pd.option_context('display.max_rows', None):
@@ -299,6 +362,9 @@ async def handle_request_excel_file(message: types.Message, state: FSMContext):
             await message.reply("⚠️ Пожалуйста, отправьте файл в формате .xlsx")
             return
 
+        if not await wait_search_ready(message):
+            return
+
         # Создаем временную директорию для файлов
         temp_dir = Path("data/excel/requests_files")
         temp_dir.mkdir(exist_ok=True)
@@ -337,11 +403,12 @@ async def handle_request_excel_file(message: types.Message, state: FSMContext):
                     logger.error(f"Error updating progress: {e}")
 
         # Обрабатываем файл
-        processor = ExcelProcessor()
-        processor.set_progress_callback(update_progress)
-        
         try:
-            success, error_message = await processor.process_file_async(str(input_file), str(output_file))
+            # Весь файл обрабатывается на одной версии каталога
+            async with message.bot.catalogs.lease() as catalog:
+                processor = ExcelProcessor(catalog.dm, catalog.em)
+                processor.set_progress_callback(update_progress)
+                success, error_message = await processor.process_file_async(str(input_file), str(output_file))
         except Exception as e:
             logger.exception("Error during file processing")
             success, error_message = False, str(e)
@@ -472,12 +539,13 @@ async def handle_file_creation(callback: types.CallbackQuery, state: FSMContext)
         logger.debug(f"DataFrame before PDF creation:\n{df.to_string()}")
         
         # Обрабатываем файл
-        processor = ExcelProcessor()
-        
-        if callback.data == "file_creation_1":
-            success, error_message = await processor.create_pdf_from_dataframe(df, str(output_file))
-        else:
-            success, error_message = await processor.process_dataframe_async(df, str(output_file))
+        async with callback.bot.catalogs.lease() as catalog:
+            processor = ExcelProcessor(catalog.dm, catalog.em)
+
+            if callback.data == "file_creation_1":
+                success, error_message = await processor.create_pdf_from_dataframe(df, str(output_file))
+            else:
+                success, error_message = await processor.process_dataframe_async(df, str(output_file))
         
         if success:
             # Отправляем файл пользователю
@@ -8,10 +8,18 @@
         - DataManager:      Управление данными 
         - UserManager:      Управление пользователями бота
         - EmbeddingManager: Управление векторными представлениями
+        - IndexRegistry:    Реестр резидентных поисковых индексов
+        - ArtikulIndex:     Индекс артикулов (точный, по началу, по части)
+        - CatalogArtifact:  Готовая офлайн-сборка каталога (build.py)
+        - CatalogManager:   Версии каталога: аренда, фоновая сборка и подмена без остановки
 """
 
+from .manager_artikul    import ArtikulIndex
 from .manager_price      import DataManager         
 from .manager_user       import UserManager         
+from .manager_index      import IndexRegistry
 from .manager_embedding  import EmbeddingManager    
+from .manager_artifact   import CatalogArtifact, build_artifact
+from .manager_catalog    import Catalog, CatalogManager
 
-__all__ = ["DataManager", "UserManager", "EmbeddingManager"]
+__all__ = ["DataManager", "UserManager", "EmbeddingManager", "IndexRegistry", "ArtikulIndex", "CatalogArtifact", "build_artifact", "Catalog", "CatalogManager"]
@@ -0,0 +1,234 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_artifact.py              ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует офлайн-сборку каталога в версионированный каталог
+        (сборку), которую бот только загружает:
+        • Загрузка прайс-листа Excel в SQLite
+        • Предобработка и лематизация всех строк на всех ядрах
+        • Кодирование эмбеддингов (потоки torch на все ядра)
+        • Построение индексов FAISS по листам и по каталогу
+        • Манифест сборки и атомарная публикация через файл CURRENT
+
+        Структура сборки:
+            data/artifacts/
+            ├── CURRENT                      # имя опубликованной сборки
+            └── 20261016-120000-1a2b3c4d/
+                ├── products.db              # листы прайс-листа
+                ├── embeddings/              # векторы, манифесты строк, индексы FAISS
+                └── manifest.json            # источник, модель, листы, настройки, время фаз
+
+        Векторы строк с неизменным текстом переносятся из текущей сборки,
+        кодируются только новые и измененные строки.
+
+    Основные компоненты:
+        - CatalogArtifact: готовая сборка (пути, манифест, поиск текущей)
+        - build_artifact: сборка и публикация новой версии
+        - make_version: имя новой версии сборки
+
+    Примеры использования:
+        python build.py --workers 8
+        artifact = CatalogArtifact.current("data/artifacts")
+"""
+
+import os
+import json
+import shutil
+
+from dataclasses import dataclass
+from datetime    import datetime
+from time        import perf_counter
+from typing      import Any, Dict, Optional
+
+from src.utils   import logger
+from config      import config
+
+from src.managers.manager_price       import DataManager
+from src.managers.manager_embedding   import EmbeddingManager
+from src.managers.manager_fingerprint import file_fingerprint, source_changed
+
+
+MANIFEST_FILE   = "manifest.json"
+CURRENT_FILE    = "CURRENT"
+DB_FILE         = "products.db"
+EMBEDDINGS_DIR  = "embeddings"
+
+# Версия формата сборки: сборки другого формата бот не загружает
+ARTIFACT_FORMAT = 1
+
+
+@dataclass
+class CatalogArtifact:
+    """
+        Готовая сборка каталога
+    """
+    path:     str
+    manifest: Dict[str, Any]
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def db_path(self) -> str:
+        return os.path.join(self.path, DB_FILE)
+
+    @property
+    def embeddings_path(self) -> str:
+        return os.path.join(self.path, EMBEDDINGS_DIR)
+
+    @classmethod
+    def load(cls, path) -> "CatalogArtifact":
+        """
+            Сборка по пути; ValueError, если сборка неполная или другого формата
+        """
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"Catalog artifact {path} has no {MANIFEST_FILE}")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Catalog artifact {path} has format {manifest.get('format')}, expected {ARTIFACT_FORMAT}")
+        return cls(str(path), manifest)
+
+    @classmethod
+    def current(cls, root) -> Optional["CatalogArtifact"]:
+        """
+            Опубликованная сборка из файла CURRENT или None, если ее нет
+        """
+        current_path = os.path.join(root, CURRENT_FILE)
+        if not os.path.exists(current_path):
+            return None
+        with open(current_path, "r", encoding="utf-8") as f:
+            version = f.read().strip()
+        try:
+            return cls.load(os.path.join(root, version))
+        except ValueError:
+            logger.exception(f"Current catalog artifact '{version}' is unusable")
+            return None
+
+    def source_changed(self, path):
+        """
+            Изменился ли прайс-лист с момента сборки: (изменился, причина)
+        """
+        return source_changed(path, self.manifest.get("source"))
+
+    @staticmethod
+    def publish(root, version: str):
+        """
+            Атомарная смена текущей сборки
+        """
+        tmp_path = os.path.join(root, f"{CURRENT_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+
+def _seed_embeddings(target: str, root):
+    """
+        Копирует векторы текущей сборки (или старого каталога data/embeddings),
+        чтобы кодировать только новые и измененные строки
+    """
+    previous = CatalogArtifact.current(root)
+    source = previous.embeddings_path if previous else "data/embeddings"
+    if os.path.isdir(source):
+        shutil.copytree(source, target, dirs_exist_ok=True)
+        logger.info(f"Build seeded with embeddings from {source}")
+    else:
+        os.makedirs(target, exist_ok=True)
+
+
+def make_version(fingerprint: Dict[str, Any]) -> str:
+    """
+        Имя версии сборки: время сборки и начало sha256 прайс-листа.
+        Имена версий упорядочены по времени
+    """
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{fingerprint['sha256'][:8]}"
+
+
+def build_artifact(
+    source,
+    root=None,
+    workers: Optional[int] = None,
+    publish: bool = True,
+    version: Optional[str] = None
+) -> CatalogArtifact:
+    """
+        Полная сборка каталога из прайс-листа Excel.
+        Сборка идет во временный каталог, который переименовывается целиком
+        после записи манифеста, поэтому бот никогда не видит неполную сборку
+    """
+    root = str(root or config.data.artifacts_dir)
+    workers = workers or os.cpu_count() or 1
+    fingerprint = file_fingerprint(source)
+    version = version or make_version(fingerprint)
+    tmp_path = os.path.join(root, f".{version}.tmp")
+    os.makedirs(tmp_path, exist_ok=True)
+
+    times = {}
+
+    def phase(name, func):
+        start = perf_counter()
+        result = func()
+        times[name] = round(perf_counter() - start, 3)
+        logger.info(f"Build phase '{name}' took {times[name]:.2f}s")
+        return result
+
+    try:
+        import torch
+        torch.set_num_threads(workers)
+
+        dm = DataManager(source, db_path=os.path.join(tmp_path, DB_FILE))
+        phase("ingest", dm.update_database)
+
+        embeddings_path = os.path.join(tmp_path, EMBEDDINGS_DIR)
+        _seed_embeddings(embeddings_path, root)
+        em = EmbeddingManager(dm, base_path=embeddings_path, lazy=True)
+        em.preprocess_workers = workers
+
+        phase("model", lambda: em.model)
+        phase("embeddings", em.refresh_all)
+        em.save_source(dm.get_source_fingerprint())
+
+        tables = dm.get_all_table_names()
+
+        def build_indexes():
+            for table in tables:
+                for column in em.COLUMNS:
+                    em.get_index(table, column)
+            em.warm_indexes()
+        phase("indexes", build_indexes)
+
+        manifest = {
+            "format":          ARTIFACT_FORMAT,
+            "version":         version,
+            "created_at":      datetime.now().isoformat(timespec="seconds"),
+            "source":          {"path": str(source), **fingerprint},
+            "model":           em.MODEL_NAME,
+            "encoder_backend": config.embedding.encoder_backend,
+            "columns":         em.COLUMNS,
+            "tables":          {table: len(dm.get_table_data(table)) for table in tables},
+            "indexes":         {
+                f"{table}.{column}": list(config.embedding.get_index_settings(table, column))
+                for table in [*tables, em.ALL_TABLES] for column in em.COLUMNS
+            },
+            "workers":         workers,
+            "build_times":     times,
+        }
+        with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        # Соединения закрываются до переноса каталога сборки (WAL уже перенесен в базу)
+        dm.dispose()
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    path = os.path.join(root, version)
+    os.replace(tmp_path, path)
+    if publish:
+        CatalogArtifact.publish(root, version)
+    logger.info(f"Catalog artifact {version} built in {sum(times.values()):.2f}s{' and published' if publish else ''}")
+    return CatalogArtifact.load(path)
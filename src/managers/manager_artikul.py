@@ -0,0 +1,141 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_artikul.py               ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует индекс артикулов для поиска без модели и FAISS:
+        • Приведение артикула к каноничному виду: регистр, дефисы, пробелы,
+          точки и косые черты, кириллические буквы-двойники латиницы
+        • Точный поиск по хеш-таблице
+        • Поиск по началу артикула и по его части через отсортированные
+          массивы ключей и суффиксов (бинарный поиск)
+
+    Основные компоненты:
+        - fold_artikul: каноничный вид артикула
+        - ArtikulIndex: индекс артикулов всех листов каталога
+
+    Примеры использования:
+        index = ArtikulIndex([("ЦЛ-001", "Цифровые лаборатории", 0)])
+        index.search("цл 001")  # [("Цифровые лаборатории", 0, 1.0)]
+"""
+
+import re
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Разделители, которые не различают артикулы: "ЦЛ-001", "цл 001" и "ЦЛ001" - одно и то же
+SEPARATORS = re.compile(r"[\s\-‐‑‒–—_./\\]+")
+
+# Кириллические буквы, совпадающие по написанию с латинскими
+LOOKALIKES = str.maketrans("АВЕКМНОРСТУХЁ", "ABEKMHOPCTYXE")
+
+
+def fold_artikul(value) -> str:
+    """
+        Каноничный вид артикула для сравнения
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # числовые артикулы pandas читает как float: 12345.0
+    return SEPARATORS.sub("", str(value)).upper().translate(LOOKALIKES)
+
+
+class ArtikulIndex:
+    """
+        Индекс артикулов: точный, префиксный и частичный поиск
+    """
+
+    # Оценки совпадений разного вида (частичные дополнительно умножаются на покрытие)
+    EXACT_SCORE   = 1.0
+    PREFIX_SCORE  = 0.9
+    PARTIAL_SCORE = 0.8
+
+    def __init__(self, entries: Iterable[Tuple[object, str, int]]):
+        """
+            entries - тройки (артикул, таблица, строка)
+        """
+        self.exact: Dict[str, List[Tuple[str, int]]] = {}
+        for artikul, table, row in entries:
+            key = fold_artikul(artikul)
+            if key and key != "NAN":
+                self.exact.setdefault(key, []).append((table, int(row)))
+
+        self.keys = sorted(self.exact)
+
+        # Все суффиксы ключей: частичное совпадение - это префикс одного из суффиксов
+        suffixes = sorted((key[i:], key) for key in self.keys for i in range(1, len(key)))
+        self._suffixes    = [suffix for suffix, _ in suffixes]
+        self._suffix_keys = [key for _, key in suffixes]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, artikul) -> List[Tuple[str, int]]:
+        """
+            Точное совпадение артикула: список (таблица, строка)
+        """
+        return self.exact.get(fold_artikul(artikul), [])
+
+    def in_tables(self, key: str, tables: Optional[Set[str]]) -> bool:
+        """
+            Есть ли у артикула строки в одной из таблиц (None - в любой)
+        """
+        return tables is None or any(table in tables for table, _ in self.exact[key])
+
+    def prefix_keys(self, key: str, limit: int, tables: Optional[Set[str]] = None) -> List[str]:
+        """
+            Артикулы, начинающиеся с key; артикулы вне tables не занимают limit
+        """
+        found = []
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i].startswith(key) and len(found) < limit:
+            if self.in_tables(self.keys[i], tables):
+                found.append(self.keys[i])
+            i += 1
+        return found
+
+    def partial_keys(self, key: str, limit: int, tables: Optional[Set[str]] = None) -> List[str]:
+        """
+            Артикулы, содержащие key; артикулы вне tables не занимают limit
+        """
+        found = {}
+        i = bisect_left(self._suffixes, key)
+        while i < len(self._suffixes) and self._suffixes[i].startswith(key) and len(found) < limit:
+            if self.in_tables(self._suffix_keys[i], tables):
+                found.setdefault(self._suffix_keys[i], None)
+            i += 1
+        return list(found)
+
+    def search(
+        self,
+        artikul,
+        limit: int = 5,
+        tables: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, int, float]]:
+        """
+            Поиск артикула: сначала точные совпадения, затем по началу, затем по части.
+            Возвращает список (таблица, строка, оценка) по убыванию оценки
+        """
+        key = fold_artikul(artikul)
+        if not key:
+            return []
+        tables = set(tables) if tables is not None else None
+
+        scored: Dict[str, float] = {}
+        if key in self.exact:
+            scored[key] = self.EXACT_SCORE
+        for found in self.prefix_keys(key, limit * 4, tables):
+            scored.setdefault(found, self.PREFIX_SCORE * len(key) / len(found))
+        for found in self.partial_keys(key, limit * 4, tables):
+            scored.setdefault(found, self.PARTIAL_SCORE * len(key) / len(found))
+
+        results = []
+        for found in sorted(scored, key=scored.get, reverse=True):
+            for table, row in self.exact[found]:
+                if tables is None or table in tables:
+                    results.append((table, row, scored[found]))
+            if len(results) >= limit:
+                break
+        return results[:limit]
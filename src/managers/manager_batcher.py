@@ -0,0 +1,160 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_batcher.py               ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует сервис микро-батчинга вывода модели: запросы на
+        кодирование от всех одновременно работающих пользователей попадают
+        в общую асинхронную очередь, собираются в батч в течение короткого
+        окна (несколько миллисекунд или до max_batch_size текстов) и
+        кодируются одним проходом модели в отдельном потоке.
+
+    Основные компоненты:
+        - InferenceBatcher: очередь запросов и фоновый обработчик батчей
+
+    Метрики (InferenceBatcher.stats):
+        - queue_depth        - текущая длина очереди
+        - batches, items     - число выполненных батчей и закодированных текстов
+        - avg_batch_size     - средний размер батча
+        - wait_ms_p50/p99    - время ожидания текста в очереди до начала прохода модели
+        - encode_ms_p50/p99  - время прохода модели на батч
+
+    Примеры использования:
+        batcher = InferenceBatcher(lambda texts: model.encode(texts), max_batch_size=32, max_wait_ms=5)
+        vectors = await batcher.encode_many(["тетрадь", "глобус"])
+"""
+
+import asyncio
+import numpy as np
+
+from collections import deque
+from time        import perf_counter
+from typing      import Any, Callable, Dict, List, Sequence
+
+from src.utils import logger
+
+
+class InferenceBatcher:
+    """
+        Общая очередь кодирования с объединением запросов в батчи
+    """
+
+    # Сколько последних замеров хранится для перцентилей
+    HISTORY_SIZE = 1000
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Any],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+            encode_fn      - синхронная функция кодирования списка текстов
+            max_batch_size - максимальный размер батча
+            max_wait_ms    - сколько ждать пополнения батча после первого запроса
+        """
+        self.encode_fn      = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait       = max(0.0, max_wait_ms) / 1000
+
+        self._queue  = None
+        self._worker = None
+        self._loop   = None
+
+        self.batches       = 0
+        self.items         = 0
+        self._batch_sizes  = deque(maxlen=self.HISTORY_SIZE)
+        self._wait_times   = deque(maxlen=self.HISTORY_SIZE)
+        self._encode_times = deque(maxlen=self.HISTORY_SIZE)
+
+    def _ensure_worker(self):
+        """
+            Очередь и обработчик создаются в текущем цикле событий при первом запросе
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop   = loop
+            self._queue  = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def encode(self, text: str) -> np.ndarray:
+        """
+            Вектор одного текста; вызов ждет, пока его батч будет закодирован
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future, perf_counter()))
+        return await future
+
+    async def encode_many(self, texts: Sequence[str]) -> np.ndarray:
+        """
+            Векторы списка текстов; тексты делят батчи с запросами других пользователей
+        """
+        if len(texts) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        vectors = await asyncio.gather(*(self.encode(text) for text in texts))
+        return np.asarray(vectors, dtype=np.float32)
+
+    async def _collect_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            texts = [text for text, _, _ in batch]
+
+            started = perf_counter()
+            self._wait_times.extend((started - queued) * 1000 for _, _, queued in batch)
+            try:
+                vectors = await asyncio.to_thread(self.encode_fn, texts)
+            except Exception as e:
+                logger.exception(f"Batched encode of {len(texts)} texts failed")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._encode_times.append((perf_counter() - started) * 1000)
+            self._batch_sizes.append(len(batch))
+            self.batches += 1
+            self.items   += len(batch)
+            for (_, future, _), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+            Метрики очереди: глубина, размер батча, ожидание и время прохода модели
+        """
+        def percentile(values, q):
+            return float(np.percentile(values, q)) if values else 0.0
+
+        return {
+            "queue_depth":    self.queue_depth,
+            "batches":        self.batches,
+            "items":          self.items,
+            "avg_batch_size": float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+            "max_batch_size": max(self._batch_sizes, default=0),
+            "wait_ms_p50":    percentile(self._wait_times, 50),
+            "wait_ms_p99":    percentile(self._wait_times, 99),
+            "encode_ms_p50":  percentile(self._encode_times, 50),
+            "encode_ms_p99":  percentile(self._encode_times, 99),
+        }
@@ -0,0 +1,291 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_catalog.py               ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует версии каталога, между которыми бот переключается
+        без остановки:
+        • Новый прайс-лист собирается в фоне отдельным процессом (build.py)
+          в новую версию: база, векторы, индексы
+        • Готовая версия загружается и прогревается, пока текущая
+          обслуживает запросы, затем указатель на текущую версию
+          атомарно подменяется
+        • Запрос берет версию в аренду (lease) на все время обработки,
+          поэтому ответ никогда не собирается из двух версий
+        • Старая версия закрывается, когда завершится последний запрос,
+          который ее использует; лишние сборки на диске удаляются
+        • Каталог без сборки (data/db, data/embeddings) обновляется на месте
+          без запросов: новые запросы ждут конца обновления, а оно начинается
+          после завершения уже идущих
+
+    Основные компоненты:
+        - Catalog: версия каталога (DataManager, EmbeddingManager, сборка)
+        - CatalogManager: текущая версия, аренда, фоновая сборка и подмена
+        - load_catalog: загрузка готовой сборки в отдельные экземпляры менеджеров
+
+    Примеры использования:
+        async with bot.catalogs.lease() as catalog:
+            found = await catalog.em.asearch_catalog("Наименование", query)
+            rows = await catalog.dm.aget_rows(table, indices)
+
+        catalog = await bot.catalogs.rebuild("data/excel/price-list.xlsx")
+        changes = await bot.catalogs.update_in_place(update)
+"""
+
+import os
+import sys
+import shutil
+import asyncio
+import threading
+
+from contextlib  import asynccontextmanager
+from dataclasses import dataclass
+from time        import perf_counter
+from typing      import Any, Callable, List, Optional
+
+from src.utils   import logger
+from config      import config
+
+from src.managers.manager_price       import DataManager
+from src.managers.manager_embedding   import EmbeddingManager
+from src.managers.manager_artifact    import CatalogArtifact, make_version
+from src.managers.manager_fingerprint import file_fingerprint
+
+
+# Строк вывода build.py, которые попадают в текст ошибки сборки
+BUILD_OUTPUT_TAIL = 20
+
+# Понижение приоритета процесса сборки, чтобы поиск бота не замедлялся
+BUILD_NICE = 10
+
+# Период проверки, завершились ли запросы перед обновлением на месте, сек
+DRAIN_POLL_INTERVAL = 0.05
+
+
+@dataclass(eq=False)
+class Catalog:
+    """
+        Версия каталога; artifact - None для каталога из data/db и data/embeddings
+    """
+    dm:       DataManager
+    em:       EmbeddingManager
+    artifact: Optional[CatalogArtifact] = None
+    leases:   int                       = 0
+    retired:  bool                      = False
+
+    @property
+    def version(self) -> str:
+        return self.artifact.version if self.artifact else "local"
+
+
+def load_catalog(artifact: CatalogArtifact, previous: Optional[Catalog] = None) -> Catalog:
+    """
+        Загружает и прогревает сборку в новых экземплярах менеджеров.
+        Модель берется у предыдущей версии, если та уже ее загрузила
+    """
+    start = perf_counter()
+    dm = DataManager.create(config.data.data_file, db_path=artifact.db_path)
+    em = EmbeddingManager.create(dm, base_path=artifact.embeddings_path, lazy=True, prebuilt=True)
+    em.share_model(previous.em if previous else None)
+    em.warmup()
+    logger.info(f"Catalog {artifact.version} loaded in {perf_counter() - start:.2f}s")
+    return Catalog(dm, em, artifact)
+
+
+class CatalogManager:
+    """
+        Синглтон-класс: текущая версия каталога и переключение версий
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self, catalog: Catalog, root=None, keep: Optional[int] = None):
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.current = catalog
+        self.root = str(root or config.data.artifacts_dir)
+        self.keep = keep or config.data.artifacts_keep
+        self._retired: List[Catalog] = []
+        self._listeners: List[Callable[[Catalog], None]] = []
+        self._build_lock = asyncio.Lock()
+        self._serving = asyncio.Event()   # сброшено на время обновления на месте
+        self._serving.set()
+        self._tasks = set()
+        self.building: Optional[str] = None
+        self.swaps = 0
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+            Текущая версия каталога на время обработки запроса.
+            Подмена версии во время запроса не влияет на этот запрос.
+            Во время обновления на месте запрос ждет его завершения
+        """
+        await self._serving.wait()
+        catalog = self.current
+        catalog.leases += 1
+        try:
+            yield catalog
+        finally:
+            catalog.leases -= 1
+            if catalog.retired and catalog.leases == 0:
+                self._close(catalog)
+
+    async def update_in_place(self, update: Callable[[], Any]) -> Any:
+        """
+            Обновление текущей версии на месте в потоке: update() меняет базу,
+            затем эмбеддинги. Пока оно идет, новые запросы ждут, а начинается
+            оно после завершения уже идущих, поэтому ни один запрос не сопоставляет
+            новые строки базы со старыми векторами и индексами
+        """
+        async with self._build_lock:
+            self._serving.clear()
+            try:
+                if self.current.leases:
+                    logger.info(f"In-place update waits for {self.current.leases} requests to finish")
+                while self.current.leases:
+                    await asyncio.sleep(DRAIN_POLL_INTERVAL)
+                return await asyncio.to_thread(update)
+            finally:
+                self._serving.set()
+
+    def on_swap(self, callback: Callable[[Catalog], None]):
+        """
+            Подписка на смену текущей версии (например, для bot.dm и bot.em)
+        """
+        self._listeners.append(callback)
+
+    def swap(self, catalog: Catalog):
+        """
+            Делает версию текущей. Предыдущая закрывается сразу или после
+            завершения последнего запроса, который ее использует
+        """
+        previous, self.current = self.current, catalog
+        DataManager._instance = catalog.dm
+        EmbeddingManager._instance = catalog.em
+        for callback in self._listeners:
+            callback(catalog)
+        self.swaps += 1
+        logger.info(f"Catalog switched from {previous.version} to {catalog.version} ({previous.leases} requests still on the old one)")
+
+        previous.retired = True
+        if previous.leases == 0:
+            self._close(previous)
+        else:
+            self._retired.append(previous)
+        self.collect_garbage()
+
+    def _close(self, catalog: Catalog):
+        catalog.dm.dispose()
+        if catalog in self._retired:
+            self._retired.remove(catalog)
+        logger.info(f"Catalog {catalog.version} closed")
+        self.collect_garbage()
+
+    def collect_garbage(self):
+        """
+            Удаляет сборки сверх ARTIFACTS_KEEP последних и брошенные временные
+            каталоги сборок. Текущая версия, версии с активными запросами
+            и собираемая версия не удаляются
+        """
+        if not os.path.isdir(self.root):
+            return
+        protected = {self.current.version, *(catalog.version for catalog in self._retired)}
+        if self.building:
+            protected.update({self.building, f".{self.building}.tmp"})
+
+        versions = sorted(
+            (name for name in os.listdir(self.root)
+             if os.path.isdir(os.path.join(self.root, name)) and not name.startswith(".")),
+            reverse=True
+        )
+        stale = versions[self.keep:] + [
+            name for name in os.listdir(self.root) if name.startswith(".") and name.endswith(".tmp")
+        ]
+        for name in stale:
+            if name in protected:
+                continue
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            logger.info(f"Catalog artifact {name} removed")
+
+    async def _run_build(self, source, version: str) -> CatalogArtifact:
+        """
+            Сборка версии отдельным процессом с пониженным приоритетом
+        """
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "build.py",
+            "--source", str(source), "--output", self.root, "--version", version,
+            "--no-publish", "--nice", str(BUILD_NICE),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        output, _ = await process.communicate()
+        if process.returncode != 0:
+            tail = "\n".join(output.decode(errors="replace").splitlines()[-BUILD_OUTPUT_TAIL:])
+            raise RuntimeError(f"Catalog build {version} failed with code {process.returncode}:\n{tail}")
+        return CatalogArtifact.load(os.path.join(self.root, version))
+
+    async def rebuild(self, source) -> Catalog:
+        """
+            Собирает версию каталога из прайс-листа, загружает ее и делает текущей.
+            Сборки выполняются по одной; прайс-лист с тем же содержимым, что
+            у текущей версии, не пересобирается
+        """
+        async with self._build_lock:
+            fingerprint = await asyncio.to_thread(file_fingerprint, source)
+            artifact = self.current.artifact
+            if artifact and artifact.manifest["source"]["sha256"] == fingerprint["sha256"]:
+                logger.info(f"Price list {source} is unchanged, catalog {artifact.version} is kept")
+                return self.current
+
+            start = perf_counter()
+            self.building = make_version(fingerprint)
+            try:
+                artifact = await self._run_build(source, self.building)
+                catalog = await asyncio.to_thread(load_catalog, artifact, self.current)
+                CatalogArtifact.publish(self.root, artifact.version)
+                self.swap(catalog)
+            finally:
+                self.building = None
+            logger.info(f"Catalog {catalog.version} built and switched in {perf_counter() - start:.2f}s")
+            return catalog
+
+    def rebuild_in_background(self, source, on_done: Optional[Callable] = None) -> asyncio.Task:
+        """
+            Запускает rebuild фоновой задачей; on_done(catalog, error) - корутина
+            для уведомления о результате
+        """
+        async def run():
+            try:
+                catalog = await self.rebuild(source)
+            except Exception as e:
+                logger.exception(f"Catalog rebuild from {source} failed")
+                if on_done:
+                    await on_done(None, e)
+                return
+            if on_done:
+                await on_done(catalog, None)
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def stats(self):
+        return {
+            "version":  self.current.version,
+            "leases":   self.current.leases,
+            "retired":  [(catalog.version, catalog.leases) for catalog in self._retired],
+            "building": self.building,
+            "swaps":    self.swaps,
+        }
@@ -11,22 +11,43 @@
     Основные компоненты:
         - EmbeddingManager: Синглтон-класс для управления эмбеддингами
         - SentenceTransformer: Модель для генерации эмбеддингов
+        - load_encoder: Выбор бэкенда модели (torch, torch-int8, onnx, onnx-int8)
         - FAISS: Библиотека для эффективного поиска ближайших соседей
+        - IndexRegistry: Реестр резидентных индексов по паре (таблица, колонка)
+        - LRUCache: Кэш векторов запросов перед SentenceTransformer.encode
+        - InferenceBatcher: Общая очередь микро-батчинга запросов пользователей
+        - BM25Index: Лексический индекс рядом с каждым векторным индексом
         - TextPreprocessor: Класс для предобработки текста
 
     Функциональность:
         - Генерация эмбеддингов для текстовых данных
-        - Сохранение и загрузка эмбеддингов
-        - Поиск похожих текстов
+        - Инкрементальное обновление по хешам строк с манифестом по Артикулу
+        - Обновление только измененных таблиц по набору изменений прайса (apply_changes)
+        - Пропуск обновления при старте, если эмбеддинги построены по той же версии прайса, что и база
+        - Сохранение нормализованных эмбеддингов и загрузка через mmap
+        - Поиск похожих текстов по резидентным индексам
+        - Пакетный поиск для списка запросов (search_many)
+        - Асинхронный поиск с объединением запросов пользователей в батчи модели
+        - Гибридный поиск BM25 + FAISS со слиянием RRF и быстрым путем без модели
+        - Фильтры по разделу, классу и цене (filters=) внутри FAISS и BM25
+        - Настраиваемый тип индекса для пары (таблица, колонка): flat, hnsw, ivf
+        - Квантованные индексы (fp16, int8, pq) с точным повторным ранжированием
+        - Единый индекс по всем листам каталога с фильтром по листам
         - Предобработка текста перед генерацией
-        - Нормализация векторов
+        - Ленивая загрузка модели и фоновый прогрев с признаком готовности
+        - Нормализация векторов при записи (а не при каждом чтении)
 """
 
+import asyncio
 import hashlib
+import json
+import threading
 import numpy as np
 import faiss
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
+from datetime import datetime
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
 
 
 import os
@@ -38,7 +59,14 @@ root_dir = str(Path(__file__).parent.parent.parent)
 if root_dir not in sys.path:
     sys.path.append(root_dir)
     
-from src.utils import preprocessor
+from src.utils import preprocessor, preprocess_parallel, logger, LRUCache, search_executor
+from src.managers.manager_encoder import load_encoder
+from src.managers.manager_batcher import InferenceBatcher
+from src.managers.manager_lexical import BM25Index, HybridContext, reciprocal_rank_fusion
+from src.managers.manager_index import IndexRegistry, SharedFlatIndex, RerankIndex, CatalogIndex, build_faiss_index, tune_index, filtered_search
+from src.managers.manager_filters import AttributeIndex
+from src.managers.manager_rerank import rerank_stats
+from config import config
 
 
 
@@ -48,56 +76,895 @@ class EmbeddingManager:
     """
     _instance = None
 
+    # Ключ таблицы для единого индекса по всем листам каталога
+    ALL_TABLES = "*"
+
+    # Колонки, для которых строятся эмбеддинги
+    COLUMNS = ["Наименование", "Описание"]
+
+    # Колонки, эмбеддинги которых больше не строятся; их файлы удаляются при обновлении.
+    # Артикулы ищутся по индексу DataManager.search_by_artikul
+    DROPPED_COLUMNS = ["Артикул"]
+
+    # Ключ колонки для индексов атрибутов в реестре
+    ATTRIBUTES = "*attributes"
+
+    # Оценка однозначного результата быстрого пути (без вектора запроса) в шкале косинуса:
+    # порог сильного совпадения, после которого вызывающие берут max(оценка, fuzzy)
+    FASTPATH_STRONG_SCORE = 0.9
+
+    # Модель для кодирования текстов
+    MODEL_NAME = "sberbank-ai/sbert_large_nlu_ru"
+
+    # Отпечаток прайс-листа (из базы), по которому построены эмбеддинги
+    SOURCE_FILE = "source.json"
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(EmbeddingManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, data_manager, base_path="data/embeddings"):
+    @classmethod
+    def create(cls, *args, **kwargs):
+        """
+            Отдельный экземпляр в обход синглтона: новая версия каталога
+            загружается, пока текущая продолжает обслуживать запросы
+        """
+        instance = object.__new__(cls)
+        instance.__init__(*args, **kwargs)
+        return instance
+
+    def share_model(self, other):
+        """
+            Использовать модель, уже загруженную другим экземпляром,
+            чтобы версии каталога не держали в памяти две копии модели
+        """
+        if other is not None and other._model is not None:
+            self._model = other._model
+
+    def __init__(self, data_manager, base_path="data/embeddings", lazy=False, prebuilt=False):
+        """
+            lazy     - не загружать модель и не обновлять эмбеддинги в конструкторе;
+                       прогрев выполняется фоновой задачей start_warmup()
+            prebuilt - эмбеддинги и индексы взяты из готовой сборки (build.py):
+                       прогрев не обновляет эмбеддинги, а только загружает их
+        """
         if hasattr(self, "_initialized") and self._initialized:
             return  # предотвращаем повторную инициализацию при повторном вызове
 
         self.base_path = base_path
-        self.model = SentenceTransformer("sberbank-ai/sbert_large_nlu_ru")
+        self.prebuilt = prebuilt
+        self.data_manager = data_manager
+        self.preprocess_workers = 1
         self.preproc = preprocessor
+        self.indexes = IndexRegistry()
+        self.lexical_indexes = IndexRegistry()
+        self.attribute_indexes = IndexRegistry()
+        self.hybrid_stats = {"queries": 0, "fast_path": 0}
+        self._stats_lock = threading.Lock()
+        self.query_cache = LRUCache(
+            maxsize=config.embedding.query_cache_size,
+            ttl=config.embedding.query_cache_ttl or None
+        )
+        self.batcher = InferenceBatcher(
+            self._encode_batch,
+            max_batch_size=config.embedding.encode_batch_size,
+            max_wait_ms=config.embedding.encode_batch_wait_ms
+        )
 
-        # Генерация эмбеддингов для всех таблиц и колонок
-        for table in data_manager.get_all_table_names():
-            df = data_manager.get_table_data(table)
-            for col in ["Наименование", "Артикул", "Описание"]:
-                self.generate_and_save(table, col, df[col].astype(str))
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._warmup_done = threading.Event()
+        self._warmup_task = None
+        self.warmup_error = None
+        self.startup_times = {}
 
         self._initialized = True  # флаг, чтобы инициализация прошла только один раз
 
+        if not lazy:
+            self.warmup()
+
+    @property
+    def model(self):
+        """
+            Модель загружается при первом обращении с бэкендом из конфигурации
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = load_encoder(
+                        self.MODEL_NAME,
+                        config.embedding.encoder_backend,
+                        onnx_quantization=config.embedding.encoder_onnx_quantization
+                    )
+                    logger.info(f"Encoder loaded with '{config.embedding.encoder_backend}' backend")
+        return self._model
+
+    @property
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def _timed_phase(self, name, func):
+        start = perf_counter()
+        result = func()
+        self.startup_times[name] = perf_counter() - start
+        logger.info(f"Embedding warm-up phase '{name}' took {self.startup_times[name]:.2f}s")
+        return result
+
+    def warmup(self):
+        """
+            Прогрев: загрузка модели, обновление эмбеддингов, построение индексов.
+            Время каждой фазы пишется в лог и сохраняется в startup_times.
+            Ошибка прогрева сохраняется в warmup_error
+        """
+        self.warmup_error = None
+        self._warmup_done.clear()
+        try:
+            self._timed_phase("model", lambda: self.model)
+            if not self.prebuilt:
+                source = self.data_manager.get_source_fingerprint()
+                if self.is_source_fresh(source):
+                    logger.info("Embeddings match the database price list fingerprint, refresh skipped")
+                else:
+                    self._timed_phase("embeddings", self.refresh_all)
+                    self.save_source(source)
+            self._timed_phase("indexes", self.warm_indexes)
+            self._ready.set()
+            logger.info(f"Embedding manager is ready in {sum(self.startup_times.values()):.2f}s")
+        except Exception as e:
+            self.warmup_error = e
+            logger.exception("Embedding warm-up failed")
+            raise
+        finally:
+            self._warmup_done.set()
+
+    def warm_indexes(self):
+        for column in self.COLUMNS:
+            self.get_catalog_index(column)
+            self.get_catalog_lexical_index(column)
+
+    def start_warmup(self):
+        """
+            Запуск прогрева фоновой задачей в текущем цикле событий.
+            После неудачного прогрева вызов запускает повторную попытку
+        """
+        if self.is_ready:
+            return self._warmup_task
+        if self._warmup_task is None or self._warmup_task.done():
+            self.warmup_error = None
+            self._warmup_done.clear()
+            self._warmup_task = asyncio.create_task(asyncio.to_thread(self.warmup))
+            self._warmup_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._warmup_task
+
+    async def wait_ready(self, timeout=None):
+        """
+            Ожидание готовности поиска, не блокирующее цикл событий.
+            Возвращает False, если за timeout секунд прогрев не завершился
+            или завершился ошибкой (warmup_error) - без ожидания timeout
+        """
+        if self.is_ready:
+            return True
+        if self.warmup_error is not None:
+            return False
+        await asyncio.to_thread(self._warmup_done.wait, timeout)
+        return self.is_ready
+
     def get_embedding_path(self, table, column):
+        """
+            Путь к хранилищу нормализованных векторов пары (таблица, колонка)
+        """
+        h = hashlib.md5(f"{table}_{column}".encode()).hexdigest()
+        return os.path.join(self.base_path, f"{h}.norm.npy")
+
+    def get_legacy_embedding_path(self, table, column):
+        """
+            Путь к файлу старого формата (ненормализованные векторы)
+        """
         h = hashlib.md5(f"{table}_{column}".encode()).hexdigest()
         return os.path.join(self.base_path, f"{h}.npy")
 
-    def generate_and_save(self, table, column, texts):
+    @staticmethod
+    def normalize(emb):
+        emb = np.asarray(emb, dtype=np.float32)
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return emb / norms
+
+    def _preprocess_texts(self, texts):
+        """
+            Синхронная обертка над асинхронным препроцессором.
+            Выполняется в отдельном потоке со своим циклом событий, чтобы
+            не конфликтовать с уже запущенным циклом бота; при сборке
+            каталога (preprocess_workers > 1) - на нескольких процессах
+        """
+        if self.preprocess_workers > 1:
+            return preprocess_parallel(texts, self.preprocess_workers)
+
+        async def _run():
+            return [await self.preproc.preprocess(str(t), False) for t in texts]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, _run()).result()
+
+    def save_embeddings(self, table, column, emb):
+        """
+            Атомарно сохраняет нормализованные векторы в хранилище.
+            Запись идет во временный файл с последующей подменой, чтобы
+            процессы, уже отобразившие старый файл в память, дочитали его целиком
+        """
         path = self.get_embedding_path(table, column)
-        if os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, self.normalize(emb))
+        # Сначала отпускаем резидентные индексы, держащие отображение старого файла
+        self.indexes.invalidate(table, column)
+        os.replace(tmp_path, path)
+        return path
+
+    def migrate_legacy(self, table, column):
+        """
+            Переводит файл старого формата в хранилище нормализованных векторов.
+            Файл старого формата хранится в репозитории и не удаляется
+        """
+        legacy_path = self.get_legacy_embedding_path(table, column)
+        if not os.path.exists(legacy_path):
+            return False
+        path = self.save_embeddings(table, column, np.load(legacy_path))
+        print(f"[✓] Эмбеддинги переведены в нормализованный формат: {path}")
+        return True
+
+    def load_source(self):
+        path = os.path.join(self.base_path, self.SOURCE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_source(self, fingerprint):
+        """
+            Сохраняет отпечаток прайс-листа, по данным которого обновлены эмбеддинги
+        """
+        if fingerprint is None:
             return
-        print(f"[⏳] Генерация эмбеддингов для {table}.{column}")
-        prep_texts = [self.preproc.preprocess(t, column == "Артикул") for t in texts]
-        emb = self.model.encode(prep_texts, show_progress_bar=True)
+        path = os.path.join(self.base_path, self.SOURCE_FILE)
+        os.makedirs(self.base_path, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f)
+        os.replace(tmp_path, path)
+
+    def is_source_fresh(self, fingerprint):
+        """
+            Эмбеддинги построены по той же версии прайс-листа, что и база
+        """
+        stored = self.load_source()
+        return bool(fingerprint and stored and stored.get("sha256") == fingerprint.get("sha256"))
+
+    def get_manifest_path(self, table, column):
+        """
+            Путь к манифесту: соответствие строк хранилища Артикулу и хешу содержимого
+        """
+        h = hashlib.md5(f"{table}_{column}".encode()).hexdigest()
+        return os.path.join(self.base_path, f"{h}.manifest.json")
+
+    def load_manifest(self, table, column):
+        path = self.get_manifest_path(table, column)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, table, column, artikuls, hashes):
+        path = self.get_manifest_path(table, column)
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        np.save(path, emb)
-        print(f"[✓] Эмбеддинги сохранены: {path}")
+        manifest = {
+            "table":      table,
+            "column":     column,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "rows":       [{"artikul": a, "hash": h} for a, h in zip(artikuls, hashes)],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def row_hash(text):
+        return hashlib.md5(str(text).encode("utf-8")).hexdigest()
+
+    def encode_texts(self, texts, column):
+        """
+            Предобработка и кодирование текстов каталога
+        """
+        prep_texts = self._preprocess_texts(texts)
+        return self.model.encode(prep_texts, show_progress_bar=len(prep_texts) > 100)
+
+    def refresh_all(self):
+        """
+            Инкрементальное обновление эмбеддингов всех таблиц каталога
+        """
+        for table in self.data_manager.get_all_table_names():
+            self.refresh_table(table)
+
+    def refresh_table(self, table, df=None):
+        """
+            Инкрементальное обновление эмбеддингов всех колонок таблицы
+        """
+        if df is None:
+            df = self.data_manager.get_table_data(table)
+        for col in self.COLUMNS:
+            self.generate_and_save(table, col, df[col].astype(str), df["Артикул"].astype(str))
+        for col in self.DROPPED_COLUMNS:
+            self.remove_store(table, col)
+
+    def apply_changes(self, changes):
+        """
+            Обновление эмбеддингов по набору изменений DataManager.update_database:
+            перекодируются только измененные таблицы, хранилища удаленных удаляются
+        """
+        for table in changes.removed:
+            for col in self.COLUMNS:
+                self.remove_store(table, col)
+            self.attribute_indexes.invalidate(table)
+        for table in changes.changed_tables:
+            self.refresh_table(table)
+        self.save_source(self.data_manager.get_source_fingerprint())
+
+    def remove_store(self, table, column):
+        """
+            Удаляет хранилище, манифест и сохраненные индексы пары (таблица, колонка).
+            Файл старого формата из репозитория не удаляется
+        """
+        self.indexes.invalidate(table, column)
+        self.lexical_indexes.invalidate(table, column)
+        prefix = hashlib.md5(f"{table}_{column}".encode()).hexdigest()
+        legacy_path = Path(self.get_legacy_embedding_path(table, column))
+        for path in Path(self.base_path).glob(f"{prefix}.*"):
+            if path == legacy_path:
+                continue
+            path.unlink()
+            print(f"[✓] Удален файл эмбеддингов неиспользуемой колонки: {path}")
+
+    def generate_and_save(self, table, column, texts, artikuls=None):
+        """
+            Инкрементальная генерация эмбеддингов по хешам содержимого строк.
+
+            Векторы строк, текст которых не изменился, переносятся из текущего
+            хранилища; кодируются только новые и измененные строки, векторы
+            удаленных строк отбрасываются. Манифест связывает строки с Артикулом
+        """
+        start = perf_counter()
+        texts = [str(t) for t in texts]
+        artikuls = [str(a) for a in artikuls] if artikuls is not None else [""] * len(texts)
+        hashes = [self.row_hash(t) for t in texts]
+
+        path = self.ensure_store(table, column)
+        manifest = self.load_manifest(table, column)
+        old_vectors = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+
+        if old_vectors is not None and manifest is None:
+            # Хранилище без манифеста создано до инкрементального обновления:
+            # если число строк совпадает, считаем его актуальным
+            if len(old_vectors) == len(texts):
+                self.save_manifest(table, column, artikuls, hashes)
+                print(f"[✓] Манифест создан для существующих эмбеддингов {table}.{column}")
+                return
+            old_vectors = None
+
+        old_rows = {}
+        if old_vectors is not None and len(manifest["rows"]) == len(old_vectors):
+            old_hashes = [row["hash"] for row in manifest["rows"]]
+            if old_hashes == hashes:
+                if [row["artikul"] for row in manifest["rows"]] != artikuls:
+                    self.save_manifest(table, column, artikuls, hashes)
+                return
+            for i, h in enumerate(old_hashes):
+                old_rows.setdefault(h, i)
+
+        to_encode = [i for i, h in enumerate(hashes) if h not in old_rows]
+        print(f"[⏳] Обновление эмбеддингов для {table}.{column}: {len(to_encode)} из {len(texts)} строк")
+
+        if to_encode:
+            encoded = self.normalize(self.encode_texts([texts[i] for i in to_encode], column))
+            dim = encoded.shape[1]
+        else:
+            dim = old_vectors.shape[1] if old_vectors is not None else self.model.get_sentence_embedding_dimension()
+
+        emb = np.empty((len(texts), dim), dtype=np.float32)
+        for i, h in enumerate(hashes):
+            if h in old_rows:
+                emb[i] = old_vectors[old_rows[h]]
+        if to_encode:
+            emb[to_encode] = encoded
+
+        removed = len(set(old_rows) - set(hashes))
+        del old_vectors
+        self.save_embeddings(table, column, emb)
+        self.save_manifest(table, column, artikuls, hashes)
+        print(
+            f"[✓] Эмбеддинги сохранены: {path} "
+            f"(перенесено {len(texts) - len(to_encode)}, закодировано {len(to_encode)}, "
+            f"удалено {removed}, {perf_counter() - start:.2f}s)"
+        )
 
     def load_embeddings(self, table, column):
+        """
+            Открывает нормализованные векторы только на чтение через mmap:
+            страницы файла делятся между всеми процессами бота через page cache
+        """
+        return np.load(self.ensure_store(table, column), mmap_mode="r")
+
+    def ensure_store(self, table, column):
+        """
+            Возвращает путь к хранилищу, при необходимости переводя старый формат
+        """
         path = self.get_embedding_path(table, column)
-        emb = np.load(path)
-        emb /= np.linalg.norm(emb, axis=1, keepdims=True)
-        return emb
+        if not os.path.exists(path):
+            self.migrate_legacy(table, column)
+        return path
+
+    def get_index_version(self, table, column):
+        """
+            Версия данных индекса: время изменения и размер файла эмбеддингов, настройки индекса
+        """
+        stat = os.stat(self.ensure_store(table, column))
+        return (stat.st_mtime_ns, stat.st_size) + config.embedding.get_index_settings(table, column)
+
+    def get_faiss_index_path(self, table, column, index_type, quantization="none"):
+        h = hashlib.md5(f"{table}_{column}".encode()).hexdigest()
+        suffix = index_type if quantization == "none" else f"{index_type}.{quantization}"
+        return os.path.join(self.base_path, f"{h}.{suffix}.faiss")
 
-    def search(self, table, column, query, top_k=5):
+    def build_index(self, table, column):
+        """
+            Строит индекс настроенного для пары типа и квантования.
+            Точный индекс без квантования работает прямо по mmap-хранилищу,
+            остальные сохраняются на диск и загружаются, пока хранилище не изменилось.
+            Квантованные индексы оборачиваются в повторное ранжирование
+            по полноточным векторам
+        """
+        index_type, quantization = config.embedding.get_index_settings(table, column)
+        vectors = self.load_embeddings(table, column)
+        if index_type == "flat" and quantization == "none":
+            return SharedFlatIndex(vectors)
+
+        path = self.get_faiss_index_path(table, column, index_type, quantization)
+        store_mtime = os.path.getmtime(self.get_embedding_path(table, column))
+        if os.path.exists(path) and os.path.getmtime(path) >= store_mtime:
+            index = faiss.read_index(path)
+        else:
+            index = build_faiss_index(
+                vectors, index_type, quantization,
+                hnsw_m=config.embedding.hnsw_m,
+                ivf_nlist=config.embedding.ivf_nlist,
+                pq_m=config.embedding.pq_m
+            )
+            tmp_path = f"{path}.tmp"
+            faiss.write_index(index, tmp_path)
+            os.replace(tmp_path, path)
+            print(f"[✓] Индекс {index_type}/{quantization} сохранен: {path}")
+
+        index = tune_index(
+            index,
+            hnsw_ef_search=config.embedding.hnsw_ef_search,
+            ivf_nprobe=config.embedding.ivf_nprobe
+        )
+        if quantization != "none":
+            index = RerankIndex(index, vectors, config.embedding.rerank_factor)
+        return index
+
+    def get_index(self, table, column):
+        """
+            Возвращает резидентный индекс, перестраивая его только при изменении данных
+        """
+        return self.indexes.get(
+            (table, column),
+            self.get_index_version(table, column),
+            lambda: self.build_index(table, column)
+        )
+
+    @staticmethod
+    def normalize_query(query):
+        """
+            Приведение запроса к каноничному виду: ключ кэша и текст для модели
+        """
+        return " ".join(str(query).lower().split())
+
+    def encode_query(self, query):
+        """
+            Вектор запроса через LRU-кэш: при попадании модель не вызывается
+        """
+        return self.encode_queries([query])[0]
+
+    def encode_queries(self, queries):
+        """
+            Векторы для списка запросов: из кэша берутся готовые,
+            остальные кодируются одним батчевым проходом модели
+        """
+        keys = [self.normalize_query(q) for q in queries]
+        vectors = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self.query_cache.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                vectors[key] = vector
+
+        if missing:
+            encoded = self._encode_batch(missing)
+            for key, vector in zip(missing, encoded):
+                self.query_cache.put(key, vector)
+                vectors[key] = vector
+
+        return np.array([vectors[key] for key in keys], dtype=np.float32)
+
+    def _encode_batch(self, texts):
+        """
+            Нормализованные векторы запросов: сходство с каталогом - косинус
+        """
+        return self.normalize(self.model.encode(texts, batch_size=len(texts), show_progress_bar=False))
+
+    async def aencode_queries(self, queries):
+        """
+            Асинхронный аналог encode_queries: промахи кэша кодируются через
+            общую очередь InferenceBatcher вместе с запросами других пользователей
+        """
+        keys = [self.normalize_query(q) for q in queries]
+        vectors = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self.query_cache.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                vectors[key] = vector
+
+        if missing:
+            encoded = await self.batcher.encode_many(missing)
+            for key, vector in zip(missing, encoded):
+                self.query_cache.put(key, vector)
+                vectors[key] = vector
+
+        return np.array([vectors[key] for key in keys], dtype=np.float32)
+
+    def search(self, table, column, query, top_k=5, filters=None):
+        """
+            Гибридный поиск по таблице. filters - SearchFilters (раздел, классы, цена),
+            применяются внутри индексов до выбора top_k
+        """
+        distances, indices = self.search_many(table, column, [query], top_k, filters)
+        if distances is None:
+            return None, None
+        return distances[0], indices[0]
+
+    async def asearch(self, table, column, query, top_k=5, filters=None):
+        """
+            Асинхронный гибридный поиск по одной таблице: кодирование через общую
+            очередь микро-батчинга, индексы - в ограниченном пуле потоков
+        """
         try:
-            emb = self.load_embeddings(table, column)
-            index = faiss.IndexFlatIP(emb.shape[1])
-            index.add(emb)
-            query_embedding = self.model.encode([query])[0]
-            distances, indices = index.search(np.array([query_embedding]), top_k)
+            context = await search_executor.run(self.get_table_context, table, column, filters)
+            distances, indices = await self.ahybrid_search(context, [query], top_k)
             return distances[0], indices[0]
         except Exception as e:
             print(f"[❌] Ошибка при работе с эмбеддингами: {e}")
             return None, None
+
+    def search_many(self, table, column, queries, top_k=5, filters=None):
+        """
+            Гибридный поиск сразу для списка запросов: BM25 и один батчевый проход
+            модели для неоднозначных запросов. Возвращает матрицы (len(queries), top_k)
+        """
+        if len(queries) == 0:
+            return np.empty((0, top_k), dtype=np.float32), np.empty((0, top_k), dtype=np.int64)
+        try:
+            return self.hybrid_search(self.get_table_context(table, column, filters), queries, top_k)
+        except Exception as e:
+            print(f"[❌] Ошибка при работе с эмбеддингами: {e}")
+            return None, None
+
+    def get_lexical_index(self, table, column):
+        """
+            Резидентный индекс BM25 по колонке таблицы, версия совпадает с векторным индексом
+        """
+        return self.lexical_indexes.get(
+            (table, column),
+            self.get_index_version(table, column),
+            lambda: BM25Index(self.data_manager.get_table_data(table)[column].astype(str).tolist())
+        )
+
+    def get_table_context(self, table, column, filters=None):
+        """
+            Контекст гибридного поиска по таблице; filters - фильтры по атрибутам
+        """
+        vectors = self.load_embeddings(table, column)
+        index = self.get_index(table, column)
+        allowed = self.get_filter_mask(self.get_attribute_index(table), filters, len(vectors))
+        return HybridContext(
+            lexical=self.get_lexical_index(table, column),
+            dense_search=lambda queries, k: filtered_search(index, queries, k, allowed),
+            vectors_fn=lambda ids: np.asarray(vectors[ids], dtype=np.float32),
+            allowed=allowed,
+            index=index
+        )
+
+    def get_attribute_index(self, table):
+        """
+            Колоночные атрибуты таблицы (раздел, класс, цена) для фильтров поиска
+        """
+        return self.attribute_indexes.get(
+            (table, self.ATTRIBUTES),
+            self.data_manager.get_data_version(),
+            lambda: AttributeIndex.from_frame(self.data_manager.get_table_data(table))
+        )
+
+    def get_catalog_attribute_index(self):
+        """
+            Колоночные атрибуты всех листов, id совпадают с get_catalog_index
+        """
+        tables = self.data_manager.get_all_table_names()
+        return self.attribute_indexes.get(
+            (self.ALL_TABLES, self.ATTRIBUTES),
+            (self.data_manager.get_data_version(), tuple(tables)),
+            lambda: AttributeIndex.from_frames([self.data_manager.get_table_data(table) for table in tables])
+        )
+
+    @staticmethod
+    def get_filter_mask(attributes, filters, ntotal):
+        """
+            Маска id по фильтрам. Если атрибуты не совпадают с векторами по числу
+            строк (эмбеддинги еще не обновлены после загрузки прайса), фильтр не применяется
+        """
+        allowed = attributes.mask(filters)
+        if allowed is not None and len(allowed) != ntotal:
+            logger.warning(f"Search filters skipped: {len(allowed)} attribute rows for {ntotal} vectors")
+            return None
+        return allowed
+
+    def plan_hybrid(self, context, queries):
+        """
+            Лексический этап: кандидаты BM25 для каждого запроса, ответы быстрого
+            пути и номера запросов, которым нужен векторный поиск
+        """
+        hits, fast, dense = [], {}, []
+        for qi, query in enumerate(queries):
+            scores, ids = context.lexical.search(query, config.embedding.hybrid_candidates, context.allowed)
+            hits.append(ids)
+            if context.lexical.is_decisive(
+                query, scores, ids,
+                config.embedding.hybrid_fastpath_overlap,
+                config.embedding.hybrid_fastpath_margin
+            ):
+                fast[qi] = ids
+            else:
+                dense.append(qi)
+
+        with self._stats_lock:
+            self.hybrid_stats["queries"]   += len(queries)
+            self.hybrid_stats["fast_path"] += len(fast)
+        return hits, fast, dense
+
+    def fuse_hybrid(self, context, queries, plan, query_vectors, top_k):
+        """
+            Векторный этап и слияние рейтингов BM25 и FAISS методом RRF.
+            query_vectors - векторы только запросов векторного этапа (в порядке dense);
+            их сходство - косинус к вектору запроса. Запросы быстрого пути не кодируются,
+            их оценка переводится в шкалу порогов косинуса: однозначный лучший результат
+            получает FASTPATH_STRONG_SCORE и выше, остальные - ниже него пропорционально
+            доле общих токенов. Пустые позиции имеют id -1
+        """
+        hits, fast, dense = plan
+        distances = np.zeros((len(queries), top_k), dtype=np.float32)
+        indices   = np.full((len(queries), top_k), -1, dtype=np.int64)
+
+        for qi, ids in fast.items():
+            ids = np.asarray(ids[:top_k], dtype=np.int64)
+            if len(ids):
+                overlaps = np.array([context.lexical.overlap(queries[qi], i) for i in ids], dtype=np.float32)
+                scores   = self.FASTPATH_STRONG_SCORE * overlaps
+                scores[0] = self.FASTPATH_STRONG_SCORE + (1 - self.FASTPATH_STRONG_SCORE) * overlaps[0]
+                distances[qi, :len(ids)] = scores
+                indices[qi, :len(ids)]   = ids
+
+        if dense:
+            _, dense_ids = context.dense_search(query_vectors, config.embedding.hybrid_candidates)
+            for qi, query_vector, query_dense in zip(dense, query_vectors, dense_ids):
+                ids = np.array(
+                    reciprocal_rank_fusion([query_dense, hits[qi]], config.embedding.rrf_k)[:top_k],
+                    dtype=np.int64
+                )
+                if len(ids):
+                    distances[qi, :len(ids)] = context.vectors_fn(ids) @ query_vector
+                    indices[qi, :len(ids)]   = ids
+
+        return distances, indices
+
+    def hybrid_search(self, context, queries, top_k=5):
+        plan = self.plan_hybrid(context, queries)
+        dense = plan[2]
+        query_vectors = self.encode_queries([queries[qi] for qi in dense]) if dense else None
+        return self.fuse_hybrid(context, queries, plan, query_vectors, top_k)
+
+    async def ahybrid_search(self, context, queries, top_k=5):
+        plan = await search_executor.run(self.plan_hybrid, context, queries)
+        dense = plan[2]
+        query_vectors = await self.aencode_queries([queries[qi] for qi in dense]) if dense else None
+        return await search_executor.run(self.fuse_hybrid, context, queries, plan, query_vectors, top_k)
+
+    def get_catalog_version(self, tables, column):
+        return tuple((table,) + self.get_index_version(table, column) for table in tables)
+
+    def get_catalog_index(self, column):
+        """
+            Единый индекс по колонке всех листов каталога.
+            Перестраивается, когда меняется набор таблиц или векторы любой из них
+        """
+        tables = self.data_manager.get_all_table_names()
+        return self.indexes.get(
+            (self.ALL_TABLES, column),
+            self.get_catalog_version(tables, column),
+            lambda: self.build_catalog_index(tables, column)
+        )
+
+    def get_catalog_lexical_index(self, column):
+        """
+            Единый индекс BM25 по колонке всех листов, id совпадают с get_catalog_index
+        """
+        tables = self.data_manager.get_all_table_names()
+        return self.lexical_indexes.get(
+            (self.ALL_TABLES, column),
+            self.get_catalog_version(tables, column),
+            lambda: BM25Index([
+                text
+                for table in tables
+                for text in self.data_manager.get_table_data(table)[column].astype(str)
+            ])
+        )
+
+    def build_catalog_index(self, tables, column):
+        """
+            Строит единый индекс по листам. Приближенные и квантованные индексы
+            сохраняются на диск и загружаются, пока не изменились состав листов
+            и их хранилища (так готовая сборка каталога не строит их при старте)
+        """
+        parts, table_ids, rows = [], [], []
+        for table_id, table in enumerate(tables):
+            vectors = self.load_embeddings(table, column)
+            parts.append(vectors)
+            table_ids.append(np.full(len(vectors), table_id, dtype=np.int32))
+            rows.append(np.arange(len(vectors), dtype=np.int64))
+
+        vectors = np.concatenate(parts).astype(np.float32, copy=False)
+        index_type, quantization = config.embedding.get_index_settings(self.ALL_TABLES, column)
+        if index_type == "flat" and quantization == "none":
+            index = SharedFlatIndex(vectors)
+        else:
+            tables_key = hashlib.md5("|".join(tables).encode()).hexdigest()[:8]
+            path = self.get_faiss_index_path(self.ALL_TABLES, f"{column}.{tables_key}", index_type, quantization)
+            store_mtime = max(os.path.getmtime(self.get_embedding_path(table, column)) for table in tables)
+            if os.path.exists(path) and os.path.getmtime(path) >= store_mtime:
+                index = faiss.read_index(path)
+            else:
+                index = build_faiss_index(
+                    vectors, index_type, quantization,
+                    hnsw_m=config.embedding.hnsw_m,
+                    ivf_nlist=config.embedding.ivf_nlist,
+                    pq_m=config.embedding.pq_m
+                )
+                tmp_path = f"{path}.tmp"
+                faiss.write_index(index, tmp_path)
+                os.replace(tmp_path, path)
+                print(f"[✓] Индекс каталога {index_type}/{quantization} сохранен: {path}")
+            index = tune_index(
+                index,
+                hnsw_ef_search=config.embedding.hnsw_ef_search,
+                ivf_nprobe=config.embedding.ivf_nprobe
+            )
+            if quantization != "none":
+                index = RerankIndex(index, vectors, config.embedding.rerank_factor)
+
+        return CatalogIndex(index, list(tables), np.concatenate(table_ids), np.concatenate(rows))
+
+    def get_catalog_context(self, column, tables=None, filters=None):
+        """
+            Контекст гибридного поиска по каталогу; tables - фильтр по листам,
+            filters - фильтры по атрибутам. Обе маски объединяются и применяются
+            внутри FAISS и BM25
+        """
+        index = self.get_catalog_index(column)
+        allowed = index.table_mask(tables) if tables is not None else None
+        attributes_mask = self.get_filter_mask(self.get_catalog_attribute_index(), filters, index.ntotal)
+        if attributes_mask is not None:
+            allowed = attributes_mask if allowed is None else allowed & attributes_mask
+
+        def vectors_fn(ids):
+            stores = {}
+            rows = []
+            for table, row in index.resolve(ids):
+                if table not in stores:
+                    stores[table] = self.load_embeddings(table, column)
+                rows.append(stores[table][row])
+            return np.asarray(rows, dtype=np.float32)
+
+        return HybridContext(
+            lexical=self.get_catalog_lexical_index(column),
+            dense_search=lambda queries, k: index.search(queries, k, allowed=allowed),
+            vectors_fn=vectors_fn,
+            allowed=allowed,
+            index=index
+        )
+
+    @staticmethod
+    def resolve_catalog_results(context, distances, indices):
+        """
+            Перевод матриц результата в списки (таблица, строка, сходство)
+        """
+        results = []
+        for query_distances, query_ids in zip(distances, indices):
+            found = context.index.resolve(query_ids)
+            scores = [float(d) for d, i in zip(query_distances, query_ids) if i >= 0]
+            results.append([(table, row, score) for (table, row), score in zip(found, scores)])
+        return results
+
+    def search_catalog(self, column, query, top_k=5, tables=None, filters=None):
+        """
+            Поиск по всему каталогу: список (таблица, строка, сходство)
+        """
+        return self.search_catalog_many(column, [query], top_k, tables, filters)[0]
+
+    def search_catalog_many(self, column, queries, top_k=5, tables=None, filters=None):
+        """
+            Пакетный гибридный поиск по единому индексу каталога.
+            tables - необязательный фильтр по листам, применяется внутри индексов.
+            Для каждого запроса возвращает список (таблица, строка, сходство)
+        """
+        if len(queries) == 0:
+            return []
+        try:
+            context = self.get_catalog_context(column, tables, filters)
+            return self.resolve_catalog_results(context, *self.hybrid_search(context, queries, top_k))
+        except Exception as e:
+            print(f"[❌] Ошибка при поиске по каталогу: {e}")
+            return [[] for _ in queries]
+
+    async def asearch_catalog(self, column, query, top_k=5, tables=None, filters=None):
+        """
+            Асинхронный поиск по всему каталогу: список (таблица, строка, сходство)
+        """
+        return (await self.asearch_catalog_many(column, [query], top_k, tables, filters))[0]
+
+    async def asearch_catalog_many(self, column, queries, top_k=5, tables=None, filters=None):
+        """
+            Асинхронный пакетный гибридный поиск по каталогу: запросы кодируются
+            через общую очередь микро-батчинга, индексы - в ограниченном пуле потоков
+        """
+        if len(queries) == 0:
+            return []
+        try:
+            context = await search_executor.run(self.get_catalog_context, column, tables, filters)
+            distances, indices = await self.ahybrid_search(context, queries, top_k)
+            return self.resolve_catalog_results(context, distances, indices)
+        except Exception as e:
+            print(f"[❌] Ошибка при поиске по каталогу: {e}")
+            return [[] for _ in queries]
+
+    def get_hybrid_stats(self):
+        with self._stats_lock:
+            return dict(self.hybrid_stats)
+
+    def inference_stats(self):
+        """
+            Метрики очереди кодирования, пула поиска, кэша запросов, быстрого пути
+            и второго этапа ранжирования
+        """
+        return {
+            "hybrid":      self.get_hybrid_stats(),
+            "batcher":     self.batcher.stats(),
+            "executor":    search_executor.stats(),
+            "query_cache": self.query_cache.stats(),
+            "rerank":      rerank_stats(),
+        }
@@ -0,0 +1,115 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_encoder.py               ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль отвечает за загрузку модели-кодировщика SentenceTransformer
+        с выбранным бэкендом вывода на CPU:
+        • torch      - исходная модель PyTorch (eager)
+        • torch-int8 - динамическое квантование nn.Linear в int8 средствами PyTorch
+        • onnx       - экспортированный граф ONNX (onnxruntime)
+        • onnx-int8  - граф ONNX с динамически квантованными в int8 весами
+
+        Экспортированные ONNX-модели сохраняются в data/models и при следующих
+        запусках загружаются без повторного экспорта.
+
+    Функциональность:
+        - load_encoder: загрузка модели с указанным бэкендом
+        - encoder_parity: косинусная близость векторов бэкенда к PyTorch
+
+    Примеры использования:
+        model = load_encoder("sberbank-ai/sbert_large_nlu_ru", backend="onnx")
+        vectors = model.encode(["тетрадь в клетку"])
+"""
+
+import numpy as np
+
+from pathlib               import Path
+from typing                import Dict, Sequence
+from sentence_transformers import SentenceTransformer
+
+from src.utils import logger
+
+
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Каталог для экспортированных ONNX-моделей
+MODELS_PATH = "data/models"
+
+
+def get_onnx_path(model_name: str, cache_dir: str = MODELS_PATH) -> Path:
+    """
+        Локальный каталог экспортированной ONNX-модели
+    """
+    return Path(cache_dir) / f"{model_name.replace('/', '__')}-onnx"
+
+
+def export_onnx(model_name: str, cache_dir: str = MODELS_PATH) -> Path:
+    """
+        Экспорт модели в ONNX (один раз) с сохранением в cache_dir
+    """
+    path = get_onnx_path(model_name, cache_dir)
+    if not (path / "modules.json").exists():
+        logger.info(f"Exporting {model_name} to ONNX: {path}")
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+        model.save_pretrained(str(path))
+    return path
+
+
+def load_encoder(
+    model_name: str,
+    backend: str = "torch",
+    cache_dir: str = MODELS_PATH,
+    onnx_quantization: str = "avx2"
+) -> SentenceTransformer:
+    """
+        Загрузка модели-кодировщика с выбранным бэкендом
+
+        onnx_quantization - целевой набор инструкций для onnx-int8:
+                            arm64, avx2, avx512, avx512_vnni
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {ENCODER_BACKENDS}")
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(model_name, device="cpu")
+        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
+    path = export_onnx(model_name, cache_dir)
+    if backend == "onnx":
+        return SentenceTransformer(str(path), device="cpu", backend="onnx")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    file_name = f"onnx/model_qint8_{onnx_quantization}.onnx"
+    if not (path / file_name).exists():
+        logger.info(f"Quantizing ONNX model for {onnx_quantization}: {path / file_name}")
+        model = SentenceTransformer(str(path), device="cpu", backend="onnx")
+        export_dynamic_quantized_onnx_model(model, onnx_quantization, str(path))
+    return SentenceTransformer(str(path), device="cpu", backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def encoder_parity(
+    reference: SentenceTransformer,
+    candidate: SentenceTransformer,
+    texts: Sequence[str],
+    batch_size: int = 32
+) -> Dict[str, float]:
+    """
+        Косинусная близость векторов candidate к векторам reference на одних текстах
+    """
+    expected = reference.encode(list(texts), batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+    actual   = candidate.encode(list(texts), batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+    cosine   = (np.asarray(expected) * np.asarray(actual)).sum(axis=1)
+    return {
+        "min":  float(cosine.min()),
+        "mean": float(cosine.mean()),
+        "p01":  float(np.percentile(cosine, 1)),
+    }
@@ -0,0 +1,273 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_filters.py               ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует фильтрацию поиска по атрибутам товаров:
+        • Разбор строк-заголовков прайс-листа в иерархию разделов
+          ("НАЧАЛЬНАЯ ШКОЛА" -> "Русский язык (начальная школа)" -> товары)
+        • Разбор диапазона классов из колонки "Класс" или названия раздела
+        • Извлечение фильтров из текста запроса ("для 5 класса дешевле 1000")
+        • Колоночный индекс атрибутов, который превращает фильтры в булеву
+          маску id; маска применяется внутри FAISS и BM25 (IDSelectorBitmap),
+          а не фильтрацией готового top-k
+
+    Основные компоненты:
+        - SearchFilters: фильтры поиска (раздел, диапазон классов, диапазон цены)
+        - AttributeIndex: колоночные массивы атрибутов и построение маски
+        - assign_categories: иерархия разделов при загрузке листа
+        - parse_query_filters: фильтры из текста запроса
+
+    Примеры использования:
+        query, filters = parse_query_filters("карты для 5 класса дешевле 1000")
+        allowed = AttributeIndex.from_frame(df).mask(filters)
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+from dataclasses import dataclass
+from typing      import Optional, Sequence, Tuple
+
+
+# Колонки иерархии, добавляемые к товарам при загрузке прайс-листа
+SECTION_COLUMN    = "Раздел"
+SUBSECTION_COLUMN = "Подраздел"
+
+PRICE_COLUMN = "Цена с НДС"
+CLASS_COLUMN = "Класс"
+
+# Ступени школы и соответствующие диапазоны классов
+SCHOOL_LEVELS = (
+    ("начальн", (1, 4)),
+    ("основн",  (5, 9)),
+    ("средн",   (10, 11)),
+    ("старш",   (10, 11)),
+    ("дошкол",  (0, 0)),
+)
+
+CLASS_RANGE_PATTERN = re.compile(r"(\d{1,2})\s*(?:-|–|—|по|до)\s*(\d{1,2})")
+CLASS_PATTERN       = re.compile(r"\b(\d{1,2})\b")
+
+QUERY_CLASSES_PATTERN   = re.compile(r"(?:для\s+|с\s+|от\s+)?(\d{1,2})\s*(?:-|–|—|по|до)\s*(\d{1,2})(?:\s*-?\s*(?:го|ого|ый|й))?\s*класс\w*", re.IGNORECASE)
+QUERY_CLASS_PATTERN     = re.compile(r"(?:для\s+)?(\d{1,2})(?:\s*-?\s*(?:го|ого|ый|й))?\s*класс\w*", re.IGNORECASE)
+
+# Цена в запросе: "1000", "1 500", "99,90"; число не обрывается на середине
+PRICE_NUMBER   = r"(\d+(?:\s\d{3})*(?:[.,]\d+)?)(?!\s*[.,]?\d)"
+PRICE_CURRENCY = r"\s*(?:р|руб\w*|₽)(?!\w)"
+# Единицы после числа, при которых "дешевле N"/"дороже N" - не цена
+PRICE_UNITS    = r"\s*(?:(?:см|мм|мл|м|л|г|гр|кг|шт|кл)(?!\w)|лист|лет|год|класс|%)"
+
+
+def _price_pattern(verbs: str, preposition: str, range_end: bool = False):
+    """
+        Граница цены: после сравнения ("дешевле 1000") - если за числом не идет
+        единица измерения, после предлога ("до 1000 руб") - только с валютой,
+        чтобы "до 30 см" и "от 3 лет" не становились ценой.
+        range_end - валюта может стоять после конца диапазона ("от 100 до 500 руб")
+    """
+    currency = PRICE_CURRENCY
+    if range_end:
+        currency = rf"(?:{PRICE_CURRENCY}|(?=\s+до\s+\d+(?:\s\d{{3}})*(?:[.,]\d+)?{PRICE_CURRENCY}))"
+    return re.compile(
+        rf"(?:{verbs})(?:\s+чем)?\s+{PRICE_NUMBER}(?:{PRICE_CURRENCY}|(?!{PRICE_UNITS}))"
+        rf"|\b{preposition}\s+{PRICE_NUMBER}{currency}",
+        re.IGNORECASE
+    )
+
+
+QUERY_PRICE_MAX_PATTERN = _price_pattern(r"(?<!не\s)дешевле|не\s+дороже", "до")
+QUERY_PRICE_MIN_PATTERN = _price_pattern(r"(?<!не\s)дороже|не\s+дешевле", "от", range_end=True)
+
+
+@dataclass
+class SearchFilters:
+    """
+        Фильтры поиска; None - фильтр не задан
+    """
+    category:  Optional[str]             = None
+    grade:     Optional[Tuple[int, int]] = None
+    price_min: Optional[float]           = None
+    price_max: Optional[float]           = None
+
+    def is_empty(self) -> bool:
+        return self.category is None and self.grade is None and self.price_min is None and self.price_max is None
+
+
+def parse_class_range(value) -> Tuple[float, float]:
+    """
+        Диапазон классов из значения "Класс" или названия раздела: "5-9" -> (5, 9),
+        "7" -> (7, 7), "начальная школа" -> (1, 4). Неизвестный класс - (nan, nan)
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return np.nan, np.nan
+    text = str(value).lower()
+
+    match = CLASS_RANGE_PATTERN.search(text)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        return float(low), float(high)
+    match = CLASS_PATTERN.search(text)
+    if match and int(match.group(1)) <= 11:
+        return float(match.group(1)), float(match.group(1))
+    for keyword, (low, high) in SCHOOL_LEVELS:
+        if keyword in text:
+            return float(low), float(high)
+    return np.nan, np.nan
+
+
+def assign_categories(
+    df:          pd.DataFrame,
+    key_column:  str            = "Артикул",
+    name_column: str            = "Наименование",
+    state:       Optional[dict] = None
+) -> pd.DataFrame:
+    """
+        Разбор строк-заголовков листа в иерархию разделов.
+
+        Строка без артикула с непустым наименованием - заголовок: наименование
+        прописными буквами открывает раздел, остальные - подраздел. Товарам
+        проставляются колонки "Раздел" и "Подраздел", строки-заголовки удаляются.
+
+        state - текущие раздел и подраздел при разборе листа частями:
+        словарь передается во все части подряд и обновляется на месте
+    """
+    if key_column not in df.columns or name_column not in df.columns:
+        return df.dropna(subset=[key_column]) if key_column in df.columns else df
+
+    state = {} if state is None else state
+    sections, subsections = [], []
+    section, subsection = state.get("section"), state.get("subsection")
+    for artikul, name in zip(df[key_column], df[name_column]):
+        if pd.isna(artikul) and not pd.isna(name) and str(name).strip():
+            title = " ".join(str(name).split())
+            if title.isupper():
+                section, subsection = title, None
+            else:
+                subsection = title
+        sections.append(section)
+        subsections.append(subsection)
+    state.update(section=section, subsection=subsection)
+
+    df = df.assign(**{SECTION_COLUMN: sections, SUBSECTION_COLUMN: subsections})
+    return df.dropna(subset=[key_column])
+
+
+def parse_price(match: re.Match) -> float:
+    """
+        Цена из совпадения QUERY_PRICE_*_PATTERN: "1 500" -> 1500.0, "99,90" -> 99.9
+    """
+    number = match.group(1) or match.group(2)
+    return float(re.sub(r"\s", "", number).replace(",", "."))
+
+
+def parse_query_filters(text: str) -> Tuple[str, SearchFilters]:
+    """
+        Извлечение фильтров из текста запроса.
+        Возвращает запрос без фрагментов-фильтров и сами фильтры
+    """
+    filters = SearchFilters()
+
+    match = QUERY_CLASSES_PATTERN.search(text)
+    if match:
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        filters.grade = (low, high)
+        text = text[:match.start()] + text[match.end():]
+    else:
+        match = QUERY_CLASS_PATTERN.search(text)
+        if match and int(match.group(1)) <= 11:
+            filters.grade = (int(match.group(1)), int(match.group(1)))
+            text = text[:match.start()] + text[match.end():]
+
+    # Нижняя граница - первой: в "от 100 до 500 руб" валюта стоит после верхней
+    match = QUERY_PRICE_MIN_PATTERN.search(text)
+    if match:
+        filters.price_min = parse_price(match)
+        text = text[:match.start()] + text[match.end():]
+
+    match = QUERY_PRICE_MAX_PATTERN.search(text)
+    if match:
+        filters.price_max = parse_price(match)
+        text = text[:match.start()] + text[match.end():]
+
+    return " ".join(text.split()), filters
+
+
+class AttributeIndex:
+    """
+        Колоночные массивы атрибутов товаров, id совпадают с id векторного индекса
+    """
+
+    def __init__(self, sections: np.ndarray, subsections: np.ndarray, grades: np.ndarray, prices: np.ndarray):
+        self.sections    = sections
+        self.subsections = subsections
+        self.grade_min   = grades[:, 0]
+        self.grade_max   = grades[:, 1]
+        self.prices      = prices
+        self.ntotal      = len(prices)
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[pd.DataFrame]) -> "AttributeIndex":
+        """
+            Индекс по таблицам, взятым подряд (как в едином индексе каталога)
+        """
+        sections, subsections, grades, prices = [], [], [], []
+        for df in frames:
+            n = len(df)
+            section    = cls._text_column(df, SECTION_COLUMN, n)
+            subsection = cls._text_column(df, SUBSECTION_COLUMN, n)
+            sections.append(section)
+            subsections.append(subsection)
+
+            classes = df[CLASS_COLUMN] if CLASS_COLUMN in df.columns else [None] * n
+            grades.append(np.array([
+                parse_class_range(value) if not pd.isna(value) else parse_class_range(f"{sub} {sec}")
+                for value, sub, sec in zip(classes, subsection, section)
+            ], dtype=np.float32).reshape(n, 2))
+
+            price = pd.to_numeric(df[PRICE_COLUMN], errors="coerce") if PRICE_COLUMN in df.columns else pd.Series(np.nan, index=df.index)
+            prices.append(price.to_numpy(dtype=np.float32))
+
+        if not frames:
+            return cls(np.array([], dtype=object), np.array([], dtype=object), np.empty((0, 2), np.float32), np.array([], np.float32))
+        return cls(np.concatenate(sections), np.concatenate(subsections), np.concatenate(grades), np.concatenate(prices))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AttributeIndex":
+        return cls.from_frames([df])
+
+    @staticmethod
+    def _text_column(df: pd.DataFrame, column: str, n: int) -> np.ndarray:
+        if column not in df.columns:
+            return np.full(n, "", dtype=object)
+        return df[column].fillna("").astype(str).str.lower().to_numpy(dtype=object)
+
+    def mask(self, filters: Optional[SearchFilters]) -> Optional[np.ndarray]:
+        """
+            Булева маска id, удовлетворяющих фильтрам (None - фильтров нет).
+            Товары без указанного класса фильтром по классу не отбрасываются
+        """
+        if filters is None or filters.is_empty():
+            return None
+        allowed = np.ones(self.ntotal, dtype=bool)
+
+        if filters.category:
+            category = filters.category.lower()
+            in_section    = np.array([category in value for value in self.sections], dtype=bool)
+            in_subsection = np.array([category in value for value in self.subsections], dtype=bool)
+            allowed &= in_section | in_subsection
+
+        if filters.grade is not None:
+            # Диапазон классов товара пересекается с запрошенным
+            low, high = filters.grade
+            unknown = np.isnan(self.grade_min)
+            allowed &= unknown | ((self.grade_min <= high) & (low <= self.grade_max))
+
+        if filters.price_min is not None:
+            allowed &= self.prices >= filters.price_min
+        if filters.price_max is not None:
+            allowed &= self.prices <= filters.price_max
+
+        return allowed
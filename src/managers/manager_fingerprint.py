@@ -0,0 +1,52 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                  Модуль manager_fingerprint.py             ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует отпечаток файла прайс-листа (размер, время изменения,
+        sha256), по которому при старте решается, нужно ли пересобирать
+        базу, эмбеддинги и сборку каталога:
+        • Совпадение размера и времени изменения проверяется без чтения файла
+        • При расхождении сравнивается sha256: копия того же файла с новым
+          временем изменения изменением не считается
+
+    Основные компоненты:
+        - file_fingerprint: размер, время изменения и sha256 файла
+        - source_changed: сравнение файла с сохраненным отпечатком
+
+    Примеры использования:
+        changed, reason = source_changed("data/excel/price-list.xlsx", artifact.manifest["source"])
+"""
+
+import os
+import hashlib
+
+from typing import Any, Dict, Optional, Tuple
+
+
+def file_fingerprint(path) -> Dict[str, Any]:
+    """
+        Размер, время изменения и sha256 файла
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256.hexdigest()}
+
+
+def source_changed(path, stored: Optional[Dict[str, Any]]) -> Tuple[bool, str]:
+    """
+        Изменился ли файл относительно сохраненного отпечатка; вторым
+        элементом возвращается причина решения для лога
+    """
+    if not stored or "sha256" not in stored:
+        return True, "no stored fingerprint"
+    stat = os.stat(path)
+    if stat.st_size == stored.get("size") and stat.st_mtime_ns == stored.get("mtime_ns"):
+        return False, "size and mtime match"
+    if file_fingerprint(path)["sha256"] == stored["sha256"]:
+        return False, "mtime changed, sha256 matches"
+    return True, "sha256 differs"
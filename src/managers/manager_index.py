@@ -0,0 +1,392 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_index.py                 ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует реестр резидентных поисковых индексов FAISS.
+        Индекс для пары (таблица, колонка) строится один раз, переиспользуется
+        между запросами и перестраивается только при изменении исходных данных.
+
+    Основные компоненты:
+        - IndexEntry:       Запись реестра (индекс, версия данных, статистика)
+        - IndexRegistry:    Потокобезопасный реестр индексов
+        - SharedFlatIndex:  Точный поиск по скалярному произведению поверх
+                            отображенного в память (mmap) массива векторов
+        - RerankIndex:      Квантованный индекс с точным повторным ранжированием
+        - CatalogIndex:     Единый индекс по всем листам с отображением id → (таблица, строка)
+        - build_faiss_index: Построение индекса заданного типа (flat, hnsw, ivf)
+                             и квантования (none, fp16, int8, pq)
+        - filtered_search:  Поиск с фильтром по id внутри индекса
+        - tune_index:        Настройка параметров поиска (efSearch, nprobe)
+
+    Функциональность:
+        - Ленивое построение индекса при первом обращении
+        - Замена индекса при смене версии данных
+        - Явная инвалидация по таблице и/или колонке
+        - Учет времени построения и количества попаданий/промахов
+        - Приближенный поиск (HNSW, IVF-Flat) для больших каталогов
+        - Квантованное хранение векторов (float16, int8, PQ)
+"""
+
+import threading
+import faiss
+import numpy as np
+
+from time        import perf_counter, time
+from dataclasses import dataclass, field
+from typing      import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.utils   import logger
+
+
+IndexKey = Tuple[str, str]
+
+# Поддерживаемые типы индексов: точный и два приближенных
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+
+# Поддерживаемые способы квантования векторов внутри индекса
+QUANTIZATIONS = ("none", "fp16", "int8", "pq")
+
+# Минимальное число обучающих векторов на кластер IVF (рекомендация FAISS)
+IVF_MIN_POINTS_PER_CENTROID = 39
+
+# Минимальное число обучающих векторов для PQ с 8-битными кодами
+PQ_MIN_TRAIN_POINTS = 256
+
+
+def build_faiss_index(
+    vectors:      np.ndarray,
+    index_type:   str = "flat",
+    quantization: str = "none",
+    hnsw_m:       int = 32,
+    ivf_nlist:    int = 256,
+    pq_m:         int = 64
+):
+    """
+        Строит FAISS-индекс для нормализованных векторов.
+
+        index_type   - структура поиска: flat, hnsw, ivf
+        quantization - хранение векторов в индексе: none (float32), fp16,
+                       int8 (скалярное квантование) или pq (product quantization)
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, d = vectors.shape
+    ip = faiss.METRIC_INNER_PRODUCT
+
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Неподдерживаемый тип индекса: {index_type}. "
+            f"Поддерживаемые: {', '.join(INDEX_TYPES)}"
+        )
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(
+            f"Неподдерживаемое квантование: {quantization}. "
+            f"Поддерживаемые: {', '.join(QUANTIZATIONS)}"
+        )
+    if quantization == "pq" and n < PQ_MIN_TRAIN_POINTS:
+        logger.warning(f"Too few vectors for PQ ({n} < {PQ_MIN_TRAIN_POINTS}), using int8 instead")
+        quantization = "int8"
+
+    sq_type = faiss.ScalarQuantizer.QT_fp16 if quantization == "fp16" else faiss.ScalarQuantizer.QT_8bit
+
+    if index_type == "flat":
+        if quantization == "none":
+            index = faiss.IndexFlatIP(d)
+        elif quantization == "pq":
+            index = faiss.IndexPQ(d, pq_m, 8, ip)
+        else:
+            index = faiss.IndexScalarQuantizer(d, sq_type, ip)
+    elif index_type == "hnsw":
+        if quantization == "none":
+            index = faiss.IndexHNSWFlat(d, hnsw_m, ip)
+        elif quantization == "pq":
+            # Для единичных векторов порядок по L2 совпадает с порядком по
+            # скалярному произведению, точные оценки дает повторное ранжирование
+            index = faiss.IndexHNSWPQ(d, pq_m, hnsw_m)
+        else:
+            index = faiss.IndexHNSWSQ(d, sq_type, hnsw_m, ip)
+    else:
+        # Число кластеров ограничивается размером выборки, иначе обучение вырождается
+        nlist = max(1, min(ivf_nlist, n // IVF_MIN_POINTS_PER_CENTROID))
+        quantizer = faiss.IndexFlatIP(d)
+        if quantization == "none":
+            index = faiss.IndexIVFFlat(quantizer, d, nlist, ip)
+        elif quantization == "pq":
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, pq_m, 8, ip)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, d, nlist, sq_type, ip)
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def tune_index(index, hnsw_ef_search: int = 64, ivf_nprobe: int = 8):
+    """
+        Устанавливает параметры поиска приближенного индекса
+    """
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = hnsw_ef_search
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(ivf_nprobe, index.nlist)
+    return index
+
+
+class SharedFlatIndex:
+    """
+        Точный индекс по скалярному произведению без копирования векторов.
+
+        В отличие от faiss.IndexFlatIP, не копирует данные в собственную память:
+        поиск идет прямо по массиву, открытому через np.load(mmap_mode="r"),
+        поэтому несколько процессов бота делят одну копию в page cache.
+        Векторы должны быть заранее нормализованы.
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.ntotal  = vectors.shape[0]
+        self.d       = vectors.shape[1]
+
+    def search(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Поиск k ближайших векторов, интерфейс совпадает с faiss.Index.search.
+            allowed - необязательная булева маска допустимых id
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        k = min(k, self.ntotal if allowed is None else int(allowed.sum()))
+        if k <= 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+
+        scores = queries @ self.vectors.T
+        if allowed is not None:
+            scores[:, ~allowed] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+
+        indices   = np.take_along_axis(top, order, axis=1).astype(np.int64)
+        distances = np.take_along_axis(top_scores, order, axis=1).astype(np.float32)
+        return distances, indices
+
+
+class RerankIndex:
+    """
+        Квантованный индекс с повторным ранжированием кандидатов.
+
+        Квантованный индекс отбирает top_k * factor кандидатов, после чего их
+        оценки пересчитываются точно по полноточным векторам из mmap-хранилища.
+        В память подгружаются только страницы со строками кандидатов.
+    """
+
+    def __init__(self, index, vectors: np.ndarray, factor: int = 4):
+        self.index   = index
+        self.vectors = vectors
+        self.factor  = max(1, factor)
+        self.ntotal  = index.ntotal
+        self.d       = index.d
+
+    def search(self, queries: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Поиск k ближайших векторов, интерфейс совпадает с faiss.Index.search.
+            allowed - необязательная булева маска допустимых id
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        _, candidates = filtered_search(self.index, queries, min(self.ntotal, k * self.factor), allowed)
+
+        distances = np.full((len(queries), k), np.finfo(np.float32).min, dtype=np.float32)
+        indices   = np.full((len(queries), k), -1, dtype=np.int64)
+        for i, query in enumerate(queries):
+            # Упорядоченные номера строк дают последовательное чтение из mmap
+            rows = np.sort(candidates[i][candidates[i] >= 0])
+            if len(rows) == 0:
+                continue
+            scores = self.vectors[rows] @ query
+            top    = np.argsort(-scores)[:k]
+            distances[i, :len(top)] = scores[top]
+            indices[i, :len(top)]   = rows[top]
+        return distances, indices
+
+
+def filtered_search(index, queries: np.ndarray, k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+        Поиск с ограничением по булевой маске допустимых id.
+
+        Для FAISS-индексов маска упаковывается в битовую карту IDSelectorBitmap
+        и применяется внутри поиска, а не фильтрацией готового top-k
+    """
+    if allowed is None:
+        return index.search(queries, k)
+    if isinstance(index, (SharedFlatIndex, RerankIndex)):
+        return index.search(queries, k, allowed=allowed)
+
+    bitmap = np.packbits(allowed.astype(np.uint8), bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    elif isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return index.search(np.ascontiguousarray(queries, dtype=np.float32), k, params=params)
+
+
+class CatalogIndex:
+    """
+        Единый индекс по всем листам каталога.
+
+        Векторы всех таблиц объединены в один индекс, для каждого глобального id
+        хранится пара (таблица, строка). Поиск по отдельным листам выполняется
+        тем же индексом с фильтром по id.
+    """
+
+    def __init__(self, index, tables: List[str], table_ids: np.ndarray, rows: np.ndarray):
+        self.index     = index
+        self.tables    = tables
+        self.table_ids = table_ids
+        self.rows      = rows
+        self.ntotal    = len(rows)
+
+    def table_mask(self, tables: Iterable[str]) -> np.ndarray:
+        """
+            Булева маска id, принадлежащих указанным таблицам
+        """
+        ids = [self.tables.index(table) for table in tables if table in self.tables]
+        return np.isin(self.table_ids, ids)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k:       int,
+        tables:  Optional[Iterable[str]] = None,
+        allowed: Optional[np.ndarray]    = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Поиск по всему каталогу или только по указанным таблицам
+        """
+        if tables is not None:
+            mask = self.table_mask(tables)
+            allowed = mask if allowed is None else allowed & mask
+        return filtered_search(self.index, queries, k, allowed)
+
+    def resolve(self, ids: Iterable[int]) -> List[Tuple[str, int]]:
+        """
+            Перевод глобальных id в пары (таблица, строка), отрицательные id пропускаются
+        """
+        return [
+            (self.tables[self.table_ids[i]], int(self.rows[i]))
+            for i in ids if i >= 0
+        ]
+
+
+@dataclass
+class IndexEntry:
+    """
+        Запись реестра индексов
+    """
+    index:      Any
+    version:    Hashable
+    build_time: float
+    built_at:   float = field(default_factory=time)
+    hits:       int   = 0
+
+
+class IndexRegistry:
+    """
+        Реестр резидентных индексов с ключом (таблица, колонка)
+    """
+
+    def __init__(self):
+        self._entries:     Dict[IndexKey, IndexEntry]     = {}
+        self._build_locks: Dict[IndexKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.hits       = 0     # Обращения, обслуженные готовым индексом
+        self.misses     = 0     # Обращения, потребовавшие построения индекса
+        self.build_time = 0.0   # Суммарное время построения индексов, сек
+
+    def _get_build_lock(self, key: IndexKey) -> threading.Lock:
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def _lookup(self, key: IndexKey, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                entry.hits += 1
+                self.hits  += 1
+                return entry.index
+        return None
+
+    def get(self, key: IndexKey, version: Hashable, builder: Callable[[], Any]) -> Any:
+        """
+            Возвращает индекс для ключа, при необходимости строит его через builder.
+
+            version - любой хешируемый признак версии исходных данных;
+            при его изменении индекс строится заново и подменяет старый.
+        """
+        index = self._lookup(key, version)
+        if index is not None:
+            return index
+
+        # Построение под отдельной блокировкой ключа, чтобы параллельные
+        # запросы к одной таблице не строили индекс несколько раз
+        with self._get_build_lock(key):
+            index = self._lookup(key, version)
+            if index is not None:
+                return index
+
+            start   = perf_counter()
+            index   = builder()
+            elapsed = perf_counter() - start
+
+            with self._lock:
+                self._entries[key] = IndexEntry(index=index, version=version, build_time=elapsed)
+                self.misses     += 1
+                self.build_time += elapsed
+
+        logger.info(f"Index for {key[0]}.{key[1]} built in {elapsed:.3f}s")
+        return index
+
+    def put(self, key: IndexKey, version: Hashable, index: Any, build_time: float = 0.0):
+        """
+            Атомарная подмена индекса для ключа уже построенным индексом
+        """
+        with self._lock:
+            self._entries[key] = IndexEntry(index=index, version=version, build_time=build_time)
+            self.build_time += build_time
+
+    def invalidate(self, table: Optional[str] = None, column: Optional[str] = None):
+        """
+            Удаляет индексы, подходящие под таблицу и/или колонку (None - любые)
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if (table is None or key[0] == table) and (column is None or key[1] == column):
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+            Статистика реестра: попадания, промахи, время построения по индексам
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits":       self.hits,
+                "misses":     self.misses,
+                "hit_rate":   self.hits / total if total else 0.0,
+                "build_time": self.build_time,
+                "indexes": {
+                    f"{table}.{column}": {
+                        "build_time": entry.build_time,
+                        "built_at":   entry.built_at,
+                        "hits":       entry.hits,
+                    }
+                    for (table, column), entry in self._entries.items()
+                },
+            }
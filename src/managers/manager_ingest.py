@@ -0,0 +1,133 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_ingest.py                ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует потоковое чтение прайс-листа Excel:
+        • openpyxl в режиме read_only читает строки листа по одной,
+          не загружая всю книгу в память
+        • Строки собираются в DataFrame ограниченного размера (порции),
+          иерархия разделов разбирается по порциям с переносом состояния
+        • Пиковый RSS процесса отслеживается во время загрузки
+
+    Основные компоненты:
+        - read_sheet_names: имена листов без чтения их содержимого
+        - iter_sheet_chunks: порции строк листа в виде DataFrame
+        - RssMonitor: фоновое измерение пикового RSS
+
+    Примеры использования:
+        for chunk in iter_sheet_chunks("data/excel/price-list.xlsx", "Цифровые лаборатории", 1000):
+            chunk.to_sql(...)
+"""
+
+import threading
+import pandas as pd
+import psutil
+
+from openpyxl import load_workbook
+from typing   import Iterator, List, Optional, Sequence
+
+from src.managers.manager_filters import assign_categories
+
+
+def read_sheet_names(path) -> List[str]:
+    """
+        Имена листов книги в порядке следования
+    """
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _header(values: Sequence) -> List[str]:
+    """
+        Имена колонок как у pandas.read_excel: пустые - "Unnamed: N",
+        повторяющиеся - с суффиксом ".N"
+    """
+    columns, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def iter_sheet_chunks(
+    path,
+    sheet_name: str,
+    chunk_size: int,
+    key_column: Optional[str] = "Артикул"
+) -> Iterator[pd.DataFrame]:
+    """
+        Строки листа порциями до chunk_size строк. Первая строка листа - заголовок,
+        пустые строки пропускаются, лист без заголовка не дает порций. Если в листе
+        есть key_column, к порциям применяется assign_categories (строки-заголовки
+        разделов удаляются)
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = list(next(rows, None) or [])
+        while header and header[-1] is None:
+            header.pop()  # пустые колонки справа pandas.read_excel тоже отбрасывает
+        if not header:
+            return
+        columns = _header(header)
+        state = {}
+
+        def make_chunk(buffer):
+            df = pd.DataFrame.from_records(buffer, columns=columns)
+            if key_column in df.columns:
+                df = assign_categories(df, key_column=key_column, state=state)
+            return df
+
+        buffer, chunks = [], 0
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            buffer.append(tuple(row[:len(columns)]) + (None,) * (len(columns) - len(row)))
+            if len(buffer) >= chunk_size:
+                yield make_chunk(buffer)
+                buffer, chunks = [], chunks + 1
+        if buffer or not chunks:
+            # Лист только с заголовком дает одну пустую порцию, чтобы таблица была создана
+            yield make_chunk(buffer)
+    finally:
+        workbook.close()
+
+
+class RssMonitor:
+    """
+        Пиковый RSS процесса за время работы блока with (замер каждые interval секунд)
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.process  = psutil.Process()
+        self.start    = 0
+        self.peak     = 0
+        self._stop    = threading.Event()
+        self._thread  = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self.start = self.peak = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return False
@@ -0,0 +1,148 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_lexical.py               ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует лексический поиск BM25, который строится рядом
+        с векторным индексом FAISS и дополняет его в гибридном поиске:
+        • Точные токены (номера классов, размеры, коды моделей), которые
+          плотные векторы часто не различают
+        • Быстрый путь без вызова модели, когда лексическое совпадение
+          однозначно
+        • Слияние лексического и векторного рейтингов методом RRF
+
+    Основные компоненты:
+        - tokenize: разбиение текста на слова и числа
+        - BM25Index: инвертированный индекс с предрасчитанными весами BM25
+        - reciprocal_rank_fusion: слияние рейтингов (Reciprocal Rank Fusion)
+        - HybridContext: лексический и векторный индексы одного листа или каталога
+
+    Примеры использования:
+        lexical = BM25Index(df["Наименование"].astype(str).tolist())
+        scores, ids = lexical.search("глобус 320 мм", k=50)
+        fused = reciprocal_rank_fusion([dense_ids, ids])
+"""
+
+import re
+import numpy as np
+
+from collections import Counter
+from dataclasses import dataclass
+from typing      import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Слова и числа отдельно: "5-9кл" -> ["5", "9", "кл"], "30х40" -> ["30", "х", "40"]
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+        Токены текста в нижнем регистре, "ё" приводится к "е"
+    """
+    return TOKEN_PATTERN.findall(str(text).lower().replace("ё", "е"))
+
+
+class BM25Index:
+    """
+        Лексический индекс BM25 по списку текстов (id текста - его позиция)
+    """
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        docs = [tokenize(text) for text in texts]
+        self.ntotal     = len(docs)
+        self.doc_tokens = [set(doc) for doc in docs]
+
+        doc_len = np.array([len(doc) for doc in docs], dtype=np.float32)
+        avgdl   = float(doc_len.mean()) if self.ntotal else 0.0
+        norm    = k1 * (1 - b + b * doc_len / avgdl) if avgdl else np.full(self.ntotal, k1, dtype=np.float32)
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for doc_id, doc in enumerate(docs):
+            for token, tf in Counter(doc).items():
+                ids, tfs = postings.setdefault(token, ([], []))
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        # Для каждого токена хранятся id текстов и готовый вклад токена в их оценку
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for token, (ids, tfs) in postings.items():
+            ids = np.array(ids, dtype=np.int64)
+            tfs = np.array(tfs, dtype=np.float32)
+            idf = np.log(1 + (self.ntotal - len(ids) + 0.5) / (len(ids) + 0.5))
+            self.postings[token] = (ids, (idf * tfs * (k1 + 1) / (tfs + norm[ids])).astype(np.float32))
+
+    def search(self, query: str, k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            До k текстов с ненулевой оценкой BM25 по убыванию оценки.
+            allowed - необязательная булева маска допустимых id
+        """
+        scores = np.zeros(self.ntotal, dtype=np.float32)
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if posting is not None:
+                ids, weights = posting
+                scores[ids] += weights
+        if allowed is not None:
+            scores[~allowed] = 0
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        order = hits[np.argsort(-scores[hits], kind="stable")]
+        return scores[order], order
+
+    def overlap(self, query: str, doc_id: int) -> float:
+        """
+            Доля общих токенов запроса и текста (коэффициент Жаккара)
+        """
+        query_tokens = set(tokenize(query))
+        union = query_tokens | self.doc_tokens[doc_id]
+        return len(query_tokens & self.doc_tokens[doc_id]) / len(union) if union else 0.0
+
+    def is_decisive(
+        self,
+        query:       str,
+        scores:      np.ndarray,
+        ids:         np.ndarray,
+        min_overlap: float,
+        margin:      float
+    ) -> bool:
+        """
+            Лексический результат однозначен: лучший текст почти совпадает
+            с запросом по токенам и заметно опережает второй
+        """
+        if len(ids) == 0 or min_overlap <= 0:
+            return False
+        if self.overlap(query, ids[0]) < min_overlap:
+            return False
+        return len(ids) == 1 or scores[0] >= margin * scores[1]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = 60) -> List[int]:
+    """
+        Слияние рейтингов: оценка id - сумма 1 / (k + позиция) по всем рейтингам.
+        Отрицательные id (пустые позиции FAISS) пропускаются
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            if doc_id >= 0:
+                fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
+
+
+@dataclass
+class HybridContext:
+    """
+        Все, что нужно гибридному поиску по одному индексу (листу или каталогу)
+
+        dense_search - поиск векторов запросов: (queries, k) -> (D, I)
+        vectors_fn   - полноточные нормализованные векторы по массиву id
+        allowed      - необязательная маска допустимых id (фильтр по листам)
+    """
+    lexical:      BM25Index
+    dense_search: Callable[[np.ndarray, int], Tuple[np.ndarray, np.ndarray]]
+    vectors_fn:   Callable[[np.ndarray], np.ndarray]
+    allowed:      Optional[np.ndarray] = None
+    index:        Any                  = None
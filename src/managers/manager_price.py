@@ -14,24 +14,77 @@
         - Excel файлы: Источник данных для импорта
 
     Функциональность:
-        - Импорт данных из Excel в базу данных
-        - Получение данных из таблиц БД
+        - Импорт данных из Excel в базу данных с разбором иерархии разделов
+        - Потоковое чтение Excel (openpyxl read_only) порциями с учетом пикового RSS
+        - Таблица метаданных каталога: меню листов без чтения файла Excel
+        - Инкрементальная синхронизация листов по Артикулу с набором изменений
+        - Режим WAL: отдельные писатель и ограниченный пул читателей (manager_sqlite),
+          обновление прайса не блокирует поиск
+        - VACUUM по необходимости, а не при каждом обновлении
+        - Получение данных из таблиц БД через резидентный кэш с учетом версии данных
+        - Колоночные снимки листов (Arrow IPC) с чтением через mmap без копирования
+        - Выборка отдельных строк (get_rows) и учет памяти таблиц в кэше
+        - Асинхронное чтение строк и листов через ограниченный пул потоков
+        - Поиск по артикулу (точный, по началу, по части) без векторного поиска
+        - Индексы B-tree по Артикулу и полнотекстовый поиск FTS5 (BM25) по
+          Наименованию и Описанию без загрузки таблиц в pandas
+        - Отпечаток файла Excel (размер, время изменения, sha256) в базе:
+          решение об обновлении при старте без вопросов пользователю
         - Управление структурой данных
         - Синхронизация данных между источниками
 """
 
 # Стандартные библиотеки
 import os
+import re
+import hashlib
+import threading
+from time import perf_counter
+from datetime import datetime
 
 # Библиотеки для работы с данными и базой данных
 import pandas as pd
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.exc import OperationalError
+
+# Колоночные снимки листов (Arrow IPC) необязательны: без pyarrow таблицы читаются из SQLite
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+from src.utils import search_executor
+from src.managers.manager_artikul import ArtikulIndex
+from src.managers.manager_filters import assign_categories
+from src.managers.manager_sync import ChangeSet, TableChanges, sync_table
+from src.managers.manager_ingest import RssMonitor, iter_sheet_chunks, read_sheet_names
+from src.managers.manager_sqlite import checkpoint, create_engines
+from src.managers.manager_fingerprint import file_fingerprint, source_changed
+from config import config
 
 # Создание базового класса для моделей SQLAlchemy
 Base = declarative_base()
 
+# Служебные таблицы (метаданные каталога, полнотекстовые индексы) начинаются с "__"
+SERVICE_PREFIX = "__"
+
+# Служебная таблица метаданных каталога: листы в порядке книги и число строк
+CATALOG_META_TABLE = "__catalog_sheets"
+
+# Служебная таблица с отпечатком файла Excel, из которого загружена база
+SOURCE_META_TABLE = "__catalog_source"
+
+# Колонки полнотекстового индекса FTS5; регистр и диакритика не различаются,
+# "ё" приводится к "е" при индексации и в запросе
+FTS_COLUMNS  = ("Наименование", "Описание")
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+
+# Минимальная длина слова запроса, у которого отбрасывается окончание
+FTS_STEM_MIN = 5
+
 class DataManager:
     """
     Класс для работы с данными из базы данных SQLite и файла Excel.
@@ -53,25 +106,58 @@ class DataManager:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, filename, update_db=False):
+    @classmethod
+    def create(cls, *args, **kwargs):
+        """
+        Создает отдельный экземпляр в обход Singleton: новая версия каталога
+        загружается, пока текущая продолжает обслуживать запросы.
+
+        Аргументы: как у конструктора.
+
+        Возвращает:
+        DataManager: Новый экземпляр (Singleton не меняется).
+        """
+        instance = object.__new__(cls)
+        instance.__init__(*args, **kwargs)
+        return instance
+
+    def __init__(self, filename, update_db=False, db_path=None):
         """
         Инициализирует экземпляр DataManager.
 
         Аргументы:
         filename (str): Имя файла Excel для загрузки данных.
         update_db (bool): Если True, выполняет обновление базы данных из Excel.
+        db_path (str): Путь к базе данных SQLite (по умолчанию data/db/products.db,
+                       для готовой сборки каталога - база из ее каталога).
         """
         if not self._initialized:
             # Путь к файлу Excel
             self.filepath = os.path.join(filename)
 
-            # Создание соединения с базой данных SQLite
-            self.engine = create_engine(f'sqlite:///{os.path.join("data", "db", "products.db")}')
+            # Соединения с базой данных SQLite (WAL): писатель и пул читателей
+            self.db_path = db_path or os.path.join("data", "db", "products.db")
+            self.snapshot_dir = os.path.join(os.path.dirname(self.db_path), "snapshots")
+            self.engine, self.read_engine = create_engines(self.db_path)
             self.Session = sessionmaker(bind=self.engine)
 
             if not os.path.exists(self.filepath):
                 raise FileNotFoundError(f"Excel file not found: {self.filepath}")
 
+            # Индекс артикулов строится при первом поиске по артикулу
+            self._artikul_index = None
+            self._artikul_lock = threading.Lock()
+
+            # Резидентный кэш таблиц: имя -> (версия данных, DataFrame, размер в байтах)
+            self._tables = {}
+            self._tables_lock = threading.Lock()
+            self.table_cache_hits = 0
+            self.table_cache_misses = 0
+
+            # Решение об обновлении базы при старте (initialize)
+            self.startup_decision = None
+
+            # Индексы создаются при загрузке (update_database, build.py), а не в конструкторе
             if update_db:
                 self.update_database()
 
@@ -81,49 +167,576 @@ class DataManager:
         """
         Возвращает список названий листов Excel.
 
+        Имена берутся из таблицы метаданных каталога, файл Excel не читается.
+        Для базы без метаданных читается только список листов книги.
+
         Возвращает:
         list: Список имен листов Excel.
         """
-        return pd.ExcelFile(self.filepath).sheet_names
+        meta = self.get_catalog_meta()
+        if meta is not None:
+            return meta["sheet"].tolist()
+        return read_sheet_names(self.filepath)
+
+    def _db_stats(self):
+        """
+        Состояние файлов базы: основного и журнала WAL (если он есть).
+        """
+        paths = [self.db_path, f"{self.db_path}-wal"]
+        return [os.stat(path) for path in paths if os.path.exists(path)]
+
+    def get_data_version(self):
+        """
+        Возвращает признак версии данных БД: время изменения и размер файлов
+        базы и журнала WAL (зафиксированные записи до checkpoint лежат в WAL).
+
+        Возвращает:
+        tuple: (mtime_ns, size) файла базы данных и журнала.
+        """
+        return tuple((stat.st_mtime_ns, stat.st_size) for stat in self._db_stats())
+
+    def checkpoint(self):
+        """
+        Переносит журнал WAL в файл базы после записи, чтобы WAL не рос,
+        а время изменения файла базы отражало последнюю запись.
+        """
+        busy, _, _ = checkpoint(self.engine)
+        if busy:
+            print("Внимание: checkpoint WAL выполнен не полностью, база занята читателями")
+
+    def read_table(self, table_name):
+        """
+        Читает таблицу из базы данных целиком, минуя кэш.
+
+        Аргументы:
+        table_name (str): Название таблицы.
+
+        Возвращает:
+        pd.DataFrame: Данные таблицы.
+        """
+        with self.read_engine.connect() as conn:
+            return pd.read_sql_table(table_name, conn)
+
+    def get_snapshot_path(self, table_name):
+        """
+        Возвращает путь к колоночному снимку таблицы (Arrow IPC / Feather).
+        """
+        h = hashlib.md5(table_name.encode()).hexdigest()
+        return os.path.join(self.snapshot_dir, f"{h}.arrow")
+
+    def write_snapshot(self, table_name, df):
+        """
+        Атомарно записывает колоночный снимок таблицы без сжатия,
+        чтобы его можно было читать через mmap без копирования.
+
+        Аргументы:
+        table_name (str): Название таблицы.
+        df (pd.DataFrame): Данные таблицы в том виде, в каком их возвращает база.
+        """
+        if pa is None:
+            return None
+        path = self.get_snapshot_path(table_name)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        return path
+
+    def read_snapshot(self, table_name):
+        """
+        Читает колоночный снимок таблицы через mmap.
+
+        Числовые колонки и строки без пропусков не копируются, строковые колонки
+        остаются в буферах Arrow (pd.StringDtype("pyarrow")) вместо объектов Python.
+        Снимок старше базы данных не используется.
+
+        Возвращает:
+        pd.DataFrame | None: Данные таблицы или None, если актуального снимка нет.
+        """
+        if pa is None:
+            return None
+        path = self.get_snapshot_path(table_name)
+        db_mtime = max(stat.st_mtime_ns for stat in self._db_stats())
+        if not os.path.exists(path) or os.stat(path).st_mtime_ns < db_mtime:
+            return None
+
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return table.to_pandas(
+            types_mapper=lambda t: pd.StringDtype("pyarrow") if pa.types.is_string(t) or pa.types.is_large_string(t) else None
+        )
+
+    def update_snapshots(self, table_names):
+        """
+        Перезаписывает снимки указанных таблиц по данным базы, удаляет снимки
+        таблиц, которых в базе больше нет. Снимки остальных таблиц не изменились:
+        им обновляется время изменения, чтобы они не считались старше базы.
+        """
+        if pa is None:
+            return
+        table_names = set(table_names)
+        all_tables = self.get_all_table_names()
+        for table_name in all_tables:
+            path = self.get_snapshot_path(table_name)
+            if table_name in table_names or not os.path.exists(path):
+                self.write_snapshot(table_name, self.read_table(table_name))
+            else:
+                os.utime(path)
+
+        expected = {os.path.basename(self.get_snapshot_path(name)) for name in all_tables}
+        for name in os.listdir(self.snapshot_dir) if os.path.isdir(self.snapshot_dir) else []:
+            if name.endswith(".arrow") and name not in expected:
+                os.remove(os.path.join(self.snapshot_dir, name))
 
     def get_table_data(self, table_name):
         """
         Возвращает данные из указанной таблицы в виде DataFrame.
 
+        Таблица читается один раз (из колоночного снимка, если он актуален,
+        иначе из базы данных) и хранится в памяти, пока не изменится
+        версия данных (get_data_version). Возвращаемый DataFrame общий для всех
+        вызовов: его нельзя изменять, для выборки строк есть get_rows.
+
         Аргументы:
         table_name (str): Название таблицы для извлечения данных.
 
         Возвращает:
         pd.DataFrame: Данные из указанной таблицы.
         """
-        with self.engine.connect() as conn:
-            return pd.read_sql_table(table_name, conn)
+        version = self.get_data_version()
+        cached = self._tables.get(table_name)
+        if cached is not None and cached[0] == version:
+            self.table_cache_hits += 1
+            return cached[1]
+
+        with self._tables_lock:
+            cached = self._tables.get(table_name)
+            if cached is not None and cached[0] == version:
+                self.table_cache_hits += 1
+                return cached[1]
+            self.table_cache_misses += 1
+            df = self.read_snapshot(table_name)
+            if df is None:
+                df = self.read_table(table_name)
+            self._tables[table_name] = (version, df, int(df.memory_usage(deep=True).sum()))
+            return df
+
+    def clear_table_cache(self):
+        """
+        Удаляет все таблицы из резидентного кэша.
+        """
+        with self._tables_lock:
+            self._tables.clear()
 
-    def update_database(self):
+    def table_cache_stats(self):
         """
-        Обновляет базу данных из Excel файла.
+        Возвращает статистику резидентного кэша таблиц и занимаемую ими память.
 
-        Читает данные с каждого листа Excel и добавляет их в базу данных.
+        Возвращает:
+        dict: Попадания, промахи, общий размер и размер каждой таблицы в байтах.
+        """
+        with self._tables_lock:
+            tables = {
+                name: {"rows": len(df), "bytes": size}
+                for name, (_, df, size) in self._tables.items()
+            }
+        total = self.table_cache_hits + self.table_cache_misses
+        return {
+            "hits":     self.table_cache_hits,
+            "misses":   self.table_cache_misses,
+            "hit_rate": self.table_cache_hits / total if total else 0.0,
+            "bytes":    sum(table["bytes"] for table in tables.values()),
+            "tables":   tables,
+        }
+
+    def get_rows(self, table_name, indices):
+        """
+        Возвращает только запрошенные строки таблицы по их позициям
+        (копию, которую можно изменять).
+
+        Аргументы:
+        table_name (str): Название таблицы.
+        indices (list): Позиции строк (например, из результатов поиска).
+
+        Возвращает:
+        pd.DataFrame: Строки в порядке indices.
+        """
+        return self.get_table_data(table_name).iloc[list(indices)]
+
+    async def aget_rows(self, table_name, indices):
+        """
+        Асинхронный вариант get_rows, не блокирующий цикл событий.
+        """
+        return await search_executor.run(self.get_rows, table_name, indices)
+
+    async def aget_sheet_names(self):
+        """
+        Асинхронный вариант get_sheet_names, не блокирующий цикл событий.
         """
-        excel_file = pd.ExcelFile(self.filepath)
+        return await search_executor.run(self.get_sheet_names)
 
+    def get_artikul_index(self):
+        """
+        Возвращает индекс артикулов всех таблиц, при необходимости строит его.
+
+        Возвращает:
+        ArtikulIndex: Индекс артикулов.
+        """
+        if self._artikul_index is None:
+            with self._artikul_lock:
+                if self._artikul_index is None:
+                    entries = []
+                    for table_name in self.get_all_table_names():
+                        df = self.get_table_data(table_name)
+                        if 'Артикул' in df.columns:
+                            entries.extend(
+                                (artikul, table_name, row)
+                                for row, artikul in enumerate(df['Артикул'])
+                            )
+                    self._artikul_index = ArtikulIndex(entries)
+        return self._artikul_index
+
+    def search_by_artikul(self, artikul, limit=5, tables=None):
+        """
+        Ищет товары по артикулу без модели: точное совпадение, по началу, по части.
+        Регистр, дефисы и пробелы не учитываются.
+
+        Аргументы:
+        artikul (str): Артикул или его часть.
+        limit (int): Максимальное число результатов.
+        tables (list): Необязательный фильтр по таблицам.
+
+        Возвращает:
+        list: Список (таблица, строка, оценка), как у EmbeddingManager.search_catalog.
+        """
+        return self.get_artikul_index().search(artikul, limit, tables)
+
+    async def asearch_by_artikul(self, artikul, limit=5, tables=None):
+        """
+        Асинхронный вариант search_by_artikul: индекс строится в пуле потоков,
+        сам поиск выполняется сразу.
+        """
+        if self._artikul_index is None:
+            await search_executor.run(self.get_artikul_index)
+        return self.search_by_artikul(artikul, limit, tables)
+
+    @staticmethod
+    def get_fts_table(table_name):
+        """
+        Возвращает имя полнотекстового индекса FTS5 таблицы.
+        """
+        return f"{SERVICE_PREFIX}fts_{hashlib.md5(table_name.encode()).hexdigest()[:12]}"
+
+    def _build_indexes(self, connection, table_name, rebuild_fts=True):
+        """
+        Создает индекс B-tree по Артикулу и полнотекстовый индекс FTS5 таблицы
+        в транзакции connection.
+
+        Индекс FTS5 не хранит текст (content=''), а rowid его строк - позиция
+        строки в таблице, как в get_table_data. Поэтому после любого изменения
+        таблицы он строится заново (rebuild_fts).
+        """
+        inspector = inspect(connection)
+        columns = [column["name"] for column in inspector.get_columns(table_name)]
+        h = hashlib.md5(table_name.encode()).hexdigest()[:12]
+
+        if 'Артикул' in columns:
+            connection.execute(text(
+                f'CREATE INDEX IF NOT EXISTS "{SERVICE_PREFIX}ix_{h}_artikul" ON "{table_name}" ("Артикул")'
+            ))
+
+        fts_table = self.get_fts_table(table_name)
+        fts_columns = [column for column in FTS_COLUMNS if column in columns]
+        if not rebuild_fts and fts_table in inspector.get_table_names():
+            return
+        connection.execute(text(f'DROP TABLE IF EXISTS "{fts_table}"'))
+        if not fts_columns:
+            return
+
+        names = ", ".join(f'"{column}"' for column in fts_columns)
+        values = ", ".join(
+            f"""replace(replace(coalesce(CAST("{column}" AS TEXT), ''), 'ё', 'е'), 'Ё', 'Е')"""
+            for column in fts_columns
+        )
+        try:
+            connection.execute(text(
+                f'CREATE VIRTUAL TABLE "{fts_table}" USING fts5({names}, content=\'\', tokenize=\'{FTS_TOKENIZE}\')'
+            ))
+        except OperationalError as e:
+            print(f"Внимание: полнотекстовый индекс для '{table_name}' не создан: {e}")
+            return
+        connection.execute(text(
+            f'INSERT INTO "{fts_table}" (rowid, {names}) '
+            f'SELECT row_number() OVER (ORDER BY rowid) - 1, {values} FROM "{table_name}"'
+        ))
+
+    def ensure_indexes(self):
+        """
+        Создает недостающие индексы по Артикулу и FTS5 для всех таблиц
+        (для баз, собранных без них). Транзакция открывается, только если
+        каких-то индексов нет. Вызывается явно (бенчмарки на копии базы);
+        update_database строит недостающие индексы сам.
+        """
+        tables = self.get_all_table_names()
+        existing = set(inspect(self.read_engine).get_table_names())
+        missing = [table for table in tables if self.get_fts_table(table) not in existing]
+        if not missing:
+            return
         with self.engine.begin() as connection:
-            for sheet_name in excel_file.sheet_names:
-                df = excel_file.parse(sheet_name=sheet_name)
+            for table_name in missing:
+                self._build_indexes(connection, table_name, rebuild_fts=False)
+        self.checkpoint()
+        # Данные не изменились, но файл базы стал новее снимков
+        self.update_snapshots([])
+
+    @staticmethod
+    def _fts_tokens(query):
+        """
+        Префиксы слов запроса для выражения MATCH: без знаков препинания и
+        синтаксиса FTS5. У длинных слов отбрасывается окончание (два символа),
+        чтобы "физика" находила "физике", а "цифровой" - "цифровая".
+        """
+        words = re.findall(r"\w+", str(query).lower().replace("ё", "е"))
+        return [word[:-2] if len(word) >= FTS_STEM_MIN and word.isalpha() else word for word in words]
+
+    def text_search(self, table, query, limit=5):
+        """
+        Полнотекстовый поиск по Наименованию и Описанию через FTS5 без загрузки
+        таблиц в память. Слова запроса ищутся по началу слова, строки
+        ранжируются по BM25. Сначала ищутся строки со всеми словами запроса,
+        если таких нет - с любым из них.
+
+        Аргументы:
+        table (str | list | None): Таблица, список таблиц или None (все таблицы).
+        query (str): Текст запроса.
+        limit (int): Максимальное число результатов.
+
+        Возвращает:
+        list: Список (таблица, строка, оценка), как у search_by_artikul;
+              оценка - BM25 (больше - лучше).
+        """
+        tokens = self._fts_tokens(query)
+        if not tokens:
+            return []
+        if table is None:
+            tables = self.get_all_table_names()
+        else:
+            tables = [table] if isinstance(table, str) else list(table)
+
+        with self.read_engine.connect() as conn:
+            indexed = set(inspect(conn).get_table_names())
+            for operator in (" AND ", " OR "):
+                match = operator.join(f'"{token}"*' for token in tokens)
+                results = []
+                for table_name in tables:
+                    fts_table = self.get_fts_table(table_name)
+                    if fts_table not in indexed:
+                        continue
+                    rows = conn.execute(
+                        text(f'SELECT rowid, rank FROM "{fts_table}" WHERE "{fts_table}" MATCH :match ORDER BY rank LIMIT :limit'),
+                        {"match": match, "limit": limit}
+                    )
+                    results.extend((table_name, int(row), -float(rank)) for row, rank in rows)
+                if results or len(tokens) == 1:
+                    break
+
+        results.sort(key=lambda result: result[2], reverse=True)
+        return results[:limit]
+
+    async def atext_search(self, table, query, limit=5):
+        """
+        Асинхронный вариант text_search, не блокирующий цикл событий.
+        """
+        return await search_executor.run(self.text_search, table, query, limit)
+
+    def update_database(self):
+        """
+        Обновляет базу данных из Excel файла.
 
-                target_column = 'Артикул'  # Столбец, по которому будет осуществляться фильтрация
+        Листы синхронизируются с таблицами по Артикулу в одной транзакции:
+        вставляются, обновляются и удаляются только изменившиеся строки, таблицы
+        удаленных листов удаляются. Лист без Артикула, с неуникальным Артикулом
+        или с другим набором колонок перезаписывается целиком. В режиме WAL
+        читатели не блокируются транзакцией записи и до ее фиксации видят
+        прежнее состояние базы. VACUUM выполняется только при большой доле
+        свободных страниц (maybe_vacuum).
 
-                if target_column in df.columns:
-                    df = df.dropna(subset=[target_column])  # Удаляем строки с пропусками в целевом столбце
+        Excel читается потоково (openpyxl read_only) порциями по
+        config.data.ingest_chunk_rows строк: новые листы пишутся в базу порциями,
+        существующие собираются целиком только по одному листу для сравнения.
+        Порядок листов и число строк записываются в таблицу метаданных каталога,
+        индексы по Артикулу и FTS5 изменившихся листов перестраиваются.
+
+        Возвращает:
+        ChangeSet: Изменения по таблицам для кэшей и индексов и пиковый RSS загрузки.
+        """
+        start = perf_counter()
+        changes = ChangeSet()
+        # Отпечаток снимается до чтения: изменение файла во время загрузки обнаружится при следующем старте
+        fingerprint = file_fingerprint(self.filepath)
+
+        target_column = 'Артикул'  # Столбец, по которому сопоставляются строки
+        chunk_rows = config.data.ingest_chunk_rows
+
+        with RssMonitor() as rss, self.engine.begin() as connection:
+            sheet_names = read_sheet_names(self.filepath)
+            existing = set(self._table_names(connection))
+            row_counts = {}
+
+            for sheet_name in sheet_names:
+                # Строки читаются потоково порциями; строки-заголовки без артикула
+                # превращаются в колонки "Раздел" и "Подраздел"
+                chunks = iter_sheet_chunks(self.filepath, sheet_name, chunk_rows, target_column)
+
+                if sheet_name in existing:
+                    # Сравнению по Артикулу нужен лист целиком, но не вся книга
+                    frames = list(chunks)
+                    old_df = pd.read_sql_table(sheet_name, connection)
+                    if frames:
+                        df = pd.concat(frames, ignore_index=True)
+                        if target_column not in df.columns:
+                            print(f"Внимание: в листе '{sheet_name}' отсутствует столбец '{target_column}'")
+                    else:
+                        # Опустевший лист: все строки таблицы удаляются, лист остается в каталоге с 0 строк
+                        df = old_df.iloc[0:0]
+                    changes.add(sync_table(connection, sheet_name, old_df, df, target_column))
+                    row_counts[sheet_name] = len(df)
                 else:
-                    print(f"Внимание: в листе '{sheet_name}' отсутствует столбец '{target_column}'")
+                    # Новый лист пишется в базу порциями, не собираясь в памяти
+                    row_counts[sheet_name] = 0
+                    for i, chunk in enumerate(chunks):
+                        if i == 0 and target_column not in chunk.columns:
+                            print(f"Внимание: в листе '{sheet_name}' отсутствует столбец '{target_column}'")
+                        chunk.to_sql(name=sheet_name, con=connection, if_exists='replace' if i == 0 else 'append', index=False)
+                        row_counts[sheet_name] += len(chunk)
+                    if row_counts[sheet_name] or sheet_name in self._table_names(connection):
+                        changes.add(TableChanges(sheet_name, replaced=True))
+
+            for table_name in existing - set(sheet_names):
+                connection.execute(text(f'DROP TABLE "{table_name}"'))
+                connection.execute(text(f'DROP TABLE IF EXISTS "{self.get_fts_table(table_name)}"'))
+                changes.removed.append(table_name)
+
+            # Индексы изменившихся таблиц перестраиваются в той же транзакции
+            for sheet_name in row_counts:
+                self._build_indexes(connection, sheet_name, rebuild_fts=sheet_name in changes.tables)
+
+            self._write_catalog_meta(connection, [name for name in sheet_names if name in row_counts], row_counts)
+            self._write_source_meta(connection, fingerprint)
+
+        changes.peak_rss = rss.peak
+        self.checkpoint()
+
+        # Колоночные снимки пишутся после базы, чтобы быть не старше ее
+        # (метаданные и индексы записываются при каждом обновлении)
+        self.update_snapshots(changes.changed_tables)
+
+        if not changes.is_empty():
+            # Индекс артикулов и кэш таблиц будут перестроены по новым данным
+            self._artikul_index = None
+            self.clear_table_cache()
+
+        self.maybe_vacuum()
+        changes.duration = perf_counter() - start
+        print(
+            f"[✓] База данных обновлена за {changes.duration:.2f}s "
+            f"(пиковый RSS {changes.peak_rss / 2**20:.0f} МБ, +{(changes.peak_rss - rss.start) / 2**20:.0f} МБ): "
+            f"{changes.summary()}"
+        )
+        return changes
+
+    def _write_catalog_meta(self, connection, sheet_names, row_counts):
+        """
+        Записывает таблицу метаданных каталога: листы в порядке книги и число строк.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        pd.DataFrame({
+            "position":   range(len(sheet_names)),
+            "sheet":      sheet_names,
+            "rows":       [row_counts[name] for name in sheet_names],
+            "updated_at": [now] * len(sheet_names),
+        }).to_sql(name=CATALOG_META_TABLE, con=connection, if_exists='replace', index=False)
+
+    def _write_source_meta(self, connection, fingerprint):
+        """
+        Записывает отпечаток файла Excel, из которого загружена база.
+        """
+        pd.DataFrame([{
+            "path":       str(self.filepath),
+            **fingerprint,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }]).to_sql(name=SOURCE_META_TABLE, con=connection, if_exists='replace', index=False)
+
+    def get_source_fingerprint(self):
+        """
+        Возвращает отпечаток файла Excel, записанный при последнем обновлении базы.
+
+        Возвращает:
+        dict | None: size, mtime_ns, sha256 или None для базы без отпечатка.
+        """
+        try:
+            with self.read_engine.connect() as conn:
+                rows = conn.execute(text(f'SELECT size, mtime_ns, sha256 FROM "{SOURCE_META_TABLE}"')).mappings().all()
+        except OperationalError:
+            return None
+        return {key: rows[0][key] for key in ("size", "mtime_ns", "sha256")} if rows else None
+
+    def check_source(self):
+        """
+        Сравнивает файл Excel с отпечатком, записанным при последнем обновлении
+        базы: размер и время изменения без чтения файла, при расхождении - sha256.
+
+        Возвращает:
+        tuple: (действие, причина). Действия: "update" - база пуста и должна быть
+               загружена сейчас, "stale" - база устарела, "fresh" - база актуальна.
+        """
+        if not self.get_all_table_names():
+            return "update", "database is empty"
+        changed, reason = source_changed(self.filepath, self.get_source_fingerprint())
+        return ("stale" if changed else "fresh"), reason
 
-                # Загружаем данные в таблицу базы данных
-                df.to_sql(name=sheet_name, con=connection, if_exists='replace', index=False)
+    def get_catalog_meta(self):
+        """
+        Возвращает метаданные каталога из базы данных.
 
-            # Выполняем операции COMMIT и VACUUM для оптимизации базы данных
-            connection.execute(text("COMMIT"))
-            connection.execute(text("VACUUM"))
+        Возвращает:
+        pd.DataFrame | None: Листы, их порядок и число строк или None для базы без метаданных.
+        """
+        try:
+            with self.read_engine.connect() as conn:
+                return pd.read_sql_query(
+                    text(f'SELECT sheet, rows, updated_at FROM "{CATALOG_META_TABLE}" ORDER BY position'), conn
+                )
+        except OperationalError:
+            return None
+
+    def maybe_vacuum(self, min_free_ratio=None):
+        """
+        Выполняет VACUUM, если доля свободных страниц базы не меньше порога
+        (VACUUM_FREE_RATIO).
+
+        Возвращает:
+        bool: True, если VACUUM был выполнен.
+        """
+        min_free_ratio = config.data.vacuum_free_ratio if min_free_ratio is None else min_free_ratio
+        with self.read_engine.connect() as conn:
+            page_count = conn.execute(text("PRAGMA page_count")).scalar()
+            free_pages = conn.execute(text("PRAGMA freelist_count")).scalar()
+        if not page_count or free_pages / page_count < min_free_ratio:
+            return False
+        self.vacuum()
+        return True
+
+    def vacuum(self):
+        """
+        Пересобирает файл базы данных, освобождая место после удалений.
+        """
+        start = perf_counter()
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        self.checkpoint()
+        # Данные не изменились, но файл базы стал новее снимков
+        self.update_snapshots([])
+        print(f"[✓] VACUUM базы данных выполнен за {perf_counter() - start:.2f}s")
 
     def get_all_table_names(self):
         """
@@ -132,28 +745,49 @@ class DataManager:
         Возвращает:
         list: Список имен всех таблиц в базе данных.
         """
-        inspector = inspect(self.engine)
-        return inspector.get_table_names()
+        return self._table_names(self.read_engine)
+
+    def dispose(self):
+        """
+        Закрывает все соединения с базой данных (например, перед переносом файла базы).
+        """
+        self.engine.dispose()
+        self.read_engine.dispose()
+
+    @staticmethod
+    def _table_names(bind):
+        """
+        Таблицы листов каталога без служебных таблиц метаданных.
+        """
+        return [name for name in inspect(bind).get_table_names() if not name.startswith(SERVICE_PREFIX)]
 
     @classmethod
-    def initialize(cls, filename, update_db=False):
+    def initialize(cls, filename, update_db=None):
         """
-        Инициализация экземпляра DataManager.
+        Инициализация экземпляра DataManager при старте бота.
 
-        Этот метод будет вызываться для создания экземпляра DataManager с подтверждением необходимости обновления БД.
+        Решение об обновлении БД принимается без участия пользователя по
+        отпечатку файла Excel (check_source). Пустая база загружается сразу;
+        устаревшая база обслуживает запросы, пока новая версия каталога
+        собирается в фоне (main.py). Решение, его причина и длительность
+        сохраняются в startup_decision.
 
         Аргументы:
         filename (str): Имя файла Excel для инициализации.
-        update_db (bool): Если True, выполняется обновление БД.
+        update_db (bool | None): True/False - обновить БД или нет принудительно,
+                                 None - решить по отпечатку файла.
 
         Возвращает:
         DataManager: Экземпляр DataManager.
         """
         if not cls._instance:
-            confirm = input("Update database from Excel? (y/n) default=n: ").lower().strip()
-            # Если ничего не введено, устанавливаем значение по умолчанию 'n'
-            if confirm == '':
-                confirm = 'n'
-            update = confirm == 'y'
-            cls._instance = cls(filename, update)
+            start = perf_counter()
+            instance = cls(filename)
+            if update_db is None:
+                action, reason = instance.check_source()
+            else:
+                action, reason = ("update" if update_db else "fresh"), "forced"
+            if action == "update":
+                instance.update_database()
+            instance.startup_decision = {"action": action, "reason": reason, "seconds": perf_counter() - start}
         return cls._instance
@@ -0,0 +1,207 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_rerank.py                ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует второй этап ранжирования кандидатов поиска:
+        дешевый поиск отбирает до 50 кандидатов, затем подключаемая модель
+        пересчитывает их оценки в пределах бюджета времени на запрос.
+        • none   - остается дешевая оценка (векторное сходство + нечеткое сравнение)
+        • linear - обученная логистическая модель по тем же признакам
+        • cross  - кросс-энкодер по парам (запрос, наименование)
+
+        Кандидаты переоцениваются порциями в порядке дешевой оценки; когда
+        бюджет исчерпан, оставшиеся кандидаты сохраняют дешевую оценку и
+        идут после переоцененных.
+
+    Основные компоненты:
+        - LinearReranker: логистическая модель по признакам кандидата
+        - CrossEncoderReranker: кросс-энкодер sentence-transformers
+        - RerankStage: переоценка с бюджетом времени и счетчиками отказов
+        - get_rerank_stage: общий этап ранжирования из конфигурации
+        - rerank_stats: метрики общего этапа (без загрузки модели)
+
+    Признаки кандидата (FEATURE_NAMES):
+        векторное сходство, ratio, partial_ratio, token_sort_ratio,
+        token_set_ratio, совпадение типа товара
+"""
+
+import json
+import threading
+import numpy as np
+
+from time   import perf_counter
+from typing import List, Optional, Sequence, Tuple
+
+from src.utils import logger
+from config    import config
+
+
+RERANKERS = ("none", "linear", "cross")
+
+FEATURE_NAMES = ("dense", "ratio", "partial_ratio", "token_sort_ratio", "token_set_ratio", "type_match")
+
+
+class LinearReranker:
+    """
+        Логистическая модель по признакам кандидата
+    """
+    name = "linear"
+
+    def __init__(self, weights: Sequence[float], bias: float = 0.0):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias    = float(bias)
+
+    def score(self, query: str, names: Sequence[str], features: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+
+    @classmethod
+    def fit(cls, features: np.ndarray, labels: np.ndarray) -> "LinearReranker":
+        """
+            Обучение по размеченным кандидатам (1 - верный товар, 0 - нет)
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        model = LogisticRegression(class_weight="balanced", max_iter=1000)
+        model.fit(features, labels)
+        return cls(model.coef_[0], model.intercept_[0])
+
+    @classmethod
+    def load(cls, path: str) -> "LinearReranker":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if tuple(data["features"]) != FEATURE_NAMES:
+            raise ValueError(f"Reranker weights {path} were trained on other features: {data['features']}")
+        return cls(data["weights"], data["bias"])
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "features": list(FEATURE_NAMES),
+                "weights":  [float(w) for w in self.weights],
+                "bias":     self.bias,
+            }, f, ensure_ascii=False, indent=2)
+
+
+class CrossEncoderReranker:
+    """
+        Кросс-энкодер: совместное кодирование пары (запрос, наименование)
+    """
+    name = "cross"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score(self, query: str, names: Sequence[str], features: np.ndarray) -> np.ndarray:
+        pairs = [(query, name) for name in names]
+        return np.asarray(self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False), dtype=np.float32)
+
+
+class RerankStage:
+    """
+        Переоценка кандидатов с бюджетом времени на запрос
+    """
+
+    def __init__(self, reranker=None, budget_ms: float = 200.0, chunk_size: int = 16):
+        self.reranker   = reranker
+        self.budget     = budget_ms / 1000
+        self.chunk_size = chunk_size
+
+        self.queries   = 0
+        self.fallbacks = 0     # Запросы, в которых бюджет закончился до конца переоценки
+        self.time      = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.reranker is not None
+
+    def run(
+        self,
+        query:        str,
+        names:        Sequence[str],
+        features:     np.ndarray,
+        cheap_scores: np.ndarray
+    ) -> List[Tuple[int, float]]:
+        """
+            Порядок кандидатов и их итоговые оценки: список (позиция кандидата, оценка)
+        """
+        order = np.argsort(-np.asarray(cheap_scores), kind="stable")
+        if not self.enabled or len(order) == 0:
+            return [(int(i), float(cheap_scores[i])) for i in order]
+
+        start = perf_counter()
+        deadline = start + self.budget
+        reranked = []
+        for chunk_start in range(0, len(order), self.chunk_size):
+            if perf_counter() >= deadline:
+                break
+            chunk = order[chunk_start:chunk_start + self.chunk_size]
+            scores = self.reranker.score(query, [names[i] for i in chunk], features[chunk])
+            reranked.extend(zip(chunk, scores))
+
+        self.queries += 1
+        self.time    += perf_counter() - start
+        if len(reranked) < len(order):
+            self.fallbacks += 1
+
+        done = {int(i) for i, _ in reranked}
+        head = sorted(((int(i), float(score)) for i, score in reranked), key=lambda item: item[1], reverse=True)
+        tail = [(int(i), float(cheap_scores[i])) for i in order if int(i) not in done]
+        return head + tail
+
+    def stats(self):
+        return {
+            "reranker":    self.reranker.name if self.enabled else "none",
+            "queries":     self.queries,
+            "fallbacks":   self.fallbacks,
+            "avg_time_ms": self.time / self.queries * 1000 if self.queries else 0.0,
+        }
+
+
+def load_reranker(kind: str, model_name: Optional[str] = None, weights_path: Optional[str] = None):
+    """
+        Модель переоценки по названию; None для "none"
+    """
+    if kind not in RERANKERS:
+        raise ValueError(f"Unknown reranker '{kind}', expected one of {RERANKERS}")
+    if kind == "linear":
+        return LinearReranker.load(weights_path)
+    if kind == "cross":
+        return CrossEncoderReranker(model_name)
+    return None
+
+
+_stage = None
+_stage_lock = threading.Lock()
+
+
+def get_rerank_stage() -> RerankStage:
+    """
+        Общий этап переоценки из конфигурации; модель загружается один раз.
+        Если модель загрузить не удалось, остается дешевая оценка
+    """
+    global _stage
+    if _stage is None:
+        with _stage_lock:
+            if _stage is None:
+                try:
+                    reranker = load_reranker(
+                        config.embedding.reranker,
+                        config.embedding.reranker_model,
+                        config.embedding.reranker_weights
+                    )
+                except Exception:
+                    logger.exception(f"Reranker '{config.embedding.reranker}' is unavailable, using cheap scores")
+                    reranker = None
+                _stage = RerankStage(reranker, config.embedding.rerank_budget_ms)
+    return _stage
+
+
+def rerank_stats():
+    """
+        Метрики общего этапа переоценки; до первого использования - нулевые
+    """
+    return _stage.stats() if _stage is not None else RerankStage().stats()
@@ -0,0 +1,109 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_sqlite.py                ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль настраивает подключения SQLAlchemy к базам SQLite бота
+        (products.db и users.db) для одновременного чтения и записи:
+        • Журнал WAL: читатели не блокируются транзакцией записи и видят
+          последнее зафиксированное состояние базы
+        • PRAGMA mmap_size, cache_size, synchronous и busy_timeout
+          на каждом новом соединении
+        • Отдельные движки: писатель с одним соединением (записи идут
+          по очереди, без ошибок "database is locked") и читатель
+          только для чтения (mode=ro) с ограниченным пулом соединений
+
+    Основные компоненты:
+        - create_engines: движки писателя и читателей для файла базы
+        - checkpoint: перенос WAL в основной файл базы
+        - pool_stats: занятость пула соединений
+
+    Примеры использования:
+        writer, reader = create_engines("data/db/products.db")
+        with reader.connect() as conn:
+            conn.execute(text("SELECT count(*) FROM users"))
+"""
+
+import os
+
+from typing            import Dict, Optional, Tuple
+
+from sqlalchemy        import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool   import QueuePool
+
+from config            import config
+
+
+def _pragmas(readonly: bool):
+    """
+        Обработчик события connect: PRAGMA для нового соединения
+    """
+    statements = [
+        f"PRAGMA busy_timeout = {config.data.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous = {config.data.sqlite_synchronous}",
+        f"PRAGMA mmap_size = {config.data.sqlite_mmap_mb * 2**20}",
+        f"PRAGMA cache_size = -{config.data.sqlite_cache_mb * 1024}",  # отрицательное значение - в КиБ
+    ]
+    if not readonly:
+        # Режим журнала хранится в файле базы, читатели получают его от писателя
+        statements.insert(0, "PRAGMA journal_mode = WAL")
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+def create_engines(db_path, read_pool_size: Optional[int] = None) -> Tuple[Engine, Engine]:
+    """
+        Движки писателя и читателей для файла базы SQLite.
+
+        Писатель создает файл базы и переводит его в режим WAL до того,
+        как будет открыто первое соединение только для чтения.
+    """
+    db_path = os.path.abspath(db_path)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    timeout = config.data.sqlite_pool_timeout
+
+    writer = create_engine(
+        f"sqlite:///{db_path}",
+        poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=timeout,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(writer, "connect", _pragmas(readonly=False))
+    with writer.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    reader = create_engine(
+        f"sqlite:///file:{db_path}?mode=ro&uri=true",
+        poolclass=QueuePool, pool_size=read_pool_size or config.data.sqlite_read_pool,
+        max_overflow=0, pool_timeout=timeout,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(reader, "connect", _pragmas(readonly=True))
+    return writer, reader
+
+
+def checkpoint(writer: Engine) -> Tuple[int, int, int]:
+    """
+        Переносит WAL в основной файл базы и обрезает WAL.
+        Возвращает (busy, страниц в WAL, перенесено страниц); busy = 1,
+        если активные читатели не дали перенести все страницы
+    """
+    with writer.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        return tuple(conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).one())
+
+
+def pool_stats(engine: Engine) -> Dict[str, int]:
+    """
+        Размер пула и число выданных соединений
+    """
+    pool = engine.pool
+    return {"size": pool.size(), "checked_out": pool.checkedout()}
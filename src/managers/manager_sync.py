@@ -0,0 +1,168 @@
+"""
+    ╔════════════════════════════════════════════════════════════╗
+    ║                    Модуль manager_sync.py                  ║
+    ╚════════════════════════════════════════════════════════════╝
+
+    Описание:
+        Модуль реализует инкрементальную синхронизацию листа прайс-листа
+        с таблицей SQLite по ключу (Артикул):
+        • Сравнение старых и новых строк по каноничному виду значений
+        • Вставка, обновление и удаление только изменившихся строк
+        • Полная перезапись листа, если ключ не уникален или изменились колонки
+        • Набор изменений (ChangeSet) для кэшей и индексов, которые
+          зависят от данных прайса
+
+    Основные компоненты:
+        - TableChanges: изменения одной таблицы (ключи вставленных, обновленных, удаленных строк)
+        - ChangeSet: изменения всей базы за одно обновление
+        - diff_frames: сравнение старой и новой версии листа
+        - sync_table: применение изменений листа в открытой транзакции
+
+    Примеры использования:
+        with engine.begin() as connection:
+            changes = sync_table(connection, "Цифровые лаборатории", old_df, new_df, "Артикул")
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataclasses import dataclass, field
+from typing      import Dict, List, Optional, Tuple
+
+from sqlalchemy import MetaData, Table, bindparam
+
+
+# Размер порции ключей в условии IN при удалении (ограничение числа параметров SQLite)
+DELETE_CHUNK = 500
+
+
+@dataclass
+class TableChanges:
+    """
+        Изменения одной таблицы; replaced - таблица перезаписана целиком
+    """
+    table:    str
+    inserted: List[str] = field(default_factory=list)
+    updated:  List[str] = field(default_factory=list)
+    deleted:  List[str] = field(default_factory=list)
+    replaced: bool      = False
+
+    def is_empty(self) -> bool:
+        return not (self.inserted or self.updated or self.deleted or self.replaced)
+
+
+@dataclass
+class ChangeSet:
+    """
+        Изменения базы данных за одно обновление из Excel
+    """
+    tables:   Dict[str, TableChanges] = field(default_factory=dict)
+    removed:  List[str]               = field(default_factory=list)
+    duration: float                   = 0.0
+    peak_rss: int                     = 0     # Пиковый RSS процесса во время загрузки, байт
+
+    def add(self, changes: TableChanges):
+        if not changes.is_empty():
+            self.tables[changes.table] = changes
+
+    @property
+    def changed_tables(self) -> List[str]:
+        return list(self.tables)
+
+    def is_empty(self) -> bool:
+        return not self.tables and not self.removed
+
+    def summary(self) -> str:
+        inserted = sum(len(c.inserted) for c in self.tables.values())
+        updated  = sum(len(c.updated) for c in self.tables.values())
+        deleted  = sum(len(c.deleted) for c in self.tables.values())
+        replaced = sum(c.replaced for c in self.tables.values())
+        return (
+            f"таблиц изменено {len(self.tables)} (перезаписано {replaced}), удалено {len(self.removed)}; "
+            f"строк добавлено {inserted}, обновлено {updated}, удалено {deleted}"
+        )
+
+
+def _cell(value) -> Optional[str]:
+    """
+        Каноничный вид значения для сравнения: база и Excel по-разному
+        возвращают типы (12345 / 12345.0 / "12345")
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _signatures(df: pd.DataFrame) -> List[Tuple]:
+    return [tuple(_cell(v) for v in row) for row in df.itertuples(index=False, name=None)]
+
+
+def diff_frames(old: pd.DataFrame, new: pd.DataFrame, key: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+        Ключи вставленных, обновленных и удаленных строк
+    """
+    old_rows = dict(zip((_cell(k) for k in old[key]), _signatures(old)))
+    new_rows = dict(zip((_cell(k) for k in new[key]), _signatures(new)))
+
+    inserted = [k for k in new_rows if k not in old_rows]
+    deleted  = [k for k in old_rows if k not in new_rows]
+    updated  = [k for k in new_rows if k in old_rows and old_rows[k] != new_rows[k]]
+    return inserted, updated, deleted
+
+
+def _can_sync(old: pd.DataFrame, new: pd.DataFrame, key: str) -> bool:
+    """
+        Построчная синхронизация возможна при тех же колонках и уникальном ключе
+    """
+    if key not in new.columns or list(old.columns) != list(new.columns):
+        return False
+    return not new[key].map(_cell).duplicated().any() and not old[key].map(_cell).duplicated().any()
+
+
+def _records(df: pd.DataFrame) -> List[Dict]:
+    """
+        Строки в виде словарей значений Python, пропуски - None
+    """
+    values = df.astype(object).where(df.notna(), None)
+    return values.to_dict(orient="records")
+
+
+def sync_table(connection, table_name: str, old: pd.DataFrame, new: pd.DataFrame, key: str) -> TableChanges:
+    """
+        Приводит таблицу к новой версии листа в текущей транзакции connection
+    """
+    if not _can_sync(old, new, key):
+        new.to_sql(name=table_name, con=connection, if_exists='replace', index=False)
+        return TableChanges(table_name, inserted=[_cell(k) for k in new[key]] if key in new.columns else [], replaced=True)
+
+    inserted, updated, deleted = diff_frames(old, new, key)
+    if not (inserted or updated or deleted):
+        return TableChanges(table_name)
+
+    table = Table(table_name, MetaData(), autoload_with=connection)
+    columns = list(new.columns)
+    params = {table.c[column]: bindparam(f"v{i}") for i, column in enumerate(columns)}
+
+    # Условия WHERE используют значения ключа в том виде, в каком они хранятся в базе
+    stored_keys = {_cell(k): k for k in old[key]}
+    new_records = {_cell(record[key]): record for record in _records(new)}
+
+    def bind(record):
+        return {f"v{i}": record[column] for i, column in enumerate(columns)}
+
+    for start in range(0, len(deleted), DELETE_CHUNK):
+        chunk = [stored_keys[k] for k in deleted[start:start + DELETE_CHUNK]]
+        connection.execute(table.delete().where(table.c[key].in_(chunk)))
+
+    if updated:
+        connection.execute(
+            table.update().where(table.c[key] == bindparam("stored_key")).values(params),
+            [{"stored_key": stored_keys[k], **bind(new_records[k])} for k in updated]
+        )
+
+    if inserted:
+        connection.execute(table.insert().values(params), [bind(new_records[k]) for k in inserted])
+
+    return TableChanges(table_name, inserted=inserted, updated=updated, deleted=deleted)
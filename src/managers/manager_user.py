@@ -19,17 +19,20 @@
         - Система скидок для разных типов пользователей
         - Безопасное хранение паролей (хеширование)
         - Привязка к Telegram ID
+        - Режим WAL: отдельные соединения записи и ограниченный пул чтения
 """
 
 import os
 import hashlib
 import threading
 
-from sqlalchemy      import create_engine, Column, Integer, String, Boolean, ForeignKey, Float
+from sqlalchemy      import Column, Integer, String, Boolean, ForeignKey, Float
 from sqlalchemy.orm  import sessionmaker, declarative_base
 from sqlalchemy.exc  import IntegrityError
 from config          import config
 
+from src.managers.manager_sqlite import create_engines
+
 
 
 Base = declarative_base()
@@ -76,9 +79,11 @@ class UserManager:
         self.__initialized = True
 
         self.db_path = db_path
-        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        # WAL: записи идут через одно соединение писателя, чтение - через пул читателей
+        self.engine, self.read_engine = create_engines(self.db_path)
         Base.metadata.create_all(self.engine)
         self.Session = sessionmaker(bind=self.engine)
+        self.ReadSession = sessionmaker(bind=self.read_engine)
         self._init_default_discounts()
 
     def _init_default_discounts(self):
@@ -144,21 +149,28 @@ class UserManager:
             session.close()
 
     def get_user_by_inn(self, inn: str) -> User:
-        session = self.Session()
+        session = self.ReadSession()
         try:
             return session.query(User).filter_by(inn=inn).first()
         finally:
             session.close()
 
     def get_user_by_telegram(self, telegram_id: int) -> User:
-        session = self.Session()
+        session = self.ReadSession()
         try:
             return session.query(User).filter_by(telegram_id=telegram_id).first()
         finally:
             session.close()
 
+    def get_all_users(self) -> list:
+        session = self.ReadSession()
+        try:
+            return session.query(User).all()
+        finally:
+            session.close()
+
     def get_discount(self, user_type: int) -> float:
-        session = self.Session()
+        session = self.ReadSession()
         try:
             discount = session.get(Discount, user_type)
             return discount.discount_value if discount else 0.0
@@ -14,11 +14,16 @@
         • logger           - модуль логирования с настройкой через logger
         • LoggerSetup      - модуль настройки и создания нового logger
         • preprocessor     - модуль для предобработки текста
+        • preprocess_parallel - предобработка списка текстов на нескольких процессах
+        • LRUCache         - ограниченный LRU-кэш с TTL и счетчиками попаданий
+        • search_executor  - ограниченный пул потоков для поиска из обработчиков
         • ExcelProcessor   - модуль для обработки Excel-файлов
 """
 
 from .utils_logger         import logger, LoggerSetup
-from .utils_preprocessor   import preprocessor
+from .utils_preprocessor   import preprocessor, preprocess_parallel
+from .utils_cache          import LRUCache
+from .utils_executor       import BoundedExecutor, search_executor
 from .utils_file_processor import ExcelProcessor
 
-__all__ = ["logger", "LoggerSetup", "preprocessor", "ExcelProcessor"]
+__all__ = ["logger", "LoggerSetup", "preprocessor", "preprocess_parallel", "LRUCache", "BoundedExecutor", "search_executor", "ExcelProcessor"]
@@ -0,0 +1,107 @@
+"""
+    ╔════════════════════════════════════════════╗
+    ║              utils_cache.py                ║
+    ╚════════════════════════════════════════════╝
+
+    Описание:
+        Модуль предоставляет ограниченный потокобезопасный LRU-кэш
+        с необязательным временем жизни записей (TTL):
+        • Вытеснение давно не использованных записей при переполнении
+        • Истечение записей по TTL
+        • Счетчики попаданий, промахов и вытеснений для подбора размера
+
+    Примеры использования:
+        cache = LRUCache(maxsize=4096, ttl=3600)
+
+        vector = cache.get(key)
+        if vector is None:
+            vector = compute(key)
+            cache.put(key, vector)
+
+        logger.info("Query cache: %s", cache.stats())
+"""
+
+import threading
+
+from collections import OrderedDict
+from time        import monotonic
+from typing      import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+        Ограниченный LRU-кэш с необязательным TTL
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+            maxsize - максимальное число записей (0 - кэш выключен)
+            ttl     - время жизни записи в секундах (None - без ограничения)
+        """
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+            Возвращает значение по ключу и отмечает его как недавно использованное
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and expires_at <= monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses      += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+            Сохраняет значение, вытесняя самую старую запись при переполнении
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+            Счетчики кэша для подбора его размера
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size":        len(self._data),
+                "maxsize":     self.maxsize,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "hit_rate":    self.hits / total if total else 0.0,
+                "evictions":   self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,99 @@
+"""
+    ╔════════════════════════════════════════════╗
+    ║              utils_executor.py             ║
+    ╚════════════════════════════════════════════╝
+
+    Описание:
+        Модуль предоставляет ограниченный пул потоков для блокирующих
+        операций поиска (FAISS, pandas, SQLite), вызываемых из обработчиков:
+        • Фиксированное число рабочих потоков
+        • Ограничение числа ожидающих задач (backpressure)
+        • Счетчики выполненных задач и времени ожидания в очереди
+
+        Пул отделен от пула asyncio.to_thread по умолчанию, поэтому тяжелые
+        фоновые задачи (обновление эмбеддингов, обработка файлов) не занимают
+        потоки, нужные для ответов пользователям.
+
+    Примеры использования:
+        rows = await search_executor.run(data_manager.get_rows, table, indices)
+"""
+
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from time               import perf_counter
+from typing             import Any, Callable, Dict
+
+from config import config
+
+
+class BoundedExecutor:
+    """
+        Пул потоков с ограничением числа одновременно ожидающих задач
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64, name: str = "search"):
+        """
+            max_workers - число рабочих потоков
+            max_pending - сколько задач может ждать в очереди и выполняться одновременно;
+                          остальные вызовы run() ждут освобождения места
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor   = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots      = None
+        self._loop       = None
+        self._stats_lock = threading.Lock()
+
+        self.completed    = 0
+        self.in_flight    = 0
+        self.wait_time_ms = 0.0
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop  = loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+            Выполнение блокирующей функции в пуле без блокировки цикла событий
+        """
+        queued = perf_counter()
+        async with self._get_slots():
+            with self._stats_lock:
+                self.in_flight += 1
+            try:
+                return await self._loop.run_in_executor(
+                    self._executor, lambda: self._call(queued, func, *args, **kwargs)
+                )
+            finally:
+                with self._stats_lock:
+                    self.in_flight -= 1
+                    self.completed += 1
+
+    def _call(self, queued: float, func: Callable, *args, **kwargs) -> Any:
+        with self._stats_lock:
+            self.wait_time_ms += (perf_counter() - queued) * 1000
+        return func(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "workers":     self.max_workers,
+                "in_flight":   self.in_flight,
+                "completed":   self.completed,
+                "avg_wait_ms": self.wait_time_ms / self.completed if self.completed else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Общий пул для поиска и чтения строк каталога из обработчиков
+search_executor = BoundedExecutor(
+    max_workers=config.embedding.search_workers,
+    max_pending=config.embedding.search_max_pending
+)
@@ -14,6 +14,7 @@
 """
 
 import asyncio
+import numpy as np
 import pandas as pd
 
 from openpyxl        import load_workbook
@@ -22,9 +23,13 @@ from openpyxl.utils  import get_column_letter
 from typing          import Optional, List, Tuple, Callable, Awaitable, Dict
 from thefuzz         import fuzz
 
-from src.managers    import EmbeddingManager, DataManager
+from src.managers    import EmbeddingManager, DataManager, IndexRegistry
 from src.utils       import preprocessor
 from src.utils       import logger
+from src.utils       import search_executor
+from config          import config
+
+from src.managers.manager_rerank import FEATURE_NAMES, get_rerank_stage
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
@@ -37,6 +42,10 @@ from reportlab.pdfbase.ttfonts import TTFont
 pdfmetrics.registerFont(TTFont('Arial', 'arial.ttf'))
 pdfmetrics.registerFont(TTFont('Arial-Bold', 'arialbd.ttf'))  # Жирный шрифт
 
+# Предобработанные наименования листов, общие для всех запросов:
+# каталог лемматизируется один раз на версию данных
+_name_indexes = IndexRegistry()
+
 class AsyncCache:
     """
         Простой кэш для асинхронных функций
@@ -65,15 +74,24 @@ class AsyncCache:
 
 
 class ExcelProcessor:
-    def __init__(self):
+    def __init__(self, data_manager=None, embedding_manager=None):
+        """
+            data_manager, embedding_manager - менеджеры версии каталога, взятой
+            запросом в аренду (CatalogManager.lease); по умолчанию - текущие
+        """
         self.required_columns = {
             'name':     ['наименование', 'название', 'имя', 'name', 'title'],
             'quantity': ['количество', 'кол-во', 'quantity', 'count']
         }
-        self.data_manager      = DataManager("data/excel/price-list.xlsx")
-        self.embedding_manager = EmbeddingManager(self.data_manager)
+        self.data_manager      = data_manager or DataManager("data/excel/price-list.xlsx")
+        self.embedding_manager = embedding_manager or EmbeddingManager(self.data_manager)
         self._progress_callback: Optional[Callable[[float], Awaitable[None]]] = None
         
+        # Число кандидатов из единого индекса каталога на одно наименование;
+        # их порядок уточняет второй этап ранжирования (RERANKER)
+        self.search_top_k     = config.embedding.rerank_candidates
+        self.rerank_stage     = get_rerank_stage()
+
         self.text_cache       = AsyncCache(maxsize=1000)
         self.similarity_cache = AsyncCache(maxsize=1000)
         
@@ -121,6 +139,27 @@ class ExcelProcessor:
                 return ' '.join(text.lower().split())
         return await self.text_cache.get_or_create(text, _process)
 
+    @staticmethod
+    def _preprocess_names(texts: List[str]) -> List[str]:
+        """
+            Синхронная предобработка списка текстов для потоков пула поиска
+            (у потока пула нет своего цикла событий)
+        """
+        async def _run():
+            processed = []
+            for text in texts:
+                try:
+                    processed.append(await preprocessor.preprocess(
+                        str(text),
+                        remove_stopwords=False,
+                        filter_punctuation=True
+                    ))
+                except Exception as e:
+                    logger.error(f"Ошибка при предобработке текста: {e}")
+                    processed.append(' '.join(str(text).lower().split()))
+            return processed
+        return asyncio.run(_run())
+
     def get_product_type(self, text: str) -> str:
         """
             Определение типа продукта из текста
@@ -131,115 +170,245 @@ class ExcelProcessor:
                 return type_name
         return "other"
 
-    async def calculate_similarity(self, text1: str, text2: str) -> float:
+    async def similarity_features(self, text1: str, text2: str) -> Tuple[float, Tuple[float, ...]]:
         """
-            Вычисление сходства между двумя текстами с кэшированием
+            Нечеткое сходство двух текстов и признаки, из которых оно получено:
+            (ratio, partial_ratio, token_sort_ratio, token_set_ratio, совпадение типа)
         """
         cache_key = self.similarity_cache.get_key(text1, text2)
-        
+
         async def _calculate():
-            try:
-                processed_text1 = await self.preprocess_text(text1)
-                processed_text2 = await self.preprocess_text(text2)
+            processed_text1 = await self.preprocess_text(text1)
+            processed_text2 = await self.preprocess_text(text2)
+            return self._fuzzy_features(text1, text2, processed_text1, processed_text2)
+        return await self.similarity_cache.get_or_create(cache_key, _calculate)
 
-                ratio = fuzz.ratio(processed_text1, processed_text2) / 100
-                partial_ratio = fuzz.partial_ratio(processed_text1, processed_text2) / 100
-                token_sort_ratio = fuzz.token_sort_ratio(processed_text1, processed_text2) / 100
-                token_set_ratio = fuzz.token_set_ratio(processed_text1, processed_text2) / 100
+    def _fuzzy_features(
+        self,
+        text1:           str,
+        text2:           str,
+        processed_text1: str,
+        processed_text2: str
+    ) -> Tuple[float, Tuple[float, ...]]:
+        """
+            Нечеткое сходство и признаки по уже предобработанным текстам
+        """
+        try:
+            ratio = fuzz.ratio(processed_text1, processed_text2) / 100
+            partial_ratio = fuzz.partial_ratio(processed_text1, processed_text2) / 100
+            token_sort_ratio = fuzz.token_sort_ratio(processed_text1, processed_text2) / 100
+            token_set_ratio = fuzz.token_set_ratio(processed_text1, processed_text2) / 100
 
-                type1 = self.get_product_type(text1)
-                type2 = self.get_product_type(text2)
+            type1 = self.get_product_type(text1)
+            type2 = self.get_product_type(text2)
 
-                type_multiplier = 1.2 if type1 == type2 and type1 != "other" else 1.0
+            type_match = 1.0 if type1 == type2 and type1 != "other" else 0.0
+            type_multiplier = 1.2 if type_match else 1.0
 
-                base_similarity = max(
-                    ratio * 0.2 + token_sort_ratio * 0.4 + token_set_ratio * 0.4,
-                    partial_ratio * 0.3 + token_sort_ratio * 0.7
-                )
-                
-                return base_similarity * type_multiplier
-            except Exception as e:
-                logger.error(f"Ошибка при расчете сходства: {e}")
-                return fuzz.ratio(text1.lower(), text2.lower()) / 100
-        return await self.similarity_cache.get_or_create(cache_key, _calculate)
+            base_similarity = max(
+                ratio * 0.2 + token_sort_ratio * 0.4 + token_set_ratio * 0.4,
+                partial_ratio * 0.3 + token_sort_ratio * 0.7
+            )
+
+            return base_similarity * type_multiplier, (ratio, partial_ratio, token_sort_ratio, token_set_ratio, type_match)
+        except Exception as e:
+            logger.error(f"Ошибка при расчете сходства: {e}")
+            ratio = fuzz.ratio(text1.lower(), text2.lower()) / 100
+            return ratio, (ratio, ratio, ratio, ratio, 0.0)
+
+    async def calculate_similarity(self, text1: str, text2: str) -> float:
+        """
+            Вычисление сходства между двумя текстами с кэшированием
+        """
+        similarity, _ = await self.similarity_features(text1, text2)
+        return similarity
 
     async def _search_product_async(self, product_name: str) -> List[Tuple[str, str, float, float, str]]:
         """
             Асинхронный поиск товара во всех таблицах базы данных.
         """
-        results = []
-        tables = self.data_manager.get_all_table_names()
-        
-        tasks = []
-        for table in tables:
-            tasks.append(self._search_in_table_async(table, product_name))
-        
-        table_results = await asyncio.gather(*tasks)
-        
-        for table_result in table_results:
-            results.extend(table_result)
-        
-        return sorted(results, key=lambda x: x[3], reverse=True)
+        results = await self._search_products_async([product_name])
+        return results[product_name]
 
     async def _search_in_table_async(self, table: str, product_name: str) -> List[Tuple[str, str, float, float, str]]:
         """
             Асинхронный поиск товара в конкретной таблице
         """
-        results = []
-        df = await asyncio.to_thread(self.data_manager.get_table_data, table)
-        
-        processed_product_name = await self.preprocess_text(product_name)
-        product_type = self.get_product_type(product_name)
-        
-        processed_names = {}
-        for idx, row in df.iterrows():
-            name = row['Наименование']
-            processed_names[idx] = await self.preprocess_text(name)
-        
-        exact_matches = []
-        for idx, proc_name in processed_names.items():
-            if proc_name == processed_product_name:
-                exact_matches.append(idx)
-                
-        if exact_matches:
-            for idx in exact_matches:
-                product = df.iloc[idx]
-                price = float(product.get('Цена с НДС', 0))
-                description = str(product.get('Описание', ''))
-                results.append((product['Наименование'], table, price, 1.0, description))
-            return results
-        distances, indices = await asyncio.to_thread(
-            self.embedding_manager.search, table, "Наименование", product_name
-        )
+        results = await self._search_products_async([product_name], tables=[table])
+        return results[product_name]
+
+    async def _load_tables_async(self, tables: List[str]) -> Tuple[Dict[str, pd.DataFrame], Dict[Tuple[str, int], str], Dict[str, List[Tuple[str, int]]]]:
+        """
+            Загрузка таблиц и предобработанных наименований для точного совпадения
+            в пуле поиска, не блокируя цикл событий
+        """
+        return await search_executor.run(self._load_tables, tables)
+
+    def _get_table_names(self, table: str) -> Tuple[List[str], Dict[str, List[int]]]:
+        """
+            Предобработанные наименования листа и индекс точного совпадения.
+            Строятся один раз на версию данных и общие для всех запросов
+        """
+        def build():
+            processed = self._preprocess_names(self.data_manager.get_table_data(table)['Наименование'].tolist())
+            exact: Dict[str, List[int]] = {}
+            for idx, name in enumerate(processed):
+                exact.setdefault(name, []).append(idx)
+            return processed, exact
 
-        if distances is not None and indices is not None:
-            for dist, idx in zip(distances, indices):
-                if idx < len(df):
-                    product = df.iloc[idx]
-                    found_name = product['Наименование']
-                    fuzzy_similarity = await self.calculate_similarity(product_name, found_name)
-                    if dist > 0.9:
-                        final_similarity = max(dist, fuzzy_similarity)
-                    else:
-                        final_similarity = (dist * 0.3 + fuzzy_similarity * 0.7)
-
-                    # Логируем результаты для отладки
-                    logger.debug(f"""
-                        Поиск для: {product_name} (тип: {product_type})
-                        Обработанный запрос: {processed_product_name}
-                        Найдено: {found_name}
-                        Обработанная находка: {processed_names.get(idx, '')}
-                        Эмбеддинг сходство: {dist:.3f}
-                        Fuzzy similarity: {fuzzy_similarity:.3f}
-                        Итоговое сходство: {final_similarity:.3f}
-                    """)
+        return _name_indexes.get(
+            (table, 'Наименование'),
+            (self.data_manager.db_path, self.data_manager.get_data_version()),
+            build
+        )
 
+    def _load_tables(self, tables: List[str]) -> Tuple[Dict[str, pd.DataFrame], Dict[Tuple[str, int], str], Dict[str, List[Tuple[str, int]]]]:
+        tables_data = {}
+        processed_names = {}
+        exact_index: Dict[str, List[Tuple[str, int]]] = {}
+        for table in tables:
+            tables_data[table] = self.data_manager.get_table_data(table)
+            processed, exact = self._get_table_names(table)
+            processed_names.update(((table, idx), name) for idx, name in enumerate(processed))
+            for name, rows in exact.items():
+                exact_index.setdefault(name, []).extend((table, idx) for idx in rows)
+        return tables_data, processed_names, exact_index
+
+    async def _search_products_async(self, product_names: List[str], tables: Optional[List[str]] = None) -> Dict[str, List[Tuple[str, str, float, float, str]]]:
+        """
+            Пакетный поиск списка товаров по каталогу.
+            Товары без точного совпадения ищутся одним запросом к единому
+            индексу всех листов; tables ограничивает поиск указанными листами.
+        """
+        product_names = list(dict.fromkeys(product_names))
+        tables = tables or self.data_manager.get_all_table_names()
+        tables_data, processed_names, exact_index = await self._load_tables_async(tables)
+
+        processed_queries = await search_executor.run(self._preprocess_names, product_names)
+
+        results = {}
+        vector_queries = []
+        for product_name, processed_product_name in zip(product_names, processed_queries):
+            exact_matches = exact_index.get(processed_product_name)
+            if exact_matches:
+                results[product_name] = []
+                for table, idx in exact_matches:
+                    product = tables_data[table].iloc[idx]
                     price = float(product.get('Цена с НДС', 0))
                     description = str(product.get('Описание', ''))
-                    results.append((found_name, table, price, float(final_similarity), description))
+                    results[product_name].append((product['Наименование'], table, price, 1.0, description))
+            else:
+                vector_queries.append(product_name)
+
+        if vector_queries:
+            candidates = await self.embedding_manager.asearch_catalog_many(
+                "Наименование", vector_queries, self.search_top_k, tables
+            )
+            for product_name, product_candidates in zip(vector_queries, candidates):
+                results[product_name] = await self._score_candidates(
+                    product_name, product_candidates, tables_data, processed_names
+                )
+
+        # Порядок кандидатов задан вторым этапом ранжирования и не пересортировывается
+        return results
+
+    async def _candidate_features(
+        self,
+        product_name:    str,
+        candidates:      List[Tuple[str, int, float]],
+        tables_data:     Dict[str, pd.DataFrame],
+        processed_names: Dict[Tuple[str, int], str]
+    ) -> Tuple[List[Tuple[str, int, pd.Series]], List[str], np.ndarray, np.ndarray]:
+        """
+            Признаки кандидатов векторного поиска и их дешевая оценка
+            (векторное сходство + нечеткое сравнение).
+            Возвращает кандидатов (таблица, строка, товар), их наименования,
+            матрицу признаков (FEATURE_NAMES) и дешевые оценки.
+            Нечеткое сравнение выполняется в пуле поиска
+        """
+        return await search_executor.run(
+            self._collect_candidate_features, product_name, candidates, tables_data, processed_names
+        )
+
+    def _collect_candidate_features(
+        self,
+        product_name:    str,
+        candidates:      List[Tuple[str, int, float]],
+        tables_data:     Dict[str, pd.DataFrame],
+        processed_names: Dict[Tuple[str, int], str]
+    ) -> Tuple[List[Tuple[str, int, pd.Series]], List[str], np.ndarray, np.ndarray]:
+        found, names, features, cheap_scores = [], [], [], []
+        processed_product_name = self._preprocess_names([product_name])[0]
+        product_type = self.get_product_type(product_name)
+
+        for table, idx, dist in candidates:
+            df = tables_data.get(table)
+            if df is None or not 0 <= idx < len(df):
+                continue
+            product = df.iloc[idx]
+            found_name = product['Наименование']
+            processed_found_name = processed_names.get((table, idx))
+            if processed_found_name is None:
+                processed_found_name = self._preprocess_names([found_name])[0]
+            fuzzy_similarity, text_features = self._fuzzy_features(
+                product_name, str(found_name), processed_product_name, processed_found_name
+            )
+            if dist > 0.9:
+                final_similarity = max(dist, fuzzy_similarity)
+            else:
+                final_similarity = (dist * 0.3 + fuzzy_similarity * 0.7)
+
+            # Логируем результаты для отладки
+            logger.debug(f"""
+                Поиск для: {product_name} (тип: {product_type})
+                Обработанный запрос: {processed_product_name}
+                Найдено: {found_name} ({table})
+                Обработанная находка: {processed_found_name}
+                Эмбеддинг сходство: {dist:.3f}
+                Fuzzy similarity: {fuzzy_similarity:.3f}
+                Итоговое сходство: {final_similarity:.3f}
+            """)
+
+            found.append((table, idx, product))
+            names.append(str(found_name))
+            features.append((dist, *text_features))
+            cheap_scores.append(final_similarity)
+
+        features = np.array(features, dtype=np.float32).reshape(-1, len(FEATURE_NAMES))
+        return found, names, features, np.array(cheap_scores, dtype=np.float32)
+
+    async def _score_candidates(
+        self,
+        product_name:    str,
+        candidates:      List[Tuple[str, int, float]],
+        tables_data:     Dict[str, pd.DataFrame],
+        processed_names: Dict[Tuple[str, int], str]
+    ) -> List[Tuple[str, str, float, float, str]]:
+        """
+            Оценка кандидатов векторного поиска с учетом нечеткого сравнения
+            и второго этапа ранжирования
+        """
+        found, names, features, cheap_scores = await self._candidate_features(
+            product_name, candidates, tables_data, processed_names
+        )
+
+        # Второй этап: переоценка в пределах бюджета, при его нехватке - дешевая оценка
+        rerank_args = (product_name, names, features, cheap_scores)
+        if self.rerank_stage.enabled:
+            ranking = await asyncio.to_thread(self.rerank_stage.run, *rerank_args)
+        else:
+            ranking = self.rerank_stage.run(*rerank_args)
+
+        # Оценки модели переоценки не откалиброваны к [0, 1]: от нее берется
+        # только порядок, а пороги и сходство в отчете - по дешевой оценке
+        results = []
+        for position, _ in ranking:
+            table, _, product = found[position]
+            found_name = product['Наименование']
+            price = float(product.get('Цена с НДС', 0))
+            description = str(product.get('Описание', ''))
+            results.append((found_name, table, price, float(cheap_scores[position]), description))
 
-        results.sort(key=lambda x: x[3], reverse=True)
-        
         filtered_results = [r for r in results if r[3] >= 0.5]
 
         high_similarity_results = [r for r in filtered_results if r[3] >= 0.8]
@@ -285,39 +454,35 @@ class ExcelProcessor:
         """
         try:
             search_results = await self._search_product_async(product_name)
-            
-            if search_results:
-                best_match = search_results[0]
-                found_name, table, price, similarity, description = best_match
-                total_price = quantity * price
-                
-                return {
-                    'Исходный товар': product_name,
-                    'Найденный товар': found_name,
-                    'Описание': description,
-                    'Количество': quantity,
-                    'Цена за штуку': price,
-                    'Итоговая цена': total_price,
-                    'Наша таблица': table,
-                    'Сходство': similarity
-                }
-            else:
-                return {
-                    'Исходный товар': product_name,
-                    'Найденный товар': 'Не найдено',
-                    'Описание': '',
-                    'Количество': quantity,
-                    'Цена за штуку': 0,
-                    'Итоговая цена': 0,
-                    'Наша таблица': '',
-                    'Сходство': 0
-                }
+            return self._build_result(product_name, quantity, search_results)
         except Exception as e:
             logger.error(f"Error processing product {product_name}: {e}")
+            return self._build_error_result(product_name, quantity, e)
+
+    def _build_result(self, product_name: str, quantity: float, search_results: List[Tuple[str, str, float, float, str]]) -> dict:
+        """
+            Формирование строки результата по найденным товарам
+        """
+        if search_results:
+            best_match = search_results[0]
+            found_name, table, price, similarity, description = best_match
+            total_price = quantity * price
+            
+            return {
+                'Исходный товар': product_name,
+                'Найденный товар': found_name,
+                'Описание': description,
+                'Количество': quantity,
+                'Цена за штуку': price,
+                'Итоговая цена': total_price,
+                'Наша таблица': table,
+                'Сходство': similarity
+            }
+        else:
             return {
                 'Исходный товар': product_name,
-                'Найденный товар': 'Ошибка обработки',
-                'Описание': str(e),
+                'Найденный товар': 'Не найдено',
+                'Описание': '',
                 'Количество': quantity,
                 'Цена за штуку': 0,
                 'Итоговая цена': 0,
@@ -325,9 +490,25 @@ class ExcelProcessor:
                 'Сходство': 0
             }
 
+    def _build_error_result(self, product_name: str, quantity: float, error: Exception) -> dict:
+        """
+            Формирование строки результата при ошибке обработки
+        """
+        return {
+            'Исходный товар': product_name,
+            'Найденный товар': 'Ошибка обработки',
+            'Описание': str(error),
+            'Количество': quantity,
+            'Цена за штуку': 0,
+            'Итоговая цена': 0,
+            'Наша таблица': '',
+            'Сходство': 0
+        }
+
     async def process_file_async(self, input_file: str, output_file: str) -> tuple[bool, str]:
         """
             Асинхронная обработка входного Excel файла и создание выходного файла с результатами поиска.
+            Все наименования собираются заранее, дедуплицируются и ищутся за один проход.
         """
         try:
             await self._update_progress(0.1)
@@ -338,15 +519,11 @@ class ExcelProcessor:
             name_col = self._find_column(df, self.required_columns['name'])
             quantity_col = self._find_column(df, self.required_columns['quantity'])
 
-            result_data = []
-            total_rows = len(df)
-            processed_rows = 0
-
+            products = []
             for _, row in df.iterrows():
                 product_name = row[name_col]
                 
                 if pd.isna(product_name) or str(product_name).strip() == '':
-                    processed_rows += 1
                     continue
                 
                 quantity = 1.0
@@ -357,12 +534,26 @@ class ExcelProcessor:
                     except (ValueError, TypeError):
                         pass
                 
-                result = await self._process_product_async(str(product_name), quantity)
-                result_data.append(result)
-                processed_rows += 1
-                
-                progress = 0.1 + (0.7 * processed_rows / total_rows)
-                await self._update_progress(progress)
+                products.append((str(product_name), quantity))
+
+            await self._update_progress(0.3)
+            unique_names = list(dict.fromkeys(name for name, _ in products))
+            logger.info(f"Resolving {len(unique_names)} unique products out of {len(products)} rows")
+
+            try:
+                search_results = await self._search_products_async(unique_names)
+                search_error = None
+            except Exception as e:
+                logger.exception("Error in batch product search")
+                search_results, search_error = {}, e
+
+            await self._update_progress(0.7)
+            result_data = []
+            for product_name, quantity in products:
+                if search_error is not None:
+                    result_data.append(self._build_error_result(product_name, quantity, search_error))
+                else:
+                    result_data.append(self._build_result(product_name, quantity, search_results.get(product_name, [])))
             
             await self._update_progress(0.8)
             result_df = pd.DataFrame(result_data)
@@ -11,6 +11,7 @@
         • Фильтрация пунктуации
         • Лематизация (приведение к нормальной форме)
         • Асинхронная обработка текстов
+        • Параллельная обработка больших списков текстов по процессам
     
     Примеры использования:
         1. Базовая предобработка:
@@ -24,16 +25,20 @@
         3. Предобработка с лематизацией:
             preprocessor   = TextPreprocessor(use_lemmatization=True)
             processed_text = await preprocessor.preprocess("Машины едут по дороге")
+
+        4. Предобработка каталога на всех ядрах:
+            processed = preprocess_parallel(texts, workers=os.cpu_count())
 """
 
 import re
 import pymorphy3
 import asyncio
 
-from string         import punctuation
-from typing         import List, Union
-from nltk.tokenize  import word_tokenize
-from nltk.corpus    import stopwords
+from concurrent.futures import ProcessPoolExecutor
+from string             import punctuation
+from typing             import List, Sequence, Union
+from nltk.tokenize      import word_tokenize
+from nltk.corpus        import stopwords
 
 
 SUPPORTED_LANGUAGES = {
@@ -183,4 +188,27 @@ class TextPreprocessor:
 
 
 # Создаем глобальный препроцессор по умолчанию
-preprocessor = TextPreprocessor(use_lemmatization=True)
\ No newline at end of file
+preprocessor = TextPreprocessor(use_lemmatization=True)
+
+
+def _preprocess_chunk(texts: Sequence[str]) -> List[str]:
+    """
+        Предобработка части текстов в процессе-обработчике
+    """
+    async def _run():
+        return [await preprocessor.preprocess(str(t), False) for t in texts]
+    return asyncio.run(_run())
+
+
+def preprocess_parallel(texts: Sequence[str], workers: int, chunk_size: int = 512) -> List[str]:
+    """
+        Предобработка списка текстов глобальным препроцессором на нескольких
+        процессах (лематизация pymorphy3 упирается в GIL). Порядок сохраняется
+    """
+    texts = [str(t) for t in texts]
+    if workers <= 1 or len(texts) <= chunk_size:
+        return _preprocess_chunk(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [text for chunk in pool.map(_preprocess_chunk, chunks) for text in chunk]